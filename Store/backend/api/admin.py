@@ -3,10 +3,13 @@ from django.utils import timezone
 from .models.user import User
 from .models.group import Group
 from .models.fridge import Fridge
+from .models.fridge_stats import FridgeStats
+from .models.fridge_expiry_bucket import FridgeExpiryBucket
 from .models.categories import Categories
 from .models.product_catalog import ProductCatalog
 from .models.shopping_list import ShoppingList
 from .models.add_to_list import AddToList
+from .models.purchase_rollup import PurchaseRollup
 from .models.recipe import Recipe
 from .models.add_to_fridge import AddToFridge
 from .models.meal_plan import MealPlan
@@ -81,6 +84,18 @@ class FridgeAdmin(admin.ModelAdmin):
     def group_name(self, obj):
         return obj.group.groupName
 
+# Đăng ký FridgeStats model
+@admin.register(FridgeStats)
+class FridgeStatsAdmin(admin.ModelAdmin):
+    list_display = ('fridge', 'total_products', 'expired_products', 'expiring_soon_products', 'as_of', 'updated_at')
+    readonly_fields = ('fridge', 'total_products', 'expired_products', 'expiring_soon_products', 'popular_categories', 'as_of', 'updated_at')
+
+# Đăng ký FridgeExpiryBucket model
+@admin.register(FridgeExpiryBucket)
+class FridgeExpiryBucketAdmin(admin.ModelAdmin):
+    list_display = ('fridge', 'bucket', 'item_count', 'as_of')
+    list_filter = ('bucket', 'as_of')
+
 # Đăng ký Categories model
 @admin.register(Categories)
 class CategoriesAdmin(admin.ModelAdmin):
@@ -104,9 +119,15 @@ class ShoppingListAdmin(admin.ModelAdmin):
 # Đăng ký AddToList model
 @admin.register(AddToList)
 class AddToListAdmin(admin.ModelAdmin):
-    list_display = ('list', 'product', 'quantity', 'status')
+    list_display = ('list', 'product', 'quantity', 'status', 'purchased_at')
     list_filter = ('status',)
 
+# Đăng ký PurchaseRollup model
+@admin.register(PurchaseRollup)
+class PurchaseRollupAdmin(admin.ModelAdmin):
+    list_display = ('group', 'day', 'category', 'item_count', 'total_quantity')
+    list_filter = ('day',)
+
 # Đăng ký Recipe model
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
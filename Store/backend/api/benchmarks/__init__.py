@@ -0,0 +1,16 @@
+"""
+Các benchmark hiệu năng, chạy bằng: python manage.py run_benchmarks <tên>
+
+Mỗi module đăng ký 1 hàm run(stdout, **options) trong BENCHMARKS.
+"""
+from . import autocomplete, endpoints, fridge_restock, meal_plans, product_search, scoring, shopping_list_generation
+
+BENCHMARKS = {
+    'scoring': scoring.run,
+    'product_search': product_search.run,
+    'autocomplete': autocomplete.run,
+    'meal_plans': meal_plans.run,
+    'shopping_list_generation': shopping_list_generation.run,
+    'fridge_restock': fridge_restock.run,
+    'endpoints': endpoints.run,
+}
@@ -0,0 +1,46 @@
+"""Độ trễ gợi ý sản phẩm (AutocompleteIndex) trên 100k sản phẩm, không dùng database"""
+import random
+import statistics
+import time
+
+from ..utils.autocomplete import AutocompleteIndex
+from .product_search import PRODUCT_COUNT, make_products
+
+# Mục tiêu: dưới 1 ms cho mỗi lần gõ phím (chưa tính memo)
+TARGET_P95_MS = 1
+QUERIES = ('c', 'ca', 'ca c', 'ca chua', 'sua t', 'thit', 'b', 'nuoc mam', 'dau phu', 'x')
+
+
+def make_index(products, seed=0):
+    rng = random.Random(seed)
+    index = AutocompleteIndex(
+        {
+            'productID': product_id, 'productName': name, 'unit': 'kg', 'shelfLife': 7,
+            'isCustom': False, 'image': None, 'category_id': None, 'category__categoryName': None,
+        }
+        for product_id, name, is_custom in products if not is_custom
+    )
+    index.rank({product_id: rng.randint(0, 500) for product_id, _, _ in products})
+    return index
+
+
+def run(stdout, repeat=5, **options):
+    products = make_products()
+    start = time.perf_counter()
+    index = make_index(products)
+    stdout.write(f'Build + rank {PRODUCT_COUNT} sản phẩm ({len(index)} key): {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    stdout.write(f"{'query':>10} {'best (ms)':>10}")
+    samples = []
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            index.top(query, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+        stdout.write(f'{query:>10} {min(timings):>10.3f}')
+        samples.extend(timings)
+
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    verdict = 'OK' if p95 <= TARGET_P95_MS else 'CHẬM'
+    stdout.write(f'p95: {p95:.3f} ms, mục tiêu <= {TARGET_P95_MS} ms: {verdict}')
@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def test_database():
+    """
+    Tạo database test riêng (đã migrate) cho các benchmark cần ghi dữ liệu,
+    xóa đi khi xong để không đụng tới dữ liệu thật.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
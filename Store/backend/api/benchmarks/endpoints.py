@@ -0,0 +1,200 @@
+"""
+Số truy vấn, độ trễ p50/p95 và bộ nhớ đỉnh của từng endpoint trên bộ dữ liệu của seed.py.
+
+Mỗi endpoint: 1 request làm nóng (ghi lại cold_queries), `samples` request đo thời gian
+và đếm truy vấn, sau đó 1 request dưới tracemalloc để lấy bộ nhớ đỉnh (tracemalloc làm
+chậm Python nên không đo chung với độ trễ). Kết quả ghi ra JSON (--output) với key đã
+sắp xếp để diff giữa 2 commit; --baseline so sánh với 1 báo cáo cũ và báo lỗi nếu số
+truy vấn của endpoint nào tăng.
+"""
+import json
+import math
+import platform
+import sqlite3
+import subprocess
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import timedelta
+
+import django
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .database import test_database
+from .seed import seed
+
+# p95 cần đủ mẫu: số request đo của mỗi endpoint = max(repeat, MIN_SAMPLES)
+MIN_SAMPLES = 20
+
+Endpoint = namedtuple('Endpoint', ['name', 'method', 'path', 'params'])
+
+
+def endpoints(dataset):
+    """Các endpoint đọc dữ liệu chính của ứng dụng (và 1 thao tác ghi hay dùng), tham số lấy từ dataset"""
+    group_id = dataset.group.groupID
+    group = {'group_id': group_id}
+    today = timezone.localdate()
+    month = {**group, 'start_date': (today - timedelta(days=30)).isoformat(), 'end_date': today.isoformat()}
+    list_id = dataset.shopping_list.listID
+    return [
+        Endpoint('products.list', 'get', reverse('product-catalog'), {}),
+        Endpoint('products.page', 'get', reverse('product-catalog'), {'limit': 50}),
+        Endpoint('products.search', 'get', reverse('product-search'), {'q': 'ca chua'}),
+        Endpoint('products.autocomplete', 'get', reverse('product-autocomplete'), {'q': 'ca'}),
+        Endpoint('categories.list', 'get', reverse('categories'), {}),
+        Endpoint('recipes.list', 'get', reverse('recipe-list'), {}),
+        Endpoint('recipes.detail', 'get', reverse('recipe-detail', args=[dataset.recipe.recipeID]), {}),
+        Endpoint('favorite_recipes.list', 'get', reverse('favorite-recipes'), {}),
+        Endpoint('groups.list', 'get', reverse('group-list'), {}),
+        Endpoint('user.me', 'get', reverse('user-me'), {}),
+        Endpoint('fridge.list', 'get', reverse('fridge-list'), group),
+        Endpoint('fridge.stats', 'get', reverse('fridge-stats'), group),
+        Endpoint('fridge.notifications', 'get', reverse('fridge-notifications'), group),
+        Endpoint('fridge.notifications_summary', 'get', reverse('fridge-notifications'), {**group, 'summary': 1}),
+        Endpoint('fridge.recommendation', 'get', reverse('recipe-recommendation'), group),
+        Endpoint('meal_plans.list', 'get', reverse('meal-plan-list'), group),
+        Endpoint('meal_plans.detail', 'get', reverse('meal-plan-detail', args=[dataset.meal_plan.planID]), {}),
+        Endpoint('meal_plans.weekly', 'get', reverse('meal-plan-weekly'), {**group, 'date': today.isoformat()}),
+        Endpoint('shopping_lists.list', 'get', reverse('shopping-list'), group),
+        Endpoint('shopping_lists.page', 'get', reverse('shopping-list'), {**group, 'limit': 20}),
+        Endpoint('shopping_lists.detail', 'get', reverse('shopping-list-detail', args=[list_id]), {}),
+        Endpoint('shopping_lists.toggle_item', 'patch', reverse('toggle-item-status', args=[list_id, dataset.item.id]), {}),
+        Endpoint('shopping_lists.purchased_stats', 'get', reverse('purchased-shopping-stats'), month),
+        Endpoint('shopping_lists.stats_by_category', 'get', reverse('purchased-stats-by-category'), month),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank: giá trị nhỏ nhất mà ít nhất `fraction` số mẫu <= nó"""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+
+def request(client, endpoint):
+    if endpoint.method == 'get':
+        return client.get(endpoint.path, endpoint.params)
+    return getattr(client, endpoint.method)(endpoint.path, endpoint.params, format='json')
+
+
+def measure(client, endpoint, samples):
+    # Nhật ký truy vấn chỉ giữ 9000 dòng, xóa trước để đếm đúng
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        response = request(client, endpoint)
+    cold_queries = len(ctx.captured_queries)
+
+    timings, queries = [], 0
+    for _ in range(samples):
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = request(client, endpoint)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(ctx.captured_queries))
+
+    tracemalloc.start()
+    try:
+        request(client, endpoint)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'method': endpoint.method.upper(),
+        'path': endpoint.path,
+        'status': response.status_code,
+        'cold_queries': cold_queries,
+        'queries': queries,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def measure_all(dataset, samples):
+    client = APIClient()
+    client.force_authenticate(user=dataset.user)
+    return {endpoint.name: measure(client, endpoint, samples) for endpoint in endpoints(dataset)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_report(dataset, results, scale, samples):
+    return {
+        'environment': {
+            'commit': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'scale': scale,
+        'samples': samples,
+        'dataset': dataset.counts,
+        'endpoints': results,
+    }
+
+
+def compare(baseline, report):
+    """
+    So sánh với báo cáo cũ, trả về (các dòng mô tả thay đổi, tên các endpoint
+    có số truy vấn tăng). Endpoint chỉ có ở 1 trong 2 báo cáo được bỏ qua.
+    """
+    lines, regressions = [], []
+    for name, result in report['endpoints'].items():
+        old = baseline.get('endpoints', {}).get(name)
+        if old is None:
+            continue
+        if result['queries'] > old['queries']:
+            regressions.append(name)
+        change = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+        lines.append(
+            f"{name:<36} {old['queries']:>5} -> {result['queries']:<5} "
+            f"{old['p95_ms']:>9.1f} -> {result['p95_ms']:<9.1f} {change:>+7.0f}%"
+        )
+    return lines, regressions
+
+
+def run(stdout, repeat=5, scale=1.0, output=None, baseline=None, **options):
+    samples = max(repeat, MIN_SAMPLES)
+    with test_database():
+        start = time.perf_counter()
+        dataset = seed(scale)
+        stdout.write(f'Seed (scale {scale}): {(time.perf_counter() - start):.1f} s, ' + ', '.join(
+            f'{name} {count}' for name, count in dataset.counts.items()
+        ))
+        results = measure_all(dataset, samples)
+
+    stdout.write(f"{'endpoint':<36} {'status':>6} {'cold q':>7} {'queries':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'peak (KiB)':>11}")
+    for name, result in results.items():
+        stdout.write(
+            f"{name:<36} {result['status']:>6} {result['cold_queries']:>7} {result['queries']:>8} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['peak_kib']:>11.0f}"
+        )
+
+    report = make_report(dataset, results, scale, samples)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        stdout.write(f'Đã ghi báo cáo: {output}')
+
+    if baseline:
+        with open(baseline, encoding='utf-8') as f:
+            lines, regressions = compare(json.load(f), report)
+        stdout.write(f"{'endpoint':<36} {'queries':>14} {'p95 (ms)':>21} {'p95 %':>8}")
+        for line in lines:
+            stdout.write(line)
+        if regressions:
+            raise CommandError(f"Số truy vấn tăng so với {baseline}: {', '.join(regressions)}")
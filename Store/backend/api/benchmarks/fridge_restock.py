@@ -0,0 +1,95 @@
+"""
+Đưa hàng đã mua vào tủ lạnh: nhập tay từng sản phẩm (kiểm tra tồn tại rồi
+AddToFridge.save như FridgeDetailView.post, signal tính lại thống kê mỗi lần)
+so với apply_purchases (1 bulk upsert cho cả danh sách).
+Một nửa sản phẩm đã có sẵn trong tủ lạnh để đo cả nhánh cập nhật.
+"""
+import time
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.add_to_list import AddToList
+from ..models.fridge import Fridge
+from ..models.group import Group
+from ..models.product_catalog import ProductCatalog
+from ..models.shopping_list import ShoppingList
+from ..models.user import User
+from ..utils.fridge_restock import apply_purchases
+from .database import test_database
+
+SIZES = (100, 500)
+
+
+def manual_restock(shopping_list, fridge):
+    """Từng item: tìm sản phẩm, kiểm tra đã có trong tủ lạnh, rồi thêm hoặc cộng số lượng"""
+    today = date.today()
+    for item in AddToList.objects.filter(list=shopping_list, status=AddToList.ListStatus.PURCHASED):
+        product = ProductCatalog.objects.get(productID=item.product_id)
+        existing = AddToFridge.objects.filter(fridge=fridge, product=product).first()
+        if existing:
+            existing.quantity += int(item.quantity)
+            existing.save()
+        else:
+            AddToFridge.objects.create(
+                fridge=fridge, product=product, quantity=int(item.quantity),
+                expiredDate=today + timedelta(days=product.shelfLife),
+            )
+
+
+def prepare(size, group, user, fridge, products):
+    """Danh sách `size` sản phẩm đã mua, tủ lạnh chứa sẵn 1 nửa trong số đó"""
+    AddToFridge.objects.filter(fridge=fridge).delete()
+    shopping_list = ShoppingList.objects.create(listName=f'Bench {size}', date=date.today(), group=group, user=user, type='week')
+    AddToList.objects.bulk_create([
+        AddToList(list=shopping_list, product=product, quantity=2, status=AddToList.ListStatus.PURCHASED,
+                  unit_price=product.price, purchased_category_id=product.category_id)
+        for product in products[:size]
+    ])
+    AddToFridge.objects.bulk_create([
+        AddToFridge(fridge=fridge, product=product, quantity=1, expiredDate=date.today() + timedelta(days=3))
+        for product in products[:size:2]
+    ])
+    return shopping_list
+
+
+def measure(restock):
+    # Nhật ký truy vấn chỉ giữ 9000 dòng, xóa trước để đếm đúng
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        with transaction.atomic():
+            restock()
+        elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, len(ctx.captured_queries)
+
+
+def run(stdout, repeat=5, **options):
+    with test_database():
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+        group = Group.objects.create(groupName='Benchmark')
+        fridge = Fridge.objects.create(group=group)
+        products = ProductCatalog.objects.bulk_create([
+            ProductCatalog(productName=f'Sản phẩm {i}', original_price=10, price=10, unit='kg', shelfLife=3 + i % 30)
+            for i in range(max(SIZES))
+        ])
+
+        stdout.write(f"{'items':>6} {'manual (ms)':>12} {'queries':>8} {'bulk (ms)':>10} {'queries':>8} {'items/s':>9}")
+        for size in SIZES:
+            results = {}
+            for name in ('manual', 'bulk'):
+                best_ms, queries = float('inf'), 0
+                for _ in range(repeat):
+                    shopping_list = prepare(size, group, user, fridge, products)
+                    if name == 'manual':
+                        elapsed, queries = measure(lambda: manual_restock(shopping_list, fridge))
+                    else:
+                        elapsed, queries = measure(lambda: apply_purchases(shopping_list))
+                    best_ms = min(best_ms, elapsed)
+                results[name] = (best_ms, queries)
+            stdout.write(
+                f'{size:>6} {results["manual"][0]:>12.1f} {results["manual"][1]:>8} '
+                f'{results["bulk"][0]:>10.1f} {results["bulk"][1]:>8} {size / results["bulk"][0] * 1000:>9.0f}'
+            )
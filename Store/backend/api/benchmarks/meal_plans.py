@@ -0,0 +1,99 @@
+"""
+Tạo kế hoạch bữa ăn: cách cũ (MealPlan.create + Recipe.get + Have.create từng món,
+view lặp lại get_or_create) so với MealPlanCreateSerializer (in_bulk + bulk_create).
+Mỗi ngày là 1 request với 3 bữa, đo cho kế hoạch 1 tuần và 4 tuần.
+"""
+import time
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models.group import Group
+from ..models.have import Have
+from ..models.meal_plan import MealPlan
+from ..models.recipe import Recipe
+from ..models.user import User
+from ..serializers.mealplan_serializers import MealPlanCreateSerializer
+from .database import test_database
+
+WEEKS = (1, 4)
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+
+
+def legacy_create(payload):
+    """Cách tạo cũ của MealPlanCreateSerializer.create + MealPlanListView.post"""
+    meal_plans = []
+    for meal_data in payload['planned_meals']:
+        start_date = payload['start_date']
+        meal_plan = MealPlan.objects.create(
+            plan_name=payload['plan_name'],
+            start_date=start_date,
+            description=payload.get('description', ''),
+            mealType=meal_data['meal'],
+            day_of_week=start_date.weekday(),
+            group_id=payload['group'],
+            user_id=payload['user'],
+        )
+        meal_plans.append(meal_plan)
+        recipe = Recipe.objects.get(recipeID=meal_data['recipe_id'])
+        Have.objects.create(plan=meal_plan, recipe=recipe)
+    for meal_plan in meal_plans:
+        for meal_data in payload['planned_meals']:
+            recipe = Recipe.objects.get(recipeID=meal_data['recipe_id'])
+            Have.objects.get_or_create(plan=meal_plan, recipe=recipe)
+    return meal_plans
+
+
+def bulk_create(payload):
+    serializer = MealPlanCreateSerializer(data={**payload, 'start_date': payload['start_date'].isoformat()})
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+def make_payloads(weeks, group, user, recipes, plan_name):
+    start = date(2025, 6, 2)
+    return [
+        {
+            'plan_name': plan_name,
+            'start_date': start + timedelta(days=day),
+            'group': group.groupID,
+            'user': user.id,
+            'planned_meals': [
+                {'meal': meal, 'recipe_id': recipes[(day * 3 + i) % len(recipes)].recipeID}
+                for i, meal in enumerate(MEAL_TYPES)
+            ],
+        }
+        for day in range(weeks * 7)
+    ]
+
+
+def measure(create, payloads):
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        for payload in payloads:
+            create(payload)
+        elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, len(ctx.captured_queries)
+
+
+def run(stdout, repeat=5, **options):
+    with test_database():
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+        group = Group.objects.create(groupName='Benchmark')
+        recipes = [Recipe.objects.create(recipeName=f'Món {i}', description='', instruction='') for i in range(50)]
+
+        stdout.write(f"{'weeks':>6} {'meals':>6} {'legacy (ms)':>12} {'queries':>8} {'bulk (ms)':>10} {'queries':>8}")
+        for weeks in WEEKS:
+            results = {}
+            for name, create in (('legacy', legacy_create), ('bulk', bulk_create)):
+                best_ms, queries = float('inf'), 0
+                for run_index in range(repeat):
+                    payloads = make_payloads(weeks, group, user, recipes, f'{name} {weeks} {run_index}')
+                    elapsed, queries = measure(create, payloads)
+                    best_ms = min(best_ms, elapsed)
+                results[name] = (best_ms, queries)
+            stdout.write(
+                f'{weeks:>6} {weeks * 21:>6} {results["legacy"][0]:>12.1f} {results["legacy"][1]:>8} '
+                f'{results["bulk"][0]:>10.1f} {results["bulk"][1]:>8}'
+            )
@@ -0,0 +1,94 @@
+"""
+Tìm kiếm sản phẩm trên 100k bản ghi: icontains (LIKE '%...%') cũ so với index FTS5.
+Chạy trên SQLite in-memory với cùng schema và truy vấn như utils/product_search.
+"""
+import random
+import sqlite3
+import statistics
+import time
+
+from ..utils.product_search import CREATE_TABLE_SQL, INSERT_SQL, match_expression, search_sql
+from ..utils.text_normalize import normalize
+
+PRODUCT_COUNT = 100_000
+# Mục tiêu độ trễ p95 cho 1 truy vấn tìm kiếm
+TARGET_P95_MS = 50
+QUERIES = ('ca chua', 'Cà', 'sua tuoi', 'thit bo', 'rau', 'banh m', 'nuoc mam nam')
+
+WORDS = (
+    'Cà', 'chua', 'tím', 'rốt', 'pháo', 'Sữa', 'tươi', 'đặc', 'chua', 'Thịt', 'bò', 'heo', 'gà', 'vịt', 'Rau',
+    'muống', 'cải', 'ngót', 'dền', 'Bánh', 'mì', 'quy', 'phở', 'ngọt', 'Nước', 'mắm', 'tương', 'ngọt', 'Đậu',
+    'phụ', 'xanh', 'đen', 'Nam', 'Định', 'Đà', 'Lạt', 'Phú', 'Quốc', 'hữu', 'cơ', 'Cá', 'hồi', 'basa', 'thu',
+    'Tôm', 'sú', 'thẻ', 'Mực', 'ống', 'Trứng', 'cút', 'Gạo', 'tám', 'thơm', 'nếp', 'Bún', 'miến', 'Hành', 'lá',
+    'tây', 'Tỏi', 'Gừng', 'Ớt', 'Chanh', 'Cam', 'sành', 'Táo', 'Mỹ', 'Xoài', 'cát', 'Dưa', 'hấu', 'leo', 'Nấm',
+    'hương', 'kim', 'châm', 'Dầu', 'ăn', 'hào', 'Muối', 'Đường', 'Tiêu', 'Bơ', 'Phô', 'mai', 'Xúc', 'xích',
+    'gói', 'hộp', 'chai', 'túi', 'lon', 'khay', 'loại', '1', 'đông', 'lạnh', 'sạch', 'nhập', 'khẩu',
+)
+
+
+def make_products(n_products=PRODUCT_COUNT, seed=0):
+    rng = random.Random(seed)
+    return [
+        (product_id, ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))) + f' {product_id}', int(rng.random() < 0.05))
+        for product_id in range(1, n_products + 1)
+    ]
+
+
+def make_database(products):
+    db = sqlite3.connect(':memory:')
+    db.execute('CREATE TABLE api_productcatalog (productID INTEGER PRIMARY KEY, productName TEXT, isCustom BOOL)')
+    db.executemany('INSERT INTO api_productcatalog VALUES (?, ?, ?)', products)
+    db.execute(CREATE_TABLE_SQL)
+    db.executemany(
+        INSERT_SQL.replace('%s', '?'),
+        ((product_id, normalize(name), is_custom) for product_id, name, is_custom in products)
+    )
+    return db
+
+
+def like_search(db, query, limit=10):
+    """Cách cũ: productName__icontains, isCustom=False, order_by('productName')"""
+    return db.execute(
+        'SELECT productID FROM api_productcatalog WHERE productName LIKE ? AND isCustom = 0 ORDER BY productName LIMIT ?',
+        (f'%{query}%', limit)
+    ).fetchall()
+
+
+def fts_search(db, query, limit=10):
+    normalized = normalize(query)
+    return db.execute(
+        search_sql().replace('%s', '?'), (match_expression(query), normalized, normalized + '%', limit)
+    ).fetchall()
+
+
+def latencies(func, db, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            func(db, query)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+
+
+def run(stdout, repeat=5, **options):
+    start = time.perf_counter()
+    db = make_database(make_products())
+    stdout.write(f'Tạo {PRODUCT_COUNT} sản phẩm + index: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    stdout.write(f"{'query':>14} {'like':>6} {'fts':>6}")
+    for query in QUERIES:
+        stdout.write(f'{query:>14} {len(like_search(db, query)):>6} {len(fts_search(db, query)):>6}')
+
+    stdout.write(f"{'method':>8} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for name, func in (('like', like_search), ('fts', fts_search)):
+        samples = latencies(func, db, repeat)
+        stdout.write(f'{name:>8} {statistics.median(samples):>10.2f} {p95(samples):>10.2f}')
+        if name == 'fts':
+            verdict = 'OK' if p95(samples) <= TARGET_P95_MS else 'CHẬM'
+            stdout.write(f'fts p95 mục tiêu <= {TARGET_P95_MS} ms: {verdict}')
+    db.close()
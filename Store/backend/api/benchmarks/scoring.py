@@ -0,0 +1,68 @@
+"""So sánh vòng lặp set.intersection cũ với RecipeMatrix (NumPy)"""
+import random
+import time
+from datetime import date, timedelta
+
+from ..utils.fridge_scoring import COVERAGE, SCORING_MODES, FridgeVector, RecipeMatrix, rank
+
+RECIPE_COUNTS = (1_000, 10_000, 100_000)
+PRODUCT_COUNT = 5_000
+FRIDGE_SIZE = 40
+
+
+def make_recipes(n_recipes, n_products=PRODUCT_COUNT, seed=0):
+    rng = random.Random(seed)
+    return {
+        recipe_id: tuple(rng.sample(range(1, n_products + 1), rng.randint(3, 12)))
+        for recipe_id in range(1, n_recipes + 1)
+    }
+
+
+def make_fridge(n_products=PRODUCT_COUNT, seed=1):
+    rng = random.Random(seed)
+    today = date.today()
+    return [
+        (product_id, rng.randint(1, 5), today + timedelta(days=rng.randint(-2, 14)))
+        for product_id in rng.sample(range(1, n_products + 1), FRIDGE_SIZE)
+    ]
+
+
+def loop_scoring(recipe_products, fridge_items):
+    """Cách tính cũ của RecipeRecommendationView: set.intersection cho từng công thức"""
+    fridge_product_ids = set(product_id for product_id, _, _ in fridge_items)
+    results = []
+    for recipe_id, products in recipe_products.items():
+        recipe_ingredient_ids = set(products)
+        matching = recipe_ingredient_ids.intersection(fridge_product_ids)
+        total = len(recipe_ingredient_ids)
+        results.append((recipe_id, len(matching) / total * 100 if total else 0))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(stdout, repeat=5, **options):
+    fridge_items = make_fridge()
+    stdout.write(f"{'recipes':>8} {'loop (ms)':>10} {'build (ms)':>11} " + ' '.join(f'{m + " (ms)":>14}' for m in SCORING_MODES))
+    fridge = FridgeVector(fridge_items)
+    for n_recipes in RECIPE_COUNTS:
+        recipe_products = make_recipes(n_recipes)
+        loop_ms = timed(lambda: loop_scoring(recipe_products, fridge_items), repeat)
+        build_ms = timed(lambda: RecipeMatrix(recipe_products), 1)
+        matrix = RecipeMatrix(recipe_products)
+
+        # Kiểm tra 2 cách tính cho cùng số nguyên liệu khớp
+        matched, _ = matrix.score(fridge, COVERAGE)
+        expected = {rid: len(set(p) & {pid for pid, _, _ in fridge_items}) for rid, p in recipe_products.items()}
+        assert all(expected[int(rid)] == int(m) for rid, m in zip(matrix.recipe_ids, matched))
+
+        mode_ms = [timed(lambda: rank(matrix, fridge, mode), repeat) for mode in SCORING_MODES]
+        stdout.write(f'{n_recipes:>8} {loop_ms:>10.2f} {build_ms:>11.2f} ' + ' '.join(f'{ms:>14.2f}' for ms in mode_ms))
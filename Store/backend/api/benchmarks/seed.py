@@ -0,0 +1,281 @@
+"""
+Sinh dữ liệu với khối lượng gần giống thực tế cho benchmark endpoint:
+hàng nghìn sản phẩm, công thức, group, sản phẩm trong tủ lạnh và kế hoạch bữa ăn.
+
+Mọi bảng được ghi bằng bulk_create nên signal không chạy; các bảng dẫn xuất
+(index tìm kiếm, PurchaseRollup, FridgeStats, bucket hết hạn) được tính lại ở cuối.
+Dữ liệu sinh bằng random.Random(seed) nên 2 lần chạy cùng scale cho cùng kết quả.
+"""
+import random
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.add_to_list import AddToList
+from ..models.categories import Categories
+from ..models.favorite_recipe import FavoriteRecipe
+from ..models.fridge import Fridge
+from ..models.group import Group
+from ..models.have import Have
+from ..models.in_model import In
+from ..models.ingredient import Ingredient
+from ..models.meal_plan import MealPlan
+from ..models.product_catalog import ProductCatalog
+from ..models.recipe import Recipe
+from ..models.shopping_list import ShoppingList
+from ..models.user import User
+from ..utils import expiry_buckets, fridge_stats, product_search, purchase_rollup
+from ..utils.autocomplete import product_autocomplete
+from ..utils.recipe_index import recipe_index
+from ..utils.weekly_meal_plan import MEAL_TYPES, week_start
+
+# Khối lượng ở scale=1; số group, sản phẩm, công thức và số dòng của mỗi group đều nhân theo scale
+VOLUMES = {
+    'categories': 20,
+    'products': 5000,
+    'custom_products': 200,
+    'recipes': 2000,
+    'groups': 200,
+    'members_per_group': 3,
+    'fridge_items_per_group': 40,
+    'meal_plan_weeks': 4,
+    'lists_per_group': 20,
+    'items_per_list': 12,
+    'favorites_per_user': 20,
+}
+
+CATEGORY_NAMES = [
+    'Rau củ', 'Trái cây', 'Thịt', 'Hải sản', 'Trứng & sữa', 'Đồ khô', 'Gia vị', 'Đồ uống', 'Bánh mì', 'Đồ đông lạnh',
+    'Ngũ cốc', 'Đậu & hạt', 'Nước chấm', 'Mì & bún', 'Đồ hộp', 'Bánh kẹo', 'Dầu ăn', 'Nấm', 'Thảo mộc', 'Khác',
+]
+PRODUCT_NAMES = [
+    'Cà chua', 'Cà rốt', 'Khoai tây', 'Hành tây', 'Tỏi', 'Gừng', 'Rau muống', 'Cải thảo', 'Bắp cải', 'Dưa leo',
+    'Thịt bò', 'Thịt heo', 'Thịt gà', 'Sườn non', 'Cá hồi', 'Cá thu', 'Tôm sú', 'Mực ống', 'Trứng gà', 'Sữa tươi',
+    'Đậu phụ', 'Nấm rơm', 'Nấm hương', 'Chuối', 'Táo', 'Cam', 'Xoài', 'Gạo tẻ', 'Bún tươi', 'Nước mắm',
+]
+VARIANTS = ['', 'bi', 'Đà Lạt', 'hữu cơ', 'nhập khẩu', 'tươi', 'loại 1', 'đông lạnh', 'sạch', 'miền Tây']
+UNITS = ['kg', 'g', 'quả', 'bó', 'hộp', 'chai', 'gói']
+RECIPE_NAMES = [
+    'Canh chua', 'Thịt kho', 'Gà xào sả ớt', 'Bò lúc lắc', 'Cá kho tộ', 'Rau xào tỏi', 'Phở bò', 'Bún chả',
+    'Trứng chiên', 'Sườn xào chua ngọt', 'Tôm rim', 'Mực xào', 'Lẩu thái', 'Cơm chiên', 'Đậu sốt cà chua',
+]
+
+# Kết quả của seed(): khối lượng đã tạo và các đối tượng dùng làm tham số request
+Dataset = namedtuple('Dataset', ['counts', 'user', 'group', 'fridge', 'shopping_list', 'item', 'meal_plan', 'recipe'])
+
+
+def scaled(name, scale):
+    return max(1, round(VOLUMES[name] * scale))
+
+
+def make_products(rng, count, categories, is_custom=False):
+    products = []
+    for i in range(count):
+        base = PRODUCT_NAMES[i % len(PRODUCT_NAMES)]
+        variant = VARIANTS[(i // len(PRODUCT_NAMES)) % len(VARIANTS)]
+        price = Decimal(rng.randrange(5, 500) * 1000)
+        products.append(ProductCatalog(
+            productName=' '.join(part for part in (base, variant, str(i)) if part),
+            original_price=price,
+            price=price,
+            unit=rng.choice(UNITS),
+            shelfLife=rng.randint(2, 60),
+            isCustom=is_custom,
+            category=rng.choice(categories),
+        ))
+    return ProductCatalog.objects.bulk_create(products, batch_size=1000)
+
+
+def make_recipes(rng, count, products):
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            recipeName=f'{RECIPE_NAMES[i % len(RECIPE_NAMES)]} {i}',
+            description='Món ăn gia đình',
+            instruction='Sơ chế nguyên liệu, nấu chín và nêm nếm vừa ăn.',
+        )
+        for i in range(count)
+    ], batch_size=1000)
+    Ingredient.objects.bulk_create([
+        Ingredient(recipe=recipe, product=product)
+        for recipe in recipes
+        for product in rng.sample(products, min(len(products), rng.randint(4, 10)))
+    ], batch_size=2000)
+    return recipes
+
+
+def make_groups(rng, scale, prefix):
+    """Mỗi group có 1 tủ lạnh và vài thành viên; người dùng đầu tiên của group là người tạo"""
+    password = make_password('bench')
+    group_count = scaled('groups', scale)
+    members = VOLUMES['members_per_group']
+    users = User.objects.bulk_create([
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', name=f'Thành viên {i}', password=password)
+        for i in range(group_count * members)
+    ], batch_size=1000)
+    groups = Group.objects.bulk_create([
+        Group(groupName=f'Gia đình {prefix}{i}', createdBy=users[i * members])
+        for i in range(group_count)
+    ], batch_size=1000)
+    In.objects.bulk_create([
+        In(user=users[i * members + j], group=group)
+        for i, group in enumerate(groups)
+        for j in range(members)
+    ], batch_size=1000)
+    fridges = Fridge.objects.bulk_create([Fridge(group=group) for group in groups], batch_size=1000)
+    return users, groups, fridges
+
+
+def make_fridge_items(rng, scale, fridges, products, today):
+    count = min(len(products), scaled('fridge_items_per_group', scale))
+    AddToFridge.objects.bulk_create([
+        AddToFridge(
+            fridge=fridge,
+            product=product,
+            quantity=rng.randint(1, 5),
+            location=rng.choice(AddToFridge.LocationType.values),
+            # Khoảng 1/5 đã hết hạn, phần còn lại rải đều trong 1 tháng tới
+            expiredDate=today + timedelta(days=rng.randint(-7, 30)),
+        )
+        for fridge in fridges
+        for product in rng.sample(products, count)
+    ], batch_size=2000)
+
+
+def make_meal_plans(rng, scale, groups, members, recipes, today):
+    """3 bữa mỗi ngày trong các tuần quanh tuần hiện tại, mỗi bữa 1-2 món"""
+    weeks = scaled('meal_plan_weeks', scale)
+    first_day = week_start(today) - timedelta(weeks=weeks // 2)
+    plans = MealPlan.objects.bulk_create([
+        MealPlan(
+            plan_name=f'Tuần {day // 7 + 1}',
+            start_date=first_day + timedelta(days=day),
+            mealType=meal_type,
+            day_of_week=day % 7,
+            group=group,
+            user=members[group.groupID],
+        )
+        for group in groups
+        for day in range(weeks * 7)
+        for meal_type in MEAL_TYPES
+    ], batch_size=2000)
+    Have.objects.bulk_create([
+        Have(plan=plan, recipe=recipe)
+        for plan in plans
+        for recipe in rng.sample(recipes, min(len(recipes), rng.randint(1, 2)))
+    ], batch_size=2000)
+    return plans
+
+
+def make_shopping_lists(rng, scale, groups, members, products, today):
+    """Danh sách cũ đã mua gần hết, danh sách gần đây còn nhiều món chờ mua"""
+    list_count = scaled('lists_per_group', scale)
+    item_count = min(len(products), scaled('items_per_list', scale))
+    lists = ShoppingList.objects.bulk_create([
+        ShoppingList(
+            listName=f'Đi chợ {i + 1}',
+            date=today - timedelta(days=(list_count - i) * 3),
+            group=group,
+            user=members[group.groupID],
+            type=rng.choice(ShoppingList.ListType.values),
+        )
+        for group in groups
+        for i in range(list_count)
+    ], batch_size=2000)
+    now = timezone.now()
+    items = []
+    for position, shopping_list in enumerate(lists):
+        age = list_count - position % list_count
+        for product in rng.sample(products, item_count):
+            purchased = rng.random() < min(0.9, age / list_count + 0.2)
+            items.append(AddToList(
+                list=shopping_list,
+                product=product,
+                quantity=rng.randint(1, 4),
+                status=AddToList.ListStatus.PURCHASED if purchased else AddToList.ListStatus.PENDING,
+                purchased_at=now - timedelta(days=age * 3) if purchased else None,
+                unit_price=product.price if purchased else None,
+                purchased_category_id=product.category_id if purchased else None,
+            ))
+    AddToList.objects.bulk_create(items, batch_size=2000)
+    return lists
+
+
+def make_favorites(rng, scale, users, recipes):
+    count = min(len(recipes), scaled('favorites_per_user', scale))
+    FavoriteRecipe.objects.bulk_create([
+        FavoriteRecipe(user=user, recipe=recipe)
+        for user in users
+        for recipe in rng.sample(recipes, count)
+    ], batch_size=2000)
+
+
+def rebuild_derived(fridges, today):
+    """bulk_create bỏ qua signal: tính lại các bảng dẫn xuất và bỏ index/cache trong bộ nhớ"""
+    product_search.rebuild()
+    purchase_rollup.rebuild()
+    expiry_buckets.sweep(today)
+    for fridge in fridges:
+        fridge_stats.refresh_stats(fridge.fridgeID, today)
+    recipe_index.reset()
+    product_autocomplete.reset()
+    cache.clear()
+
+
+def seed(scale=1.0, seed=0):
+    """
+    Tạo bộ dữ liệu theo VOLUMES * scale và trả về Dataset. Có thể gọi nhiều lần trên
+    cùng database (tên người dùng có tiền tố riêng), group của lần gọi sau là group mới.
+    """
+    rng = random.Random(seed)
+    today = timezone.localdate()
+    prefix = f'bench{User.objects.count()}_'
+
+    with transaction.atomic():
+        categories = Categories.objects.bulk_create([
+            Categories(categoryName=CATEGORY_NAMES[i % len(CATEGORY_NAMES)])
+            for i in range(scaled('categories', scale))
+        ])
+        products = make_products(rng, scaled('products', scale), categories)
+        make_products(rng, scaled('custom_products', scale), categories, is_custom=True)
+        recipes = make_recipes(rng, scaled('recipes', scale), products)
+        users, groups, fridges = make_groups(rng, scale, prefix)
+        # Người tạo group là người lập kế hoạch/danh sách của group đó
+        creators = {group.groupID: group.createdBy for group in groups}
+        make_fridge_items(rng, scale, fridges, products, today)
+        plans = make_meal_plans(rng, scale, groups, creators, recipes, today)
+        lists = make_shopping_lists(rng, scale, groups, creators, products, today)
+        make_favorites(rng, scale, users, recipes)
+
+    rebuild_derived(fridges, today)
+
+    group = groups[0]
+    shopping_list = lists[scaled('lists_per_group', scale) - 1]
+    counts = {
+        'categories': len(categories),
+        'products': ProductCatalog.objects.count(),
+        'recipes': Recipe.objects.count(),
+        'ingredients': Ingredient.objects.count(),
+        'users': User.objects.count(),
+        'groups': Group.objects.count(),
+        'fridge_items': AddToFridge.objects.count(),
+        'meal_plans': MealPlan.objects.count(),
+        'shopping_lists': ShoppingList.objects.count(),
+        'shopping_list_items': AddToList.objects.count(),
+        'favorite_recipes': FavoriteRecipe.objects.count(),
+    }
+    return Dataset(
+        counts=counts,
+        user=group.createdBy,
+        group=group,
+        fridge=fridges[0],
+        shopping_list=shopping_list,
+        item=AddToList.objects.filter(list=shopping_list).order_by('id').first(),
+        meal_plan=next(plan for plan in plans if plan.start_date == week_start(today)),
+        recipe=recipes[0],
+    )
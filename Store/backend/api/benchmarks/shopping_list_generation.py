@@ -0,0 +1,108 @@
+"""
+Tạo shopping list từ kế hoạch bữa ăn 1 tháng (30 ngày x 3 bữa x 2 món):
+cách chép tay (duyệt từng plan -> món -> nguyên liệu, kiểm tra tủ lạnh/danh sách
+từng sản phẩm) so với generate_shopping_list (GROUP BY + bulk_create).
+"""
+import random
+import time
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.add_to_list import AddToList
+from ..models.fridge import Fridge
+from ..models.group import Group
+from ..models.have import Have
+from ..models.ingredient import Ingredient
+from ..models.meal_plan import MealPlan
+from ..models.product_catalog import ProductCatalog
+from ..models.recipe import Recipe
+from ..models.shopping_list import ShoppingList
+from ..models.user import User
+from ..utils.shopping_list_generator import generate_shopping_list
+from .database import test_database
+
+DAYS = 30
+RECIPES_PER_MEAL = 2
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+
+
+def naive_generate(group, user, start, end):
+    """Cách làm tay: từng plan, từng món, từng nguyên liệu"""
+    needed = {}
+    for plan in MealPlan.objects.filter(group=group, start_date__range=(start, end)):
+        for have in Have.objects.filter(plan=plan):
+            for ingredient in Ingredient.objects.filter(recipe_id=have.recipe_id):
+                if ingredient.product_id:
+                    needed[ingredient.product_id] = needed.get(ingredient.product_id, 0) + 1
+    shopping_list = ShoppingList.objects.create(listName='Naive', date=start, group=group, user=user, type='week')
+    for product_id, uses in needed.items():
+        fridge_item = AddToFridge.objects.filter(fridge__group=group, product_id=product_id, expiredDate__gte=start).first()
+        pending = sum(
+            item.quantity for item in
+            AddToList.objects.filter(list__group=group, status='pending', product_id=product_id).exclude(list=shopping_list)
+        )
+        quantity = uses - (fridge_item.quantity if fridge_item else 0) - pending
+        if quantity > 0:
+            AddToList.objects.create(list=shopping_list, product_id=product_id, quantity=quantity, status='pending')
+    return shopping_list
+
+
+def seed(rng):
+    user = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+    group = Group.objects.create(groupName='Benchmark')
+    products = [
+        ProductCatalog.objects.create(productName=f'Sản phẩm {i}', original_price=10, unit='kg', shelfLife=7)
+        for i in range(300)
+    ]
+    recipes = [Recipe.objects.create(recipeName=f'Món {i}', description='', instruction='') for i in range(120)]
+    Ingredient.objects.bulk_create([
+        Ingredient(recipe=recipe, product=product)
+        for recipe in recipes for product in rng.sample(products, rng.randint(4, 10))
+    ])
+    start = date(2025, 6, 1)
+    fridge = Fridge.objects.create(group=group)
+    AddToFridge.objects.bulk_create([
+        AddToFridge(fridge=fridge, product=product, quantity=rng.randint(1, 3), expiredDate=start + timedelta(days=rng.randint(-3, 20)))
+        for product in rng.sample(products, 40)
+    ])
+    for day in range(DAYS):
+        plans = MealPlan.objects.bulk_create([
+            MealPlan(plan_name='Tháng', start_date=start + timedelta(days=day), mealType=meal,
+                     day_of_week=(start + timedelta(days=day)).weekday(), group=group, user=user)
+            for meal in MEAL_TYPES
+        ])
+        Have.objects.bulk_create([
+            Have(plan=plan, recipe=recipe) for plan in plans for recipe in rng.sample(recipes, RECIPES_PER_MEAL)
+        ])
+    return group, user, start, start + timedelta(days=DAYS - 1)
+
+
+def measure(func, repeat):
+    best, queries, items = float('inf'), 0, 0
+    for _ in range(repeat):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                shopping_list = func()
+                best = min(best, (time.perf_counter() - start) * 1000)
+            queries = len(ctx.captured_queries)
+            items = AddToList.objects.filter(list=shopping_list).count() if shopping_list else 0
+            # Bỏ danh sách vừa tạo để lần chạy sau có cùng dữ liệu đầu vào
+            transaction.set_rollback(True)
+    return best, queries, items
+
+
+def run(stdout, repeat=5, **options):
+    with test_database():
+        group, user, start, end = seed(random.Random(0))
+        stdout.write(f'{DAYS} ngày, {MealPlan.objects.count()} kế hoạch, {Have.objects.count()} món')
+        stdout.write(f"{'method':>8} {'ms':>8} {'queries':>8} {'items':>6}")
+        for name, func in (
+            ('naive', lambda: naive_generate(group, user, start, end)),
+            ('bulk', lambda: generate_shopping_list(group.groupID, user, start, end)[0]),
+        ):
+            ms, queries, items = measure(func, repeat)
+            stdout.write(f'{name:>8} {ms:>8.1f} {queries:>8} {items:>6}')
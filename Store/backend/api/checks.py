@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Các backend chỉ sống trong 1 process, mỗi worker có 1 bản riêng
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Version token (ETag/304), cache gợi ý, lịch tuần và autocomplete cần cache dùng chung:
+    với cache riêng từng process, thay đổi ghi ở 1 worker không làm các worker khác đổi version.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            f'Cache mặc định ({backend}) chỉ dùng được khi chạy 1 process.',
+            hint='Đặt REDIS_URL để các worker dùng chung cache (version/ETag, cache gợi ý, lịch tuần).',
+            id='api.W001',
+        )]
+    return []
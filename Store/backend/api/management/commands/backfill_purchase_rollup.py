@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ...utils import purchase_rollup
+
+
+class Command(BaseCommand):
+    help = 'Tính lại bảng PurchaseRollup (thống kê đã mua theo group, ngày, danh mục) và tổng tiền của từng danh sách từ AddToList. Dùng lần đầu sau migration hoặc sau khi import dữ liệu hàng loạt'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, help='Chỉ tính lại cho 1 group')
+
+    def handle(self, *args, **options):
+        group_id = options.get('group')
+        filled = purchase_rollup.backfill_purchases(group_id)
+        if filled:
+            self.stdout.write(f'Đã gán thời điểm và giá lúc mua cho {filled} item (theo ngày của danh sách, giá hiện tại)')
+        count = purchase_rollup.rebuild(group_id)
+        self.stdout.write(self.style.SUCCESS(f'Đã tạo {count} dòng rollup'))
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from ...models.add_to_fridge import AddToFridge
+from ...models.add_to_list import AddToList
+from ...models.meal_plan import MealPlan
+from ...models.password_otp import PasswordResetOTP
+from ...models.product_catalog import ProductCatalog
+from ...models.purchase_rollup import PurchaseRollup
+from ...models.shopping_list import ShoppingList
+from ...utils import query_plans
+from ...utils.purchase_rollup import day_range_filter
+from ...views.shopping_list_view import with_summary
+
+
+def canonical_queries():
+    """(tên, queryset) của các truy vấn nóng, viết giống hệt cách view/utils tạo ra"""
+    today = date.today()
+    return [
+        ('fridge.items', AddToFridge.objects.filter(fridge_id=1).select_related('product', 'product__category')),
+        ('fridge.expiring', AddToFridge.objects.filter(fridge_id=1, expiredDate__lte=today + timedelta(days=3))),
+        ('shopping_list.page', with_summary(ShoppingList.objects.filter(group=1)).order_by('-createdAt', '-listID')[:21]),
+        ('shopping_list.items', AddToList.objects.filter(list_id=1).select_related('product__category').order_by('id')),
+        ('shopping_list.purchased', AddToList.objects.filter(list_id=1, status=AddToList.ListStatus.PURCHASED)),
+        ('shopping_list.pending_by_group', (
+            AddToList.objects
+            .filter(list__group_id=1, status=AddToList.ListStatus.PENDING, product_id__in=[1, 2, 3])
+            .values('product_id').annotate(total=Sum('quantity')).order_by()
+        )),
+        ('purchase_stats.range', PurchaseRollup.objects.filter(day_range_filter(today - timedelta(days=30), today), group_id=1)),
+        ('meal_plan.week', MealPlan.objects.filter(group_id=1, start_date__range=(today, today + timedelta(days=6))).order_by('created_at', 'planID')),
+        ('meal_plan.list', MealPlan.objects.filter(group_id=1).order_by('-created_at')),
+        ('password_reset.verify', PasswordResetOTP.objects.filter(email='a@example.com', otp='123456', is_used=False).order_by('-created_at')[:1]),
+        ('product.catalog_by_name', ProductCatalog.objects.filter(isCustom=False).order_by('productName')[:10]),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Chạy EXPLAIN QUERY PLAN cho các truy vấn nóng của view, lỗi nếu truy vấn nào quét toàn bộ bảng (mất index)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plan', action='store_true', help='In toàn bộ plan của từng truy vấn')
+
+    def handle(self, *args, **options):
+        if not query_plans.is_available():
+            self.stdout.write(self.style.WARNING('Chỉ hỗ trợ SQLite (EXPLAIN QUERY PLAN), bỏ qua'))
+            return
+        tables = connection.introspection.table_names()
+        regressions = []
+        for name, queryset in canonical_queries():
+            details = query_plans.explain(queryset)
+            found = query_plans.scans(details, tables)
+            if found:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f'{name}: {"; ".join(found)}'))
+            else:
+                self.stdout.write(f'{name}: OK')
+            if options['verbose_plan']:
+                for detail in details:
+                    self.stdout.write(f'    {detail}')
+        if regressions:
+            raise CommandError(f"Truy vấn quét toàn bộ bảng: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS('Tất cả truy vấn đều dùng index'))
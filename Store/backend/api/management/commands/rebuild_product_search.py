@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...utils import product_search
+
+
+class Command(BaseCommand):
+    help = 'Xây lại index tìm kiếm sản phẩm (FTS5, không phân biệt dấu) từ ProductCatalog. Dùng sau khi import dữ liệu hàng loạt (bulk_create không gọi signal)'
+
+    def handle(self, *args, **options):
+        if not product_search.is_available():
+            self.stdout.write(self.style.WARNING('Database không phải SQLite, tìm kiếm dùng icontains nên không cần index'))
+            return
+        count = product_search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Đã index {count} sản phẩm'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = 'Chạy các benchmark hiệu năng (xem api/benchmarks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Tên benchmark: {', '.join(BENCHMARKS)} (mặc định: tất cả)")
+        parser.add_argument('--repeat', type=int, default=5, help='Số lần lặp, lấy thời gian tốt nhất')
+        parser.add_argument('--scale', type=float, default=1.0, help='Hệ số khối lượng dữ liệu sinh ra (endpoints)')
+        parser.add_argument('--output', help='Ghi báo cáo JSON ra file này (endpoints)')
+        parser.add_argument('--baseline', help='Báo cáo JSON cũ để so sánh, lỗi nếu số truy vấn tăng (endpoints)')
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(BENCHMARKS)
+        for name in names:
+            if name not in BENCHMARKS:
+                raise CommandError(f"Không có benchmark '{name}'. Chọn một trong: {', '.join(BENCHMARKS)}")
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {name} =='))
+            BENCHMARKS[name](
+                self.stdout, repeat=options['repeat'], scale=options['scale'],
+                output=options['output'], baseline=options['baseline'],
+            )
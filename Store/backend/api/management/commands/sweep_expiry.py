@@ -0,0 +1,16 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from ...utils import expiry_buckets
+
+
+class Command(BaseCommand):
+    help = 'Tính lại bảng FridgeExpiryBucket (đã hết hạn, hôm nay, ngày mai, trong 3 ngày) cho mọi tủ lạnh. Chạy mỗi ngày một lần (vd: cron 0 0 * * *)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None, help='Ngày tính (YYYY-MM-DD), mặc định hôm nay')
+
+    def handle(self, *args, **options):
+        fridge_count = expiry_buckets.sweep(options['date'])
+        self.stdout.write(self.style.SUCCESS(f'Đã cập nhật bucket hạn sử dụng cho {fridge_count} tủ lạnh'))
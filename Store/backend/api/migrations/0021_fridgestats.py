@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_mealplan_recipes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FridgeStats',
+            fields=[
+                ('fridge', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.fridge')),
+                ('total_products', models.IntegerField(default=0)),
+                ('expired_products', models.IntegerField(default=0)),
+                ('expiring_soon_products', models.IntegerField(default=0)),
+                ('popular_categories', models.JSONField(default=list)),
+                ('as_of', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_fridgestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FridgeExpiryBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('expired', 'Đã hết hạn'), ('today', 'Hết hạn hôm nay'), ('tomorrow', 'Hết hạn ngày mai'), ('soon', 'Hết hạn trong 3 ngày')], max_length=10)),
+                ('item_count', models.IntegerField(default=0)),
+                ('as_of', models.DateField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='addtofridge',
+            index=models.Index(fields=['fridge', 'expiredDate'], name='atf_fridge_expired_idx'),
+        ),
+        migrations.AddField(
+            model_name='fridgeexpirybucket',
+            name='fridge',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiry_buckets', to='api.fridge'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='fridgeexpirybucket',
+            unique_together={('fridge', 'bucket')},
+        ),
+    ]
@@ -0,0 +1,50 @@
+import unicodedata
+
+from django.db import migrations
+
+
+def normalize(text):
+    # Bản sao api.utils.text_normalize.normalize tại thời điểm viết migration
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+    return ' '.join(text.lower().split())
+
+
+# Bảng FTS5 chứa tên sản phẩm đã bỏ dấu (rowid = productID).
+# prefix='2 3' để truy vấn gõ dở ("ca* ch*") dùng index tiền tố thay vì quét.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS api_product_search "
+    "USING fts5(name, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    ProductCatalog = apps.get_model('api', 'ProductCatalog')
+    rows = [
+        (product_id, normalize(product_name))
+        for product_id, product_name in ProductCatalog.objects.values_list('productID', 'productName')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.executemany('INSERT INTO api_product_search(rowid, name) VALUES (%s, %s)', rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS api_product_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_fridgeexpirybucket_addtofridge_expiry_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:50
+
+from datetime import datetime, time
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_rollup(apps, schema_editor):
+    # Item đã mua trước migration lấy 0h ngày của danh sách làm thời điểm mua
+    AddToList = apps.get_model('api', 'AddToList')
+    PurchaseRollup = apps.get_model('api', 'PurchaseRollup')
+    items = list(AddToList.objects.filter(status='purchased').select_related('list'))
+    for item in items:
+        item.purchased_at = timezone.make_aware(datetime.combine(item.list.date, time.min))
+    AddToList.objects.bulk_update(items, ['purchased_at'], batch_size=1000)
+
+    rows = (
+        AddToList.objects.filter(status='purchased')
+        .annotate(day=TruncDate('purchased_at'))
+        .values('list__group_id', 'day', 'product__category_id')
+        .annotate(item_count=Count('id'), total_quantity=Sum('quantity'))
+        .order_by()
+    )
+    PurchaseRollup.objects.bulk_create([
+        PurchaseRollup(
+            group_id=row['list__group_id'], day=row['day'], category_id=row['product__category_id'],
+            item_count=row['item_count'], total_quantity=row['total_quantity'] or 0,
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addtolist',
+            name='purchased_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PurchaseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('item_count', models.IntegerField(default=0)),
+                ('total_quantity', models.FloatField(default=0)),
+                ('category', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.categories')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_rollups', to='api.group')),
+            ],
+            options={
+                'unique_together': {('group', 'day', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def snapshot_prices(apps, schema_editor):
+    # Item đã mua trước migration: giá hiện tại của sản phẩm là giá tốt nhất còn biết
+    AddToList = apps.get_model('api', 'AddToList')
+    PurchaseRollup = apps.get_model('api', 'PurchaseRollup')
+    ShoppingList = apps.get_model('api', 'ShoppingList')
+    items = list(AddToList.objects.filter(status='purchased').select_related('list', 'product'))
+    cells = defaultdict(Decimal)
+    list_spent = defaultdict(Decimal)
+    for item in items:
+        item.unit_price = item.product.price
+        amount = (Decimal(repr(item.quantity)) * item.unit_price).quantize(Decimal('0.01'))
+        cells[(item.list.group_id, timezone.localdate(item.purchased_at), item.product.category_id)] += amount
+        list_spent[item.list_id] += amount
+    AddToList.objects.bulk_update(items, ['unit_price'], batch_size=1000)
+
+    rollups = list(PurchaseRollup.objects.all())
+    for rollup in rollups:
+        rollup.total_spent = cells.get((rollup.group_id, rollup.day, rollup.category_id), 0)
+    PurchaseRollup.objects.bulk_update(rollups, ['total_spent'], batch_size=1000)
+    ShoppingList.objects.bulk_update(
+        [ShoppingList(listID=list_id, total_spent=amount) for list_id, amount in list_spent.items()],
+        ['total_spent'], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_purchase_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addtolist',
+            name='unit_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='purchaserollup',
+            name='total_spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='total_spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.RunPython(snapshot_prices, migrations.RunPython.noop),
+    ]
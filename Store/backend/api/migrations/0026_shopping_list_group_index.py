@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_purchase_price_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shoppinglist',
+            index=models.Index(fields=['group', '-createdAt', '-listID'], name='shoppinglist_group_created'),
+        ),
+    ]
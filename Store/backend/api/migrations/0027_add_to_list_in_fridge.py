@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_shopping_list_group_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addtolist',
+            name='in_fridge',
+            field=models.BooleanField(default=False),
+        ),
+    ]
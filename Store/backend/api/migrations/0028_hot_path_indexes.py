@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_add_to_list_in_fridge'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='addtolist',
+            index=models.Index(fields=['list', 'status'], name='atl_list_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mealplan',
+            index=models.Index(fields=['group', 'start_date'], name='mealplan_group_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetotp',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['email', 'otp', '-created_at'], name='otp_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productcatalog',
+            index=models.Index(condition=models.Q(('isCustom', False)), fields=['productName'], name='product_catalog_name_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+import unicodedata
+
+from django.db import migrations
+
+
+def normalize(text):
+    # Bản sao api.utils.text_normalize.normalize tại thời điểm viết migration
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+    return ' '.join(text.lower().split())
+
+
+# Thêm cột is_custom (UNINDEXED) vào bảng FTS5 để lọc sản phẩm tự tạo trước khi
+# giới hạn số ứng viên. Bảng ảo không ALTER được nên tạo lại và nạp lại dữ liệu.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE api_product_search "
+    "USING fts5(name, is_custom UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+OLD_CREATE_SQL = (
+    "CREATE VIRTUAL TABLE api_product_search "
+    "USING fts5(name, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+
+def recreate(apps, schema_editor, create_sql, with_custom):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    ProductCatalog = apps.get_model('api', 'ProductCatalog')
+    rows = [
+        (product_id, normalize(product_name), int(is_custom)) if with_custom else (product_id, normalize(product_name))
+        for product_id, product_name, is_custom in ProductCatalog.objects.values_list('productID', 'productName', 'isCustom')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS api_product_search')
+        cursor.execute(create_sql)
+        if with_custom:
+            cursor.executemany('INSERT INTO api_product_search(rowid, name, is_custom) VALUES (%s, %s, %s)', rows)
+        else:
+            cursor.executemany('INSERT INTO api_product_search(rowid, name) VALUES (%s, %s)', rows)
+
+
+def add_is_custom(apps, schema_editor):
+    recreate(apps, schema_editor, CREATE_SQL, with_custom=True)
+
+
+def remove_is_custom(apps, schema_editor):
+    recreate(apps, schema_editor, OLD_CREATE_SQL, with_custom=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_is_custom, remove_is_custom),
+    ]
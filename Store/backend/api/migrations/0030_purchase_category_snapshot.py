@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_categories(apps, schema_editor):
+    # Rollup hiện có được cộng theo danh mục hiện tại của sản phẩm, lưu đúng giá trị đó
+    AddToList = apps.get_model('api', 'AddToList')
+    items = list(AddToList.objects.filter(status='purchased').select_related('product'))
+    for item in items:
+        item.purchased_category_id = item.product.category_id
+    AddToList.objects.bulk_update(items, ['purchased_category'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_product_search_is_custom'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addtolist',
+            name='purchased_category',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.categories'),
+        ),
+        migrations.RunPython(snapshot_categories, migrations.RunPython.noop),
+    ]
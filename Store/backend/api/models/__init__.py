@@ -4,7 +4,10 @@ from .categories import Categories
 from .product_catalog import ProductCatalog
 from .add_to_fridge import AddToFridge
 from .fridge import Fridge
+from .fridge_stats import FridgeStats
+from .fridge_expiry_bucket import FridgeExpiryBucket
 from .add_to_list import AddToList
+from .purchase_rollup import PurchaseRollup
 from .recipe import Recipe
 from .shopping_list import ShoppingList
 from .meal_plan import MealPlan
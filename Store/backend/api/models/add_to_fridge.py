@@ -20,3 +20,7 @@ class AddToFridge(models.Model):
 
     class Meta:
         unique_together = ('fridge', 'product')
+        indexes = [
+            # Thông báo hết hạn: lọc theo tủ lạnh rồi theo ngày hết hạn
+            models.Index(fields=['fridge', 'expiredDate'], name='atf_fridge_expired_idx'),
+        ]
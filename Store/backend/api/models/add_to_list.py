@@ -1,6 +1,8 @@
 from django.db import models
+from django.utils import timezone
 from .shopping_list import ShoppingList
 from .product_catalog import ProductCatalog
+from .categories import Categories
 
 class AddToList(models.Model):
     class ListStatus(models.TextChoices):
@@ -11,9 +13,64 @@ class AddToList(models.Model):
     product = models.ForeignKey(ProductCatalog, on_delete=models.CASCADE)
     quantity = models.FloatField()
     status = models.CharField(max_length=10, choices=ListStatus.choices)
+    purchased_at = models.DateTimeField(null=True, blank=True)  # Thời điểm chuyển sang đã mua
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # Giá sản phẩm lúc mua
+    # Danh mục của sản phẩm lúc mua: đổi danh mục sau đó không làm lệch PurchaseRollup khi bỏ mua
+    purchased_category = models.ForeignKey(
+        Categories, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    in_fridge = models.BooleanField(default=False)  # Đã được đưa vào tủ lạnh (apply_purchases)
 
     class Meta:
         unique_together = ('list', 'product')
+        indexes = [
+            # Tiến độ/thống kê của 1 danh sách và các item đang chờ mua của group
+            # (lọc group qua ShoppingList, rồi tới index này theo list)
+            models.Index(fields=['list', 'status'], name='atl_list_status_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Trạng thái mua lúc đọc từ database, dùng để tính phần thay đổi cho PurchaseRollup
+        if not instance.get_deferred_fields():
+            instance._loaded_purchase = instance.purchase_state()
+        return instance
+
+    def purchase_state(self):
+        """(list_id, product_id, purchased_at, quantity, unit_price, category_id) nếu đã mua, ngược lại None"""
+        if self.status != self.ListStatus.PURCHASED:
+            return None
+        return (
+            self.list_id, self.product_id, self.purchased_at, self.quantity, self.unit_price,
+            self.purchased_category_id,
+        )
+
+    def sync_purchase(self):
+        """
+        Ghi lại thời điểm, giá và danh mục lúc chuyển sang đã mua, xóa khi quay về chưa mua
+        (kể cả in_fridge, để lần mua lại được apply_purchases đưa vào tủ lạnh).
+        Giá và danh mục lấy từ self.product nên nên select_related('product') khi xử lý nhiều item.
+        """
+        if self.status == self.ListStatus.PURCHASED:
+            if self.purchased_at is None:
+                self.purchased_at = timezone.now()
+            if self.unit_price is None:
+                self.unit_price = self.product.price
+            if self.purchased_category_id is None:
+                self.purchased_category_id = self.product.category_id
+        else:
+            self.purchased_at = None
+            self.unit_price = None
+            self.purchased_category = None
+            self.in_fridge = False
+
+    def save(self, *args, **kwargs):
+        self.sync_purchase()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'purchased_at', 'unit_price', 'purchased_category', 'in_fridge'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'{self.product.productName} - {self.status}'
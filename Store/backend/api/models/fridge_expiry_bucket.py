@@ -0,0 +1,21 @@
+from django.db import models
+from .fridge import Fridge
+
+class FridgeExpiryBucket(models.Model):
+    """Số sản phẩm của tủ lạnh theo từng mốc hạn sử dụng, được sweep lại mỗi ngày"""
+    class Bucket(models.TextChoices):
+        EXPIRED = 'expired', 'Đã hết hạn'
+        TODAY = 'today', 'Hết hạn hôm nay'
+        TOMORROW = 'tomorrow', 'Hết hạn ngày mai'
+        SOON = 'soon', 'Hết hạn trong 3 ngày'
+
+    fridge = models.ForeignKey(Fridge, on_delete=models.CASCADE, related_name='expiry_buckets')
+    bucket = models.CharField(max_length=10, choices=Bucket.choices)
+    item_count = models.IntegerField(default=0)
+    as_of = models.DateField()  # Ngày sweep
+
+    class Meta:
+        unique_together = ('fridge', 'bucket')
+
+    def __str__(self):
+        return f'{self.fridge_id} - {self.bucket}: {self.item_count}'
@@ -0,0 +1,23 @@
+from django.db import models
+from .fridge import Fridge
+
+class FridgeStats(models.Model):
+    """Thống kê tủ lạnh được tính sẵn, cập nhật mỗi khi AddToFridge thay đổi"""
+    fridge = models.OneToOneField(Fridge, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_products = models.IntegerField(default=0)
+    expired_products = models.IntegerField(default=0)
+    expiring_soon_products = models.IntegerField(default=0)
+    popular_categories = models.JSONField(default=list)
+    as_of = models.DateField(null=True, blank=True)  # Ngày tính các số liệu theo hạn sử dụng
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def as_dict(self):
+        return {
+            "total_products": self.total_products,
+            "expired_products": self.expired_products,
+            "expiring_soon_products": self.expiring_soon_products,
+            "popular_categories": self.popular_categories,
+        }
+
+    def __str__(self):
+        return f'Thống kê tủ lạnh {self.fridge_id}'
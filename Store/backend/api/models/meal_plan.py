@@ -20,6 +20,10 @@ class MealPlan(models.Model):
 
     class Meta:
         unique_together = [['plan_name', 'day_of_week', 'mealType', 'group', 'start_date']]
+        indexes = [
+            # Lịch tuần và tạo danh sách mua sắm: kế hoạch của group trong khoảng ngày
+            models.Index(fields=['group', 'start_date'], name='mealplan_group_start_idx'),
+        ]
 
     def __str__(self):
         recipe_name = self.recipes.first().recipeName if self.recipes.exists() else "Không có món"
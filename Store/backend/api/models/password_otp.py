@@ -9,5 +9,12 @@ class PasswordResetOTP(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_used = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Xác nhận OTP: lọc (email, otp) trong các mã chưa dùng rồi lấy mã mới nhất.
+            # Partial index vì SQLite không dùng được cột boolean đứng đầu (Django sinh NOT "is_used")
+            models.Index(fields=['email', 'otp', '-created_at'], condition=models.Q(is_used=False), name='otp_lookup_idx'),
+        ]
+
     def is_expired(self):
         return (timezone.now() - self.created_at).total_seconds() > 600  # 10 phút
\ No newline at end of file
@@ -17,6 +17,13 @@ class ProductCatalog(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Sản phẩm của catalog (không phải tự tạo) theo tên: autocomplete, tìm kiếm khi không có FTS5.
+            # Partial index thay cho (isCustom, productName) vì điều kiện được sinh ra là NOT "isCustom"
+            models.Index(fields=['productName'], condition=models.Q(isCustom=False), name='product_catalog_name_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         # Tự động tính giá sau discount khi lưu
         if self.discount > 0:
@@ -0,0 +1,23 @@
+from django.db import models
+from .group import Group
+from .categories import Categories
+
+class PurchaseRollup(models.Model):
+    """
+    Tổng hợp sản phẩm đã mua theo (group, ngày mua, danh mục), cập nhật dần mỗi khi
+    item của danh sách mua sắm chuyển sang/khỏi trạng thái đã mua.
+    Tính lại toàn bộ bằng: python manage.py backfill_purchase_rollup
+    """
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='purchase_rollups')
+    day = models.DateField()
+    # Danh mục tại thời điểm mua; không ràng buộc khóa ngoại để xóa danh mục không làm mất lịch sử
+    category = models.ForeignKey(Categories, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    item_count = models.IntegerField(default=0)
+    total_quantity = models.FloatField(default=0)
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # Tổng quantity * giá lúc mua
+
+    class Meta:
+        unique_together = ('group', 'day', 'category')
+
+    def __str__(self):
+        return f'{self.group_id} - {self.day} - {self.category_id}: {self.item_count}'
@@ -14,6 +14,23 @@ class ShoppingList(models.Model):
     group = models.ForeignKey(Group, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     type = models.CharField(max_length=10, choices=ListType.choices)
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # Tổng tiền các item đã mua, cập nhật bởi PurchaseRollup
+
+    class Meta:
+        indexes = [
+            # Trang danh sách của group: lọc theo group, mới nhất trước
+            models.Index(fields=['group', '-createdAt', '-listID'], name='shoppinglist_group_created'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # total_spent được cộng dồn bằng F() (purchase_rollup.record_changes): không ghi đè
+        # bằng giá trị cũ trong bộ nhớ khi lưu các trường khác (vd: đổi tên danh sách)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'total_spent'
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.listName
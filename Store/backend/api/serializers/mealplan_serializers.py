@@ -1,7 +1,23 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Prefetch
 from ..models.meal_plan import MealPlan
 from ..models.have import Have
+from ..models.recipe import Recipe
+from ..models.ingredient import Ingredient
 from .recipe_serializers import RecipeSerializer
+from ..utils.versioning import bump_version
+
+
+def with_recipes(queryset):
+    """
+    Prefetch toàn bộ cây plan -> recipes -> ingredients -> product -> category
+    cho MealPlanSerializer/MealPlanDetailSerializer: 3 truy vấn bất kể số kế hoạch.
+    Món ăn giữ thứ tự được thêm vào kế hoạch (theo Have.id).
+    """
+    ingredients = Ingredient.objects.select_related('product__category').order_by('id')
+    recipes = Recipe.objects.prefetch_related(Prefetch('ingredients', queryset=ingredients)).order_by('have__id')
+    return queryset.prefetch_related(Prefetch('recipes', queryset=recipes))
 
 class MealPlanSerializer(serializers.ModelSerializer):
     recipes = serializers.SerializerMethodField()
@@ -12,9 +28,8 @@ class MealPlanSerializer(serializers.ModelSerializer):
         read_only_fields = ['planID', 'created_at', 'updated_at']
     
     def get_recipes(self, obj):
-        have_relations = Have.objects.filter(plan=obj)
-        recipes = [relation.recipe for relation in have_relations]
-        return RecipeSerializer(recipes, many=True).data
+        # Đọc từ prefetch của with_recipes() nếu có
+        return RecipeSerializer(obj.recipes.all(), many=True).data
 
 class MealPlanDetailSerializer(serializers.ModelSerializer):
     recipes = serializers.SerializerMethodField()
@@ -25,9 +40,32 @@ class MealPlanDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['planID', 'created_at', 'updated_at']
     
     def get_recipes(self, obj):
-        have_relations = Have.objects.filter(plan=obj)
-        recipes = [relation.recipe for relation in have_relations]
-        return RecipeSerializer(recipes, many=True).data
+        # Đọc từ prefetch của with_recipes() nếu có
+        return RecipeSerializer(obj.recipes.all(), many=True).data
+
+def set_plan_recipes(meal_plan, recipe_ids):
+    """
+    Đồng bộ các món của kế hoạch với recipe_ids: chỉ thêm món mới và xóa món bị bỏ,
+    các dòng Have không đổi được giữ nguyên. recipe_id không tồn tại bị bỏ qua.
+    Trả về (số món thêm, số món xóa).
+    """
+    requested = list(dict.fromkeys(recipe_ids))
+    existing = set(Have.objects.filter(plan=meal_plan).values_list('recipe_id', flat=True))
+    to_add = [recipe_id for recipe_id in requested if recipe_id not in existing]
+    to_remove = existing.difference(requested)
+
+    with transaction.atomic():
+        if to_remove:
+            Have.objects.filter(plan=meal_plan, recipe_id__in=to_remove).delete()
+        if to_add:
+            valid = set(Recipe.objects.filter(recipeID__in=to_add).values_list('recipeID', flat=True))
+            to_add = [recipe_id for recipe_id in to_add if recipe_id in valid]
+            Have.objects.bulk_create([Have(plan=meal_plan, recipe_id=recipe_id) for recipe_id in to_add])
+    if to_add:
+        # bulk_create không gửi post_save
+        bump_version('meal_plan', meal_plan.group_id)
+    return len(to_add), len(to_remove)
+
 
 class MealPlanCreateSerializer(serializers.Serializer):
     plan_name = serializers.CharField(max_length=255)
@@ -42,75 +80,78 @@ class MealPlanCreateSerializer(serializers.Serializer):
     user = serializers.IntegerField()
     meal_type = serializers.CharField(required=False, allow_blank=True)
 
+    def validate_planned_meals(self, planned_meals):
+        """Kiểm tra toàn bộ recipe_id bằng 1 truy vấn, báo lỗi theo vị trí từng món"""
+        errors = {}
+        recipe_ids = {}
+        for index, meal_data in enumerate(planned_meals):
+            recipe_id = meal_data.get('recipe_id')
+            if recipe_id in (None, ''):
+                continue
+            try:
+                recipe_ids[index] = int(recipe_id)
+            except (TypeError, ValueError):
+                errors[index] = {'recipe_id': ['recipe_id phải là số']}
+
+        recipes = Recipe.objects.in_bulk(set(recipe_ids.values()))
+        for index, recipe_id in recipe_ids.items():
+            if recipe_id not in recipes:
+                errors[index] = {'recipe_id': [f'Món ăn {recipe_id} không tồn tại']}
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return [{**meal_data, 'recipe_id': recipe_ids.get(index)} for index, meal_data in enumerate(planned_meals)]
+
     def create(self, validated_data):
-        print(f"=== MealPlanCreateSerializer.create() ===")
-        print(f"validated_data: {validated_data}")
-        
+        """
+        Mỗi loại bữa (meal) trong planned_meals là 1 MealPlan của ngày start_date,
+        các món cùng bữa được gắn vào plan đó qua bảng Have. Plan đã tồn tại
+        (cùng tên, ngày, bữa, group) được dùng lại. Toàn bộ chạy trong 1 transaction
+        với bulk_create: số truy vấn không phụ thuộc số món.
+        """
         planned_meals = validated_data.pop('planned_meals', [])
         meal_type = validated_data.pop('meal_type', 'breakfast')  # Default to breakfast
-        meal_plans = []
-        
-        print(f"planned_meals: {planned_meals}")
-        print(f"meal_type: {meal_type}")
-        
-        # Nếu không có planned_meals, tạo một meal plan cơ bản
-        if not planned_meals:
-            print("No planned meals provided, creating a basic meal plan")
-            
-            # Tính toán day_of_week dựa trên start_date
-            start_date = validated_data['start_date']
-            day_of_week = start_date.weekday()
-            print(f"start_date: {start_date}, calculated day_of_week: {day_of_week}")
-            
-            meal_plan = MealPlan.objects.create(
-                plan_name=validated_data['plan_name'],
-                start_date=validated_data['start_date'],
-                description=validated_data.get('description', ''),
-                mealType=meal_type,
-                day_of_week=day_of_week,
-                group_id=validated_data['group'],
-                user_id=validated_data['user']
-            )
-            print(f"Created basic meal plan: {meal_plan}")
-            meal_plans.append(meal_plan)
-        else:
-            # Tạo meal plan cho từng planned_meal
-            for meal_data in planned_meals:
-                print(f"Creating meal plan for: {meal_data}")
-                
-                # Tính toán day_of_week dựa trên start_date
-                start_date = validated_data['start_date']
-                day_of_week = start_date.weekday()
-                
-                print(f"start_date: {start_date}")
-                print(f"frontend day parameter: {meal_data['day']}")
-                print(f"calculated day_of_week from start_date: {day_of_week}")
-                
-                meal_plan = MealPlan.objects.create(
-                    plan_name=validated_data['plan_name'],
-                    start_date=validated_data['start_date'],
+        start_date = validated_data['start_date']
+        group_id = validated_data['group']
+
+        # Thứ tự các bữa theo thứ tự xuất hiện; không có planned_meals thì tạo 1 plan cơ bản
+        meal_types = list(dict.fromkeys(meal_data.get('meal', meal_type) for meal_data in planned_meals)) or [meal_type]
+        plan_key = {
+            'plan_name': validated_data['plan_name'],
+            'start_date': start_date,
+            'day_of_week': start_date.weekday(),
+            'group_id': group_id,
+        }
+
+        with transaction.atomic():
+            plans = {
+                plan.mealType: plan
+                for plan in MealPlan.objects.select_for_update().filter(mealType__in=meal_types, **plan_key)
+            }
+            new_plans = [
+                MealPlan(
+                    mealType=meal,
                     description=validated_data.get('description', ''),
-                    mealType=meal_data.get('meal', meal_type),
-                    day_of_week=day_of_week,
-                    group_id=validated_data['group'],
-                    user_id=validated_data['user']
+                    user_id=validated_data['user'],
+                    **plan_key
                 )
-                print(f"Created meal plan: {meal_plan}")
-                meal_plans.append(meal_plan)
-                
-                # Nếu có recipe_id, tạo relation trong Have table
-                recipe_id = meal_data.get('recipe_id')
-                if recipe_id:
-                    try:
-                        from ..models.recipe import Recipe
-                        recipe = Recipe.objects.get(recipeID=recipe_id)
-                        Have.objects.create(plan=meal_plan, recipe=recipe)
-                        print(f"Created Have relation: meal_plan={meal_plan.planID}, recipe={recipe_id}")
-                    except Recipe.DoesNotExist:
-                        print(f"Warning: Recipe {recipe_id} not found")
-        
-        print(f"Total created: {len(meal_plans)} meal plans")
-        return meal_plans
+                for meal in meal_types if meal not in plans
+            ]
+            MealPlan.objects.bulk_create(new_plans)
+            plans.update((plan.mealType, plan) for plan in new_plans)
+
+            relations = {
+                (plans[meal_data.get('meal', meal_type)].planID, meal_data['recipe_id'])
+                for meal_data in planned_meals if meal_data['recipe_id']
+            }
+            Have.objects.bulk_create(
+                [Have(plan_id=plan_id, recipe_id=recipe_id) for plan_id, recipe_id in sorted(relations)],
+                ignore_conflicts=True
+            )
+        # bulk_create không gửi post_save nên tự đánh dấu lịch tuần của group đã thay đổi
+        bump_version('meal_plan', group_id)
+
+        return [plans[meal] for meal in meal_types]
 
 class MealPlanWeeklySerializer(serializers.Serializer):
     """Serializer để trả về kế hoạch bữa ăn theo tuần"""
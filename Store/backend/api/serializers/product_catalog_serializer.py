@@ -2,6 +2,7 @@ from rest_framework import serializers
 from ..models.product_catalog import ProductCatalog
 
 class ProductCatalogSerializer(serializers.ModelSerializer):
+    """Truyền fields=[...] để chỉ trả về một phần các trường (projection)"""
     categoryID = serializers.IntegerField(source='category.categoryID', read_only=True)  # ✅ THÊM DÒNG NÀY
     category_name = serializers.CharField(source='category.categoryName', read_only=True)
     estimatedPrice = serializers.DecimalField(source='price', max_digits=10, decimal_places=2, read_only=True)
@@ -28,3 +29,10 @@ class ProductCatalogSerializer(serializers.ModelSerializer):
             'isCustom'
         ]
         read_only_fields = ['productID', 'price', 'discount_amount', 'discount_percentage']
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
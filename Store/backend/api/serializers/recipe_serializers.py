@@ -3,6 +3,8 @@ from ..models.recipe import Recipe
 from ..models.ingredient import Ingredient
 from .product_catalog_serializer import ProductCatalogSerializer
 from ..models.product_catalog import ProductCatalog
+from ..utils.recipe_index import recipe_index, update_on_commit
+from django.db import transaction
 import cloudinary.uploader
 
 
@@ -37,14 +39,14 @@ class RecipeSerializer(serializers.ModelSerializer):
         else:
             validated_data['image'] = None
 
-        recipe = Recipe.objects.create(**validated_data)
-
-        for product_id in ingredients_data:
-            try:
-                product = ProductCatalog.objects.get(productID=product_id)
-            except ProductCatalog.DoesNotExist:
-                raise serializers.ValidationError(f"Sản phẩm với ID {product_id} không tồn tại.")
-            Ingredient.objects.create(recipe=recipe, product=product)
+        product_ids = self.validate_product_ids(ingredients_data)
+        with transaction.atomic():
+            recipe = Recipe.objects.create(**validated_data)
+            Ingredient.objects.bulk_create(
+                [Ingredient(recipe=recipe, product_id=product_id) for product_id in product_ids]
+            )
+        # bulk_create không gửi post_save nên tự cập nhật index (sau khi commit)
+        update_on_commit(lambda: recipe_index.set_recipe(recipe.recipeID, product_ids))
 
         return recipe
 
@@ -66,16 +68,29 @@ class RecipeSerializer(serializers.ModelSerializer):
         instance.description = validated_data.get('description', instance.description)
         instance.instruction = validated_data.get('instruction', instance.instruction)
         instance.isCustom = validated_data.get('isCustom', instance.isCustom)
-        instance.save()
 
-        if ingredients_data is not None:
-            instance.ingredients.all().delete()  # Xóa nguyên liệu cũ
+        if ingredients_data is None:
+            instance.save()
+            return instance
 
-            for product_id in ingredients_data:
-                try:
-                    product = ProductCatalog.objects.get(productID=product_id)
-                except ProductCatalog.DoesNotExist:
-                    raise serializers.ValidationError(f"Sản phẩm với ID {product_id} không tồn tại.")
-                Ingredient.objects.create(recipe=instance, product=product)
-
-        return instance
\ No newline at end of file
+        product_ids = self.validate_product_ids(ingredients_data)
+        with transaction.atomic():
+            instance.save()
+            instance.ingredients.all().delete()  # Xóa nguyên liệu cũ
+            Ingredient.objects.bulk_create(
+                [Ingredient(recipe=instance, product_id=product_id) for product_id in product_ids]
+            )
+        update_on_commit(lambda: recipe_index.set_recipe(instance.recipeID, product_ids))
+
+        return instance
+
+    def validate_product_ids(self, product_ids):
+        """Kiểm tra tất cả productID bằng 1 query, bỏ các ID trùng lặp"""
+        product_ids = list(dict.fromkeys(product_ids))
+        existing = set(
+            ProductCatalog.objects.filter(productID__in=product_ids).values_list('productID', flat=True)
+        )
+        for product_id in product_ids:
+            if product_id not in existing:
+                raise serializers.ValidationError(f"Sản phẩm với ID {product_id} không tồn tại.")
+        return product_ids
\ No newline at end of file
@@ -8,11 +8,12 @@ class AddToListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = AddToList
-        fields = ['id', 'list', 'product', 'quantity', 'status', 'product_details']
+        fields = ['id', 'list', 'product', 'quantity', 'status', 'unit_price', 'purchased_at', 'in_fridge', 'product_details']
+        read_only_fields = ['unit_price', 'purchased_at', 'in_fridge']
 
 class ShoppingListSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShoppingList
-        fields = ['listID', 'createdAt', 'listName', 'date', 'group', 'user', 'type']
-        read_only_fields = ['listID', 'createdAt']
+        fields = ['listID', 'createdAt', 'listName', 'date', 'group', 'user', 'type', 'total_spent']
+        read_only_fields = ['listID', 'createdAt', 'total_spent']
         
\ No newline at end of file
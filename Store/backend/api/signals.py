@@ -0,0 +1,165 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .models.recipe import Recipe
+from .models.ingredient import Ingredient
+from .models.add_to_fridge import AddToFridge
+from .models.fridge import Fridge
+from .models.product_catalog import ProductCatalog
+from .models.categories import Categories
+from .models.shopping_list import ShoppingList
+from .models.add_to_list import AddToList
+from .models.meal_plan import MealPlan
+from .models.have import Have
+from .utils import expiry_buckets, fridge_stats, product_search, purchase_rollup
+from .utils.recipe_index import recipe_index, update_on_commit
+from .utils.versioning import bump_version
+
+
+# Đồng bộ index recipe <-> product
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        # Không biết giá trị cũ của product/recipe nên build lại index
+        update_on_commit(recipe_index.reset)
+    elif instance.product_id:
+        update_on_commit(lambda: recipe_index.add_ingredient(instance.recipe_id, instance.product_id))
+    else:
+        update_on_commit()
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    if instance.product_id:
+        update_on_commit(lambda: recipe_index.remove_ingredient(instance.recipe_id, instance.product_id))
+    else:
+        update_on_commit()
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_on_commit(lambda: recipe_index.set_recipe(instance.recipeID, ()))
+    else:
+        # Tên/mô tả thay đổi: index giữ nguyên, chỉ đổi version cho các cache dựa trên công thức
+        update_on_commit()
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    recipe_id = instance.recipeID
+    update_on_commit(lambda: recipe_index.remove_recipe(recipe_id))
+
+
+# Đánh dấu nội dung tủ lạnh đã thay đổi (cache gợi ý món ăn, ...) và cập nhật thống kê
+def refresh_fridge_on_commit(fridge_id):
+    """
+    Đánh dấu thống kê/bucket là cũ ngay trong transaction ghi (commit cùng dữ liệu,
+    request đọc sẽ tự tính lại) và chỉ tính lại sau khi commit, ngoài request ghi.
+    """
+    fridge_stats.mark_fridge_stale(fridge_id)
+    expiry_buckets.mark_stale(fridge_id)
+
+    def refresh():
+        # Tủ lạnh có thể đã bị xóa cùng sản phẩm
+        if Fridge.objects.filter(fridgeID=fridge_id).exists():
+            fridge_stats.refresh_stats(fridge_id)
+            expiry_buckets.refresh_fridge(fridge_id)
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=AddToFridge)
+def fridge_item_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version('fridge', instance.fridge_id)
+        refresh_fridge_on_commit(instance.fridge_id)
+
+
+@receiver(post_delete, sender=AddToFridge)
+def fridge_item_deleted(sender, instance, **kwargs):
+    bump_version('fridge', instance.fridge_id)
+    refresh_fridge_on_commit(instance.fridge_id)
+
+
+# Phiên bản catalog: dùng cho ETag của các response có thông tin sản phẩm
+@receiver(post_save, sender=ProductCatalog)
+def product_saved(sender, instance, created, raw=False, **kwargs):
+    bump_version('catalog', 'all')
+    if not raw:
+        product_search.index_product(instance.productID, instance.productName, instance.isCustom)
+    if not created and not raw:
+        # Danh mục sản phẩm có thể đã đổi
+        fridge_stats.mark_stale(instance)
+
+
+@receiver(post_delete, sender=ProductCatalog)
+def product_deleted(sender, instance, **kwargs):
+    bump_version('catalog', 'all')
+    product_search.remove_product(instance.productID)
+
+
+@receiver(post_save, sender=Categories)
+@receiver(post_delete, sender=Categories)
+def catalog_changed(sender, **kwargs):
+    bump_version('catalog', 'all')
+
+
+# Phiên bản danh sách mua sắm
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def shopping_list_changed(sender, instance, **kwargs):
+    bump_version('shopping_list', instance.listID)
+
+
+@receiver(post_save, sender=AddToList)
+@receiver(post_delete, sender=AddToList)
+def shopping_list_item_changed(sender, instance, **kwargs):
+    bump_version('shopping_list', instance.list_id)
+
+
+# Thống kê đã mua (PurchaseRollup): cộng/trừ phần thay đổi mỗi khi item đổi trạng thái mua
+@receiver(pre_save, sender=AddToList)
+def shopping_list_item_saving(sender, instance, raw=False, **kwargs):
+    if raw or hasattr(instance, '_loaded_purchase'):
+        return
+    old = None
+    if not instance._state.adding:
+        old = AddToList.objects.filter(pk=instance.pk).first()
+    instance._loaded_purchase = old.purchase_state() if old is not None else None
+
+
+@receiver(post_save, sender=AddToList)
+def shopping_list_item_purchase_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    new = instance.purchase_state()
+    purchase_rollup.record_changes([(instance._loaded_purchase, new)])
+    instance._loaded_purchase = new
+
+
+@receiver(post_delete, sender=AddToList)
+def shopping_list_item_purchase_deleted(sender, instance, **kwargs):
+    old = getattr(instance, '_loaded_purchase', instance.purchase_state())
+    purchase_rollup.record_changes([(old, None)])
+
+
+# Phiên bản kế hoạch bữa ăn theo group: dùng cho cache lịch tuần
+@receiver(post_save, sender=MealPlan)
+@receiver(post_delete, sender=MealPlan)
+def meal_plan_changed(sender, instance, **kwargs):
+    bump_version('meal_plan', instance.group_id)
+
+
+@receiver(post_save, sender=Have)
+@receiver(post_delete, sender=Have)
+def meal_plan_recipe_changed(sender, instance, **kwargs):
+    # Dùng plan đã nạp sẵn nếu có; khi xóa theo cascade, MealPlan tự bump ở signal của nó
+    plan = instance._state.fields_cache.get('plan')
+    group_id = plan.group_id if plan is not None else (
+        MealPlan.objects.filter(planID=instance.plan_id).values_list('group_id', flat=True).first()
+    )
+    if group_id is not None:
+        bump_version('meal_plan', group_id)
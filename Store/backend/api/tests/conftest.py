@@ -0,0 +1,14 @@
+import pytest
+from django.core.cache import cache
+
+from api.utils.autocomplete import product_autocomplete
+from api.utils.recipe_index import recipe_index
+
+
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    """Index in-memory và cache không rollback theo transaction của test nên reset trước mỗi test"""
+    recipe_index.reset()
+    product_autocomplete.reset()
+    cache.clear()
+    yield
@@ -0,0 +1,13 @@
+from django.test import SimpleTestCase, override_settings
+
+from api.checks import check_shared_cache
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_warns_on_process_local_cache(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['api.W001'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
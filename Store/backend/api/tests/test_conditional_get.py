@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import AddToFridge, AddToList, Categories, Fridge, Group, In, ProductCatalog, ShoppingList
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='etag', email='etag@example.com', password='pass')
+        self.group = Group.objects.create(groupName='Nhà ETag')
+        In.objects.create(user=self.user, group=self.group)
+        self.client.force_authenticate(user=self.user)
+        category = Categories.objects.create(categoryName='Rau củ')
+        self.product = ProductCatalog.objects.create(productName='Cà chua', unit='kg', shelfLife=5, category=category)
+        self.shopping_list = ShoppingList.objects.create(
+            user=self.user, group=self.group, listName='Chợ sáng', date=date.today(), type='day'
+        )
+        self.item = AddToList.objects.create(list=self.shopping_list, product=self.product, quantity=1, status='pending')
+
+    def assert_revalidates(self, url, params=None):
+        """Lần 2 gửi lại ETag -> 304 không body; trả về ETag"""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def test_product_list_not_modified_until_catalog_changes(self):
+        url = reverse('product-catalog')
+        etag = self.assert_revalidates(url)
+
+        self.product.discount = 10
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified_skips_serialization_queries(self):
+        url = reverse('product-catalog')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_is_not_used_for_304(self):
+        # Last-Modified làm tròn tới giây: thay đổi trong cùng giây vẫn có cùng giá trị
+        url = reverse('fridge-list')
+        params = {'group_id': self.group.groupID}
+        last_modified = self.client.get(url, params)['Last-Modified']
+        AddToFridge.objects.create(
+            fridge=Fridge.objects.get(group=self.group), product=self.product, quantity=1,
+            expiredDate=date.today() + timedelta(days=3),
+        )
+        response = self.client.get(url, params, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['items']), 1)
+
+    def test_fridge_list_changes_after_item_added(self):
+        url = reverse('fridge-list')
+        params = {'group_id': self.group.groupID}
+        etag = self.assert_revalidates(url, params)
+        notifications_etag = self.assert_revalidates(reverse('fridge-notifications'), params)
+
+        response = self.client.post(f"{url}?group_id={self.group.groupID}", {
+            'productName': 'Cà chua',
+            'product_id': self.product.productID,
+            'quantity': 2,
+            'expiredDate': (date.today() + timedelta(days=1)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('fridge-notifications'), params, HTTP_IF_NONE_MATCH=notifications_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_expiring'], 1)
+
+    def test_shopping_list_detail_changes_after_toggle(self):
+        url = reverse('shopping-list-detail', kwargs={'list_id': self.shopping_list.listID})
+        etag = self.assert_revalidates(url)
+
+        toggle_url = reverse('toggle-item-status', kwargs={'list_id': self.shopping_list.listID, 'item_id': self.item.id})
+        self.client.patch(toggle_url)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stats']['purchased_items'], 1)
@@ -0,0 +1,25 @@
+from django.test import TestCase
+
+from api.benchmarks import endpoints
+from api.benchmarks.seed import seed
+
+
+class EndpointBenchmarkTests(TestCase):
+    def test_query_counts_do_not_grow_with_data(self):
+        # 2 mẫu để toggle đo cả 2 chiều (pending -> purchased và ngược lại)
+        small = endpoints.measure_all(seed(scale=0.05), samples=2)
+        # Lần seed thứ 2 tạo group mới với nhiều sản phẩm, công thức, kế hoạch, danh sách hơn
+        large = endpoints.measure_all(seed(scale=0.2, seed=1), samples=2)
+
+        for name, result in large.items():
+            self.assertLess(result['status'], 400, name)
+            self.assertEqual(result['queries'], small[name]['queries'], f'{name}: số truy vấn tăng theo dữ liệu (N+1?)')
+
+    def test_compare_reports_query_regressions(self):
+        def report(queries, p95):
+            return {'endpoints': {'fridge.list': {'queries': queries, 'p95_ms': p95}}}
+
+        lines, regressions = endpoints.compare(report(3, 10.0), report(5, 12.0))
+        self.assertEqual(regressions, ['fridge.list'])
+        self.assertIn('+20%', lines[0])
+        self.assertEqual(endpoints.compare(report(3, 10.0), report(3, 8.0))[1], [])
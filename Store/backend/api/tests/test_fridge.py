@@ -5,6 +5,11 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase
 from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
@@ -15,6 +20,9 @@ from ..models.add_to_fridge import AddToFridge
 from ..models.product_catalog import ProductCatalog
 from ..models.categories import Categories
 from ..models.in_model import In
+from ..models.fridge_stats import FridgeStats
+from ..models.fridge_expiry_bucket import FridgeExpiryBucket
+from ..utils import expiry_buckets, fridge_stats, product_search
 
 # Hàm trợ giúp để tạo dữ liệu test
 def create_test_data():
@@ -192,4 +200,190 @@ class FridgeDetailViewTest(APITestCase):
         response = self.client.delete(delete_url + f"?group_id={self.group.groupID}")
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(AddToFridge.objects.count(), 3) # Ban đầu có 4, xóa 1 còn 3
\ No newline at end of file
+        self.assertEqual(AddToFridge.objects.count(), 3) # Ban đầu có 4, xóa 1 còn 3
+
+# =================================================================
+# Test cho FridgeStatsView và thống kê tính sẵn
+# =================================================================
+class FridgeStatsViewTest(APITestCase):
+    def setUp(self):
+        # Thống kê được tính lại sau khi commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user, self.group, self.fridge = create_test_data()
+        self.url = reverse('fridge-stats')
+        self.client.force_authenticate(user=self.user)
+
+    def test_stats_are_materialized_on_item_writes(self):
+        """Dòng FridgeStats được cập nhật sau khi thêm/xóa sản phẩm được commit."""
+        stats = FridgeStats.objects.get(fridge=self.fridge)
+        self.assertEqual(stats.total_products, 4)
+        self.assertEqual(stats.expiring_soon_products, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AddToFridge.objects.filter(fridge=self.fridge).first().delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.total_products, 3)
+
+    def test_stats_endpoint_reads_materialized_row(self):
+        """Dashboard đọc thống kê bằng 1 query khi dữ liệu đã được tính sẵn trong ngày."""
+        list_response = self.client.get(reverse('fridge-list'), {'group_id': self.group.groupID})
+        # group + fridge + FridgeStats
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'group_id': self.group.groupID})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for key in ('total_products', 'expired_products', 'expiring_soon_products'):
+            self.assertEqual(response.data[key], list_response.data['stats'][key])
+        self.assertEqual(response.data['popular_categories'][0]['categoryName'], 'Thực phẩm tươi sống')
+
+    def test_aggregate_and_row_based_stats_agree(self):
+        items = list(AddToFridge.objects.filter(fridge=self.fridge).select_related('product__category'))
+        self.assertEqual(fridge_stats.compute_stats(self.fridge), fridge_stats.stats_from_items(items))
+
+
+# =================================================================
+# Test cho bảng bucket hạn sử dụng
+# =================================================================
+class FridgeExpiryBucketTest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user, self.group, self.fridge = create_test_data()
+        self.url = reverse('fridge-notifications')
+        self.client.force_authenticate(user=self.user)
+
+    def test_summary_reads_bucket_table_only(self):
+        """Số thông báo trên header chỉ đọc bảng bucket: group + fridge + bucket."""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'group_id': self.group.groupID, 'summary': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_expiring'], 3)
+        self.assertEqual(response.data['buckets'], {'expired': 0, 'today': 1, 'tomorrow': 1, 'soon': 1})
+
+    def test_sweep_command_rebuckets_for_new_day(self):
+        """Sau khi sang ngày mới, sweep chuyển sản phẩm sang mốc tương ứng."""
+        tomorrow = date.today() + timedelta(days=1)
+        call_command('sweep_expiry', '--date', tomorrow.isoformat(), stdout=StringIO())
+
+        counts = dict(FridgeExpiryBucket.objects.filter(fridge=self.fridge).values_list('bucket', 'item_count'))
+        self.assertEqual(counts, {'expired': 1, 'today': 1, 'tomorrow': 0, 'soon': 1})
+        self.assertEqual(set(FridgeExpiryBucket.objects.values_list('as_of', flat=True)), {tomorrow})
+
+    def test_refresh_updates_bucket_rows_in_place(self):
+        """refresh_fridge cập nhật (upsert) các dòng bucket sẵn có thay vì xóa rồi tạo lại."""
+        ids = set(FridgeExpiryBucket.objects.filter(fridge=self.fridge).values_list('id', flat=True))
+        AddToFridge.objects.filter(fridge=self.fridge, expiredDate=date.today()).update(
+            expiredDate=date.today() - timedelta(days=1)
+        )
+        expiry_buckets.refresh_fridge(self.fridge.fridgeID)
+
+        rows = FridgeExpiryBucket.objects.filter(fridge=self.fridge)
+        self.assertEqual(set(rows.values_list('id', flat=True)), ids)
+        self.assertEqual(dict(rows.values_list('bucket', 'item_count')), {'expired': 1, 'today': 0, 'tomorrow': 1, 'soon': 1})
+
+    def test_item_write_defers_refresh_until_commit(self):
+        """Ghi sản phẩm chỉ đánh dấu bucket/thống kê là cũ, tính lại sau khi commit."""
+        item = AddToFridge.objects.filter(fridge=self.fridge, expiredDate=date.today()).first()
+        with self.captureOnCommitCallbacks() as callbacks:
+            item.delete()
+            self.assertFalse(FridgeExpiryBucket.objects.filter(fridge=self.fridge).exists())
+            self.assertIsNone(FridgeStats.objects.get(fridge=self.fridge).as_of)
+        # Đọc trong lúc chờ vẫn đúng
+        response = self.client.get(self.url, {'group_id': self.group.groupID, 'summary': 1})
+        self.assertEqual(response.data['buckets'], {'expired': 0, 'today': 0, 'tomorrow': 1, 'soon': 1})
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(FridgeStats.objects.get(fridge=self.fridge).total_products, 3)
+
+
+class FridgeImportTest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user, self.group, self.fridge = create_test_data()
+        self.url = reverse('fridge-import') + f'?group_id={self.group.groupID}'
+        self.client.force_authenticate(user=self.user)
+        self.category = Categories.objects.get(categoryName='Thực phẩm tươi sống')
+
+    def test_json_import_with_per_row_results(self):
+        today = date.today()
+        milk = ProductCatalog.objects.get(productName='Sữa tươi')
+        beef = ProductCatalog.objects.get(productName='Thịt bò')
+        payload = [
+            {'product_id': milk.productID, 'quantity': 3},
+            {'productName': 'thịt bò', 'quantity': 2, 'expiredDate': (today + timedelta(days=1)).isoformat()},
+            {'productName': 'Nấm kim châm', 'quantity': 1, 'unit': 'gói', 'category_id': self.category.categoryID,
+             'expiredDate': (today + timedelta(days=4)).isoformat(), 'location': 'freeze'},
+            {'productName': 'Nấm kim châm', 'quantity': 2, 'unit': 'gói', 'expiredDate': (today + timedelta(days=6)).isoformat()},
+            {'productName': 'Rau lạ', 'quantity': 1},
+            {'product_id': 999999, 'quantity': 1},
+            {'productName': 'Bơ', 'quantity': 0},
+        ]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['imported'], response.data['failed']), (4, 3))
+        results = response.data['results']
+        self.assertEqual([r['index'] for r in results], list(range(7)))
+        self.assertEqual([r['status'] for r in results], ['updated', 'updated', 'created', 'created', 'error', 'error', 'error'])
+        self.assertTrue(results[2]['product_created'])
+        self.assertEqual(results[2]['product'], results[3]['product'])
+
+        # Sữa tươi còn hạn hôm nay: cộng dồn, giữ hạn sớm hơn
+        milk_row = AddToFridge.objects.get(fridge=self.fridge, product=milk)
+        self.assertEqual((milk_row.quantity, milk_row.expiredDate), (5, today))
+        beef_row = AddToFridge.objects.get(fridge=self.fridge, product=beef)
+        self.assertEqual((beef_row.quantity, beef_row.expiredDate), (3, today + timedelta(days=1)))
+        # 2 dòng cùng sản phẩm mới: 1 sản phẩm tự tạo, số lượng cộng dồn
+        mushroom = ProductCatalog.objects.get(productName='Nấm kim châm')
+        self.assertTrue(mushroom.isCustom)
+        self.assertEqual(mushroom.category, self.category)
+        row = AddToFridge.objects.get(fridge=self.fridge, product=mushroom)
+        self.assertEqual((row.quantity, row.expiredDate, row.location), (3, today + timedelta(days=4), 'freeze'))
+
+        self.assertEqual(FridgeStats.objects.get(fridge=self.fridge).total_products, 5)
+        # Sản phẩm tự tạo được đưa vào index tìm kiếm ngay
+        self.assertEqual(product_search.search_ids('nam kim', include_custom=True), [mushroom.productID])
+
+    def test_name_match_ignores_case_of_accented_letters(self):
+        chili = ProductCatalog.objects.create(productName='Ớt chuông', unit='kg', shelfLife=7)
+        # Cùng tên khi bỏ dấu nhưng là sản phẩm khác
+        ProductCatalog.objects.create(productName='Ot chuong', unit='kg', shelfLife=7)
+        payload = [{'productName': 'ớt CHUÔNG', 'quantity': 1, 'expiredDate': (date.today() + timedelta(days=2)).isoformat()}]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['product'], chili.productID)
+        self.assertFalse(response.data['results'][0]['product_created'])
+
+    def test_csv_import(self):
+        today = date.today()
+        content = (
+            'productName,quantity,expiredDate,unit\n'
+            f'Trứng gà,12,,\n'
+            f'Đậu phụ,4,{(today + timedelta(days=2)).isoformat()},miếng\n'
+        ).encode('utf-8-sig')
+        upload = SimpleUploadedFile('import.csv', content, content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], ['updated', 'created'])
+        self.assertEqual(AddToFridge.objects.get(fridge=self.fridge, product__productName='Trứng gà').quantity, 22)
+        self.assertTrue(AddToFridge.objects.filter(fridge=self.fridge, product__productName='Đậu phụ').exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def run(count, offset):
+            payload = [
+                {'productName': f'Món nhập {offset + i}', 'quantity': 1, 'unit': 'kg',
+                 'expiredDate': (date.today() + timedelta(days=5)).isoformat()}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.data['imported'], count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(2, 0), run(40, 100))
+
+    def test_rejects_invalid_payload(self):
+        self.assertEqual(self.client.post(self.url, {'items': []}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, [{'productName': 'Không đơn vị', 'quantity': 1}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['results'][0]['status'], 'error')
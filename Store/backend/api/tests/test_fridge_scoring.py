@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+
+import pytest
+
+from api.utils.fridge_scoring import COVERAGE, EXPIRY, QUANTITY, USE_SOON, FridgeVector, RecipeMatrix, rank
+
+TODAY = date(2025, 6, 1)
+
+
+@pytest.fixture
+def matrix():
+    return RecipeMatrix({
+        1: (10, 11, 12),   # dùng sản phẩm sắp hết hạn (12)
+        2: (10, 11),
+        3: (13, 14),       # không có gì trong tủ lạnh
+    })
+
+
+@pytest.fixture
+def fridge():
+    return FridgeVector([
+        (10, 1, TODAY + timedelta(days=10)),
+        (11, 9, TODAY + timedelta(days=10)),
+        (12, 1, TODAY + timedelta(days=1)),
+    ], today=TODAY)
+
+
+def test_coverage_counts_matches_for_all_recipes(matrix, fridge):
+    matched, scores = matrix.score(fridge, COVERAGE)
+    assert list(matched) == [3, 2, 0]
+    assert list(scores) == [1.0, 1.0, 0.0]
+
+
+def test_rank_skips_recipes_without_matches_and_breaks_ties_by_id(matrix, fridge):
+    recipe_ids, matched, totals, _ = rank(matrix, fridge, COVERAGE)
+    assert list(recipe_ids) == [1, 2]
+    assert list(matched) == [3, 2]
+    assert list(totals) == [3, 2]
+
+
+def test_quantity_mode_prefers_items_with_more_on_hand(matrix):
+    fridge = FridgeVector([
+        (10, 1, TODAY + timedelta(days=10)),
+        (11, 9, TODAY + timedelta(days=10)),
+        (12, 1, TODAY + timedelta(days=10)),
+    ], today=TODAY)
+    _, scores = matrix.score(fridge, QUANTITY)
+    assert scores[1] > scores[0]
+
+
+def test_expiry_mode_penalizes_recipes_ignoring_expiring_items(matrix, fridge):
+    recipe_ids, _, _, scores = rank(matrix, fridge, EXPIRY)
+    assert list(recipe_ids) == [1, 2]
+    assert scores[0] > scores[1]
+
+
+def test_use_soon_mode_weights_expiring_items_by_urgency_and_quantity():
+    matrix = RecipeMatrix({
+        1: (20, 21),   # sản phẩm hết hạn sau 3 ngày
+        2: (22, 21),   # sản phẩm hết hạn hôm nay
+        3: (23, 21),   # sản phẩm hết hạn hôm nay nhưng số lượng lớn
+    })
+    fridge = FridgeVector([
+        (20, 1, TODAY + timedelta(days=3)),
+        (21, 1, TODAY + timedelta(days=30)),
+        (22, 1, TODAY),
+        (23, 9, TODAY),
+    ], today=TODAY)
+    assert fridge.expiring == {20: 3, 22: 0, 23: 0}
+
+    recipe_ids, _, _, scores = rank(matrix, fridge, USE_SOON)
+    assert list(recipe_ids) == [3, 2, 1]
+    assert scores[0] > scores[1] > scores[2] > 0
+
+
+def test_invalid_mode_is_rejected(matrix, fridge):
+    with pytest.raises(ValueError):
+        matrix.score(fridge, 'unknown')
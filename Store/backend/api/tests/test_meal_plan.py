@@ -1,14 +1,21 @@
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from datetime import date
+from datetime import date, timedelta
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from api.models.group import Group
 from api.models.recipe import Recipe
 from api.models.meal_plan import MealPlan
 from api.models.have import Have
 from api.models.in_model import In
+from api.models.categories import Categories
+from api.models.product_catalog import ProductCatalog
+from api.models.ingredient import Ingredient
+from api.models.fridge import Fridge
+from api.models.add_to_fridge import AddToFridge
 
 User = get_user_model()
 
@@ -110,4 +117,266 @@ class MealPlanAPITests(APITestCase):
         print("OUTPUT (Duplicate Add Recipe):", res_dup.status_code, res_dup.data)
         self.assertEqual(res_dup.status_code, status.HTTP_200_OK)
         self.assertFalse(res_dup.data.get("success", True))
-        
\ No newline at end of file
+        
+
+
+class MealPlanQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="pass")
+        self.group = Group.objects.create(groupName="Gia đình Test")
+        self.category = Categories.objects.create(categoryName="Rau củ")
+        self.base_url = reverse("meal-plan-list")
+        self.plan_count = 0
+
+    def add_plans(self, count):
+        for _ in range(count):
+            self.plan_count += 1
+            plan = MealPlan.objects.create(
+                plan_name=f"Plan {self.plan_count}", start_date=date.today(), mealType="lunch",
+                day_of_week=0, group=self.group, user=self.user
+            )
+            for r in range(2):
+                recipe = Recipe.objects.create(recipeName=f"Món {self.plan_count}-{r}", description="", instruction="")
+                for i in range(3):
+                    product = ProductCatalog.objects.create(
+                        productName=f"SP {self.plan_count}-{r}-{i}", unit="kg", shelfLife=3, category=self.category
+                    )
+                    Ingredient.objects.create(recipe=recipe, product=product)
+                Have.objects.create(plan=plan, recipe=recipe)
+
+    def test_list_query_count_does_not_grow_with_plans(self):
+        """GET /meal-plans/: plans + recipes + ingredients(product, category) = 3 truy vấn"""
+        self.add_plans(1)
+        with self.assertNumQueries(3):
+            res = self.client.get(self.base_url, {"group_id": self.group.groupID})
+        self.assertEqual(len(res.data["data"][0]["recipes"]), 2)
+
+        self.add_plans(10)
+        with self.assertNumQueries(3):
+            res = self.client.get(self.base_url, {"group_id": self.group.groupID})
+        self.assertEqual(len(res.data["data"]), 11)
+        recipe = res.data["data"][0]["recipes"][0]
+        self.assertEqual(len(recipe["ingredient_set"]), 3)
+        self.assertEqual(recipe["ingredient_set"][0]["product"]["category_name"], "Rau củ")
+
+    def test_detail_keeps_recipe_order(self):
+        self.add_plans(1)
+        plan = MealPlan.objects.get()
+        late = Recipe.objects.create(recipeName="A - thêm sau", description="", instruction="")
+        Have.objects.create(plan=plan, recipe=late)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(reverse("meal-plan-detail", kwargs={"pk": plan.planID}))
+        names = [r["recipeName"] for r in res.data["data"]["recipes"]]
+        self.assertEqual(names, ["Món 1-0", "Món 1-1", "A - thêm sau"])
+
+
+class MealPlanWeeklyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="pass")
+        self.group = Group.objects.create(groupName="Gia đình Test")
+        self.fridge = Fridge.objects.create(group=self.group)
+        self.url = reverse("meal-plan-weekly")
+        # Thứ 2 của tuần cố định
+        self.monday = date(2025, 6, 2)
+
+        self.rice = ProductCatalog.objects.create(productName="Gạo", unit="kg", shelfLife=365)
+        self.egg = ProductCatalog.objects.create(productName="Trứng", unit="quả", shelfLife=14)
+        self.tomato = ProductCatalog.objects.create(productName="Cà chua", unit="kg", shelfLife=7)
+        self.fried_rice = self.make_recipe("Cơm chiên", [self.rice, self.egg])
+        self.omelette = self.make_recipe("Trứng chiên cà chua", [self.egg, self.tomato])
+        AddToFridge.objects.create(fridge=self.fridge, product=self.egg, quantity=5, expiredDate=self.monday + timedelta(days=30))
+
+    def make_recipe(self, name, products):
+        recipe = Recipe.objects.create(recipeName=name, description="", instruction="")
+        for product in products:
+            Ingredient.objects.create(recipe=recipe, product=product)
+        return recipe
+
+    def make_plan(self, day, meal_type, recipes, name="Tuần này"):
+        plan = MealPlan.objects.create(
+            plan_name=name, start_date=self.monday + timedelta(days=day), mealType=meal_type,
+            day_of_week=day, group=self.group, user=self.user
+        )
+        for recipe in recipes:
+            Have.objects.create(plan=plan, recipe=recipe)
+        return plan
+
+    def get_week(self, day=None):
+        res = self.client.get(self.url, {"group_id": self.group.groupID, "date": (day or self.monday + timedelta(days=3)).isoformat()})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["data"]
+
+    def test_grid_and_ingredient_rollup(self):
+        lunch = self.make_plan(0, "lunch", [self.fried_rice])
+        self.make_plan(2, "dinner", [self.omelette, self.fried_rice])
+        self.make_plan(7, "lunch", [self.omelette])  # Tuần sau
+
+        data = self.get_week()
+        self.assertEqual(data["start_date"], "2025-06-02")
+        self.assertEqual(data["end_date"], "2025-06-08")
+        self.assertEqual(sorted(data["meals_by_day"]), [f"day_{i}" for i in range(7)])
+        self.assertEqual(data["meals_by_day"]["day_0"]["lunch"]["planID"], lunch.planID)
+        self.assertEqual(data["meals_by_day"]["day_0"]["lunch"]["recipe_name"], "Cơm chiên")
+        self.assertIsNone(data["meals_by_day"]["day_0"]["breakfast"])
+        self.assertEqual(len(data["meals_by_day"]["day_2"]["dinner"]["recipes"]), 2)
+
+        summary = data["ingredients_summary"]
+        self.assertEqual(
+            [(item["productName"], item["recipe_count"], item["in_fridge"]) for item in summary["items"]],
+            [("Trứng", 2, True), ("Cà chua", 1, False), ("Gạo", 1, False)]
+        )
+        self.assertEqual((summary["total_products"], summary["in_fridge"], summary["missing"]), (3, 1, 2))
+
+    def test_bounded_queries_and_cache(self):
+        for day in range(7):
+            self.make_plan(day, "lunch", [self.fried_rice])
+            self.make_plan(day, "dinner", [self.omelette])
+
+        # fridge + plans + recipes + ingredients + sản phẩm trong tủ lạnh
+        with self.assertNumQueries(5):
+            self.get_week()
+        # Lần sau chỉ còn truy vấn fridge để dựng key cache
+        with self.assertNumQueries(1):
+            self.get_week()
+
+    def test_cache_invalidated_by_meal_plan_writes(self):
+        plan = self.make_plan(1, "breakfast", [])
+        self.assertEqual(self.get_week()["ingredients_summary"]["total_products"], 0)
+
+        Have.objects.create(plan=plan, recipe=self.fried_rice)
+        self.assertEqual(self.get_week()["ingredients_summary"]["total_products"], 2)
+
+        AddToFridge.objects.create(fridge=self.fridge, product=self.rice, quantity=1, expiredDate=self.monday + timedelta(days=30))
+        self.assertEqual(self.get_week()["ingredients_summary"]["in_fridge"], 2)
+
+        plan.delete()
+        self.assertIsNone(self.get_week()["meals_by_day"]["day_1"]["breakfast"])
+
+    def test_requires_group_id(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(self.url, {"group_id": self.group.groupID, "date": "02/06/2025"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MealPlanBulkCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="pass")
+        self.group = Group.objects.create(groupName="Gia đình Test")
+        self.base_url = reverse("meal-plan-list")
+        self.recipes = [
+            Recipe.objects.create(recipeName=f"Món {i}", description="", instruction="") for i in range(21)
+        ]
+
+    def payload(self, meals, **extra):
+        return {
+            "plan_name": "Tuần 1",
+            "start_date": "2025-06-04",
+            "group": self.group.groupID,
+            "user": self.user.id,
+            "planned_meals": meals,
+            **extra,
+        }
+
+    def test_one_plan_per_meal_type(self):
+        meals = [
+            {"day": "Thứ 4", "meal": "lunch", "recipe_id": self.recipes[0].recipeID},
+            {"day": "Thứ 4", "meal": "lunch", "recipe_id": self.recipes[1].recipeID},
+            {"day": "Thứ 4", "meal": "dinner", "recipe_id": str(self.recipes[2].recipeID)},
+            {"day": "Thứ 4", "meal": "dinner"},
+        ]
+        res = self.client.post(self.base_url, self.payload(meals), format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        lunch = MealPlan.objects.get(mealType="lunch")
+        dinner = MealPlan.objects.get(mealType="dinner")
+        self.assertEqual(lunch.day_of_week, 2)
+        self.assertEqual(set(lunch.recipes.values_list("recipeID", flat=True)), {self.recipes[0].recipeID, self.recipes[1].recipeID})
+        self.assertEqual(list(dinner.recipes.values_list("recipeID", flat=True)), [self.recipes[2].recipeID])
+        self.assertEqual([p["mealType"] for p in res.data["data"]], ["lunch", "dinner"])
+        self.assertEqual(len(res.data["data"][0]["recipes"]), 2)
+
+        # Gửi lại cùng kế hoạch: dùng lại plan, không tạo trùng
+        res = self.client.post(self.base_url, self.payload(meals), format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(MealPlan.objects.count(), 2)
+        self.assertEqual(Have.objects.count(), 3)
+
+    def test_query_count_does_not_grow_with_meals(self):
+        def post(recipes, plan_name):
+            meals = [
+                {"meal": ("breakfast", "lunch", "dinner")[i % 3], "recipe_id": recipe.recipeID}
+                for i, recipe in enumerate(recipes)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(self.base_url, self.payload(meals, plan_name=plan_name), format="json")
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(post(self.recipes[:3], "Nhỏ"), post(self.recipes, "Lớn"))
+        self.assertEqual(Have.objects.count(), 24)
+
+    def test_per_entry_errors_and_nothing_created(self):
+        meals = [
+            {"meal": "lunch", "recipe_id": self.recipes[0].recipeID},
+            {"meal": "lunch", "recipe_id": 99999},
+            {"meal": "dinner", "recipe_id": "abc"},
+        ]
+        res = self.client.post(self.base_url, self.payload(meals), format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data["errors"]["planned_meals"]
+        self.assertEqual(set(errors), {1, 2})
+        self.assertIn("99999", str(errors[1]["recipe_id"][0]))
+        self.assertFalse(MealPlan.objects.exists())
+
+
+class MealPlanUpdateDiffTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", email="u1@example.com", password="pass")
+        self.group = Group.objects.create(groupName="Gia đình Test")
+        self.recipes = [Recipe.objects.create(recipeName=f"Món {i}", description="", instruction="") for i in range(4)]
+        self.plan = MealPlan.objects.create(
+            plan_name="Plan", start_date=date.today(), mealType="lunch", day_of_week=0, group=self.group, user=self.user
+        )
+        self.haves = [Have.objects.create(plan=self.plan, recipe=recipe) for recipe in self.recipes[:3]]
+        self.url = reverse("meal-plan-detail", kwargs={"pk": self.plan.planID})
+
+    def put(self, payload):
+        res = self.client.put(self.url, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_only_changed_recipes_are_touched(self):
+        """Bỏ món 0, thêm món 3: các dòng Have của món 1, 2 giữ nguyên"""
+        kept_ids = {self.haves[1].id, self.haves[2].id}
+        res = self.put({"planned_meals": [
+            {"recipe_id": self.recipes[1].recipeID},
+            {"recipe_id": self.recipes[2].recipeID},
+            {"recipe_id": self.recipes[3].recipeID},
+            {"recipe_id": 99999},
+        ]})
+
+        rows = dict(Have.objects.filter(plan=self.plan).values_list("recipe_id", "id"))
+        self.assertEqual(set(rows), {r.recipeID for r in self.recipes[1:]})
+        self.assertTrue(kept_ids <= set(rows.values()))
+        self.assertEqual(len(res.data["data"]["recipes"]), 3)
+
+    def test_unchanged_recipes_do_not_write(self):
+        payload = {"planned_meals": [{"recipe_id": r.recipeID} for r in self.recipes[:3]]}
+        with CaptureQueriesContext(connection) as ctx:
+            self.put(payload)
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "DELETE"))]
+        self.assertEqual(writes, [])
+
+    def test_description_only_keeps_recipes(self):
+        self.put({"description": "Chỉ sửa mô tả"})
+        self.assertEqual(Have.objects.filter(plan=self.plan).count(), 3)
+
+        self.put({"planned_meals": []})
+        self.assertFalse(Have.objects.filter(plan=self.plan).exists())
+
+    def test_invalid_recipe_id(self):
+        res = self.client.put(self.url, {"planned_meals": [{"recipe_id": "abc"}]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Have.objects.filter(plan=self.plan).count(), 3)
@@ -5,6 +5,11 @@ from django.contrib.auth import get_user_model
 
 from api.models.product_catalog import ProductCatalog
 from api.models.categories import Categories
+from api.models.group import Group
+from api.models.fridge import Fridge
+from api.models.add_to_fridge import AddToFridge
+from api.utils import product_search
+from api.utils.autocomplete import product_autocomplete
 
 User = get_user_model()
 
@@ -113,3 +118,135 @@ class ProductCatalogAPITests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertTrue(any(p["productID"] == self.product.productID for p in res.data))
+
+
+class ProductCatalogPaginationTests(APITestCase):
+    def setUp(self):
+        self.category = Categories.objects.create(categoryName="Rau củ")
+        self.products = [
+            ProductCatalog.objects.create(productName=f"Sản phẩm {i}", unit="kg", shelfLife=5, category=self.category)
+            for i in range(5)
+        ]
+        self.list_url = reverse("product-catalog")
+
+    def test_cursor_pagination_walks_all_products(self):
+        """GET /products/?limit=2 trả về từng trang theo productID cho tới hết"""
+        seen, cursor = [], ''
+        while True:
+            res = self.client.get(self.list_url, {"limit": 2, "cursor": cursor})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen += [p["productID"] for p in res.data["results"]]
+            cursor = res.data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [p.productID for p in self.products])
+
+    def test_page_query_count_is_bounded(self):
+        """Category được join sẵn nên 1 trang chỉ tốn 1 query"""
+        with self.assertNumQueries(1):
+            res = self.client.get(self.list_url, {"limit": 5})
+        self.assertEqual(res.data["results"][0]["category_name"], "Rau củ")
+
+    def test_fields_projection(self):
+        res = self.client.get(self.list_url, {"limit": 2, "fields": "productID,productName"})
+        self.assertEqual(set(res.data["results"][0]), {"productID", "productName"})
+
+        res = self.client.get(self.list_url, {"fields": "productID,unknown"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="searcher", email="s@example.com", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.category = Categories.objects.create(categoryName="Rau củ")
+        self.tomato = ProductCatalog.objects.create(productName="Cà chua", unit="kg", shelfLife=7, category=self.category)
+        self.cherry = ProductCatalog.objects.create(productName="Cà chua bi Đà Lạt", unit="kg", shelfLife=7, category=self.category)
+        self.eggplant = ProductCatalog.objects.create(productName="Cà tím", unit="kg", shelfLife=7, category=self.category)
+        self.custom = ProductCatalog.objects.create(productName="Cà chua nhà trồng", unit="kg", shelfLife=7, isCustom=True)
+        self.search_url = reverse("product-search")
+
+    def search(self, query):
+        res = self.client.get(self.search_url, {"q": query})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [p["productID"] for p in res.data]
+
+    def test_accent_insensitive_and_ranked_by_match(self):
+        """Gõ không dấu vẫn tìm được, trùng khớp hoàn toàn đứng đầu, bỏ qua sản phẩm tự tạo"""
+        self.assertEqual(self.search("ca chua"), [self.tomato.productID, self.cherry.productID])
+        self.assertEqual(self.search("CÀ CHUA"), [self.tomato.productID, self.cherry.productID])
+        self.assertEqual(self.search("da lat"), [self.cherry.productID])
+
+    def test_prefix_query(self):
+        """Từ cuối gõ dở vẫn khớp (tìm theo tiền tố)"""
+        self.assertEqual(self.search("ca ti"), [self.eggplant.productID])
+
+    def test_index_follows_rename_and_delete(self):
+        self.eggplant.productName = "Cà pháo"
+        self.eggplant.save()
+        self.assertEqual(self.search("tim"), [])
+        self.assertEqual(self.search("phao"), [self.eggplant.productID])
+
+        self.tomato.delete()
+        self.assertEqual(self.search("ca chua"), [self.cherry.productID])
+
+    def test_query_without_tokens_returns_empty(self):
+        self.assertEqual(self.search('"*'), [])
+
+    def test_custom_products_do_not_crowd_out_catalog_matches(self):
+        """Sản phẩm tự tạo bị loại trước khi lấy CANDIDATE_LIMIT ứng viên theo bm25"""
+        custom = ProductCatalog.objects.bulk_create([
+            ProductCatalog(productName="Cà chua", price=0, unit="kg", shelfLife=7, isCustom=True)
+            for _ in range(product_search.CANDIDATE_LIMIT + 50)
+        ])
+        product_search.index_products(custom)
+        self.assertEqual(self.search("ca chua"), [self.tomato.productID, self.cherry.productID])
+
+
+class ProductAutocompleteTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="typer", email="t@example.com", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.category = Categories.objects.create(categoryName="Rau củ")
+        self.tomato = ProductCatalog.objects.create(productName="Cà chua", unit="kg", shelfLife=7, category=self.category)
+        self.eggplant = ProductCatalog.objects.create(productName="Cà tím", unit="kg", shelfLife=7, category=self.category)
+        self.carrot = ProductCatalog.objects.create(productName="Cà rốt", unit="kg", shelfLife=7)
+        self.custom = ProductCatalog.objects.create(productName="Cà chua nhà trồng", unit="kg", shelfLife=7, isCustom=True)
+        self.url = reverse("product-autocomplete")
+
+    def suggest(self, query, **params):
+        res = self.client.get(self.url, {"q": query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [p["productID"] for p in res.data]
+
+    def test_ranked_by_popularity(self):
+        """Sản phẩm xuất hiện trong nhiều tủ lạnh hơn đứng trước"""
+        for i in range(2):
+            fridge = Fridge.objects.create(group=Group.objects.create(groupName=f"Nhà {i}"))
+            AddToFridge.objects.create(fridge=fridge, product=self.carrot, quantity=1, expiredDate="2030-01-01")
+        fridge = Fridge.objects.create(group=Group.objects.create(groupName="Nhà 3"))
+        AddToFridge.objects.create(fridge=fridge, product=self.eggplant, quantity=1, expiredDate="2030-01-01")
+
+        self.assertEqual(self.suggest("ca"), [self.carrot.productID, self.eggplant.productID, self.tomato.productID])
+        self.assertEqual(self.suggest("Cà", limit=1), [self.carrot.productID])
+
+    def test_matches_any_word_without_diacritics(self):
+        res = self.client.get(self.url, {"q": "tim"})
+        self.assertEqual([p["productID"] for p in res.data], [self.eggplant.productID])
+        self.assertEqual(res.data[0]["categoryName"], "Rau củ")
+        self.assertEqual(self.suggest("chua"), [self.tomato.productID])
+
+    def test_served_from_memory_and_refreshed_on_catalog_change(self):
+        self.suggest("ca")
+        with self.assertNumQueries(0):
+            product_autocomplete.suggest("ca ch")
+
+        self.tomato.productName = "Cà chua bi"
+        self.tomato.save()
+        ProductCatalog.objects.create(productName="Cải ngọt", unit="bó", shelfLife=3)
+        self.assertEqual([p["productName"] for p in product_autocomplete.suggest("ca ch")], ["Cà chua bi"])
+        self.assertEqual(len(self.suggest("ca")), 4)
+
+    def test_invalid_limit(self):
+        res = self.client.get(self.url, {"q": "ca", "limit": "x"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.models.add_to_list import AddToList
+from api.utils import query_plans
+
+
+class QueryPlanTests(TestCase):
+    def test_canonical_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', '--verbose-plan', stdout=out)
+        self.assertIn('product.catalog_by_name: OK', out.getvalue())
+        self.assertIn('SEARCH api_passwordresetotp USING INDEX otp_lookup_idx (email=? AND otp=?)', out.getvalue())
+
+    def test_detects_full_table_scan(self):
+        details = query_plans.explain(AddToList.objects.filter(quantity=3))
+        self.assertEqual(query_plans.scans(details), ['SCAN api_addtolist'])
+        # Quét subquery không phải bảng thật
+        self.assertEqual(query_plans.scans(['SCAN (subquery-1)', 'SCAN CONSTANT ROW']), [])
+
+    def test_command_fails_on_regression(self):
+        from api.management.commands import check_query_plans
+
+        original = check_query_plans.canonical_queries
+        check_query_plans.canonical_queries = lambda: [('scan', AddToList.objects.filter(quantity=3))]
+        try:
+            with self.assertRaises(CommandError):
+                call_command('check_query_plans', stdout=StringIO())
+        finally:
+            check_query_plans.canonical_queries = original
@@ -0,0 +1,101 @@
+import pytest
+from django.db import transaction
+
+from api.models.product_catalog import ProductCatalog
+from api.models.recipe import Recipe
+from api.models.ingredient import Ingredient
+from api.serializers.recipe_serializers import RecipeSerializer
+from api.utils.recipe_index import recipe_index
+from api.utils.versioning import bump_version
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def products():
+    return [
+        ProductCatalog.objects.create(productName=name, original_price=0, price=0, unit='kg', shelfLife=5)
+        for name in ('Thịt bò', 'Cà rốt', 'Hành tây')
+    ]
+
+
+@pytest.fixture
+def recipe(products):
+    recipe = Recipe.objects.create(recipeName='Bò hầm', description='x', instruction='x')
+    Ingredient.objects.create(recipe=recipe, product=products[0])
+    Ingredient.objects.create(recipe=recipe, product=products[1])
+    return recipe
+
+
+def test_index_is_built_from_ingredients(recipe, products):
+    assert sorted(recipe_index.products_of(recipe.recipeID)) == [products[0].productID, products[1].productID]
+    assert list(recipe_index.recipes_of(products[1].productID)) == [recipe.recipeID]
+
+
+def test_index_follows_ingredient_signals(recipe, products, django_assert_num_queries, django_capture_on_commit_callbacks):
+    recipe_index.ensure_fresh()
+    generation = recipe_index.generation
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.create(recipe=recipe, product=products[2])
+        Ingredient.objects.filter(recipe=recipe, product=products[0]).delete()
+
+    assert recipe_index.generation > generation
+    # Đọc index sau khi cập nhật không cần query lại database
+    with django_assert_num_queries(0):
+        assert sorted(recipe_index.products_of(recipe.recipeID)) == [products[1].productID, products[2].productID]
+        assert list(recipe_index.recipes_of(products[0].productID)) == []
+
+
+def test_local_change_does_not_rebuild_index(recipe, products, django_assert_num_queries, django_capture_on_commit_callbacks):
+    recipe_index.ensure_fresh()
+    generation = recipe_index.generation
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.create(recipe=recipe, product=products[2])
+
+    # Chỉ tăng 1 lần do add_ingredient, không build lại
+    assert recipe_index.generation == generation + 1
+    with django_assert_num_queries(0):
+        recipe_index.ensure_fresh()
+
+
+def test_change_from_another_process_rebuilds_index(recipe, products):
+    assert list(recipe_index.recipes_of(products[2].productID)) == []
+    # Process khác ghi dữ liệu: không có signal trong process này, chỉ có version mới
+    Ingredient.objects.bulk_create([Ingredient(recipe=recipe, product=products[2])])
+    bump_version('recipes', 'all')
+
+    assert list(recipe_index.recipes_of(products[2].productID)) == [recipe.recipeID]
+
+
+def test_index_drops_deleted_recipe(recipe, products, django_capture_on_commit_callbacks):
+    recipe_index.ensure_fresh()
+    recipe_id = recipe.recipeID
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.delete()
+
+    assert list(recipe_index.products_of(recipe_id)) == []
+    assert list(recipe_index.recipes_of(products[0].productID)) == []
+
+
+def test_serializer_update_replaces_ingredients_in_index(recipe, products, django_capture_on_commit_callbacks):
+    recipe_index.ensure_fresh()
+    serializer = RecipeSerializer(recipe, data={'ingredients': [products[2].productID]}, partial=True)
+    assert serializer.is_valid(), serializer.errors
+    with django_capture_on_commit_callbacks(execute=True):
+        serializer.save()
+
+    assert list(recipe_index.products_of(recipe.recipeID)) == [products[2].productID]
+    assert list(recipe_index.recipes_of(products[0].productID)) == []
+    assert list(recipe_index.recipes_of(products[2].productID)) == [recipe.recipeID]
+
+
+def test_rolled_back_changes_do_not_reach_index(recipe, products):
+    recipe_index.ensure_fresh()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Ingredient.objects.create(recipe=recipe, product=products[2])
+            raise RuntimeError
+
+    assert sorted(recipe_index.products_of(recipe.recipeID)) == [products[0].productID, products[1].productID]
+    assert list(recipe_index.recipes_of(products[2].productID)) == []
@@ -14,6 +14,7 @@ from api.models.recipe import Recipe
 from api.models.ingredient import Ingredient
 from api.models.in_model import In
 from api.serializers.recipe_serializers import RecipeSerializer
+from api.utils.versioning import bump_version
 
 User = get_user_model()
 
@@ -181,4 +182,91 @@ class TestRecipeRecommendationView:
 
         # Item đó phải là item thứ 2 trong danh sách đã sắp xếp (Bò hầm)
         assert recommendations[0]['recipeName'] == 'Bò hầm'
-        assert recommendations[0]['match_percentage'] == 66.67
\ No newline at end of file
+        assert recommendations[0]['match_percentage'] == 66.67
+
+    def test_recipes_without_fridge_products_are_not_scored(self, api_client, setup_data):
+        """Công thức không có nguyên liệu nào trong tủ lạnh không được gợi ý."""
+        recipe = Recipe.objects.create(recipeName='Hành phi', description='x', instruction='x')
+        Ingredient.objects.create(recipe=recipe, product=setup_data['p_onion'])
+        api_client.force_authenticate(user=setup_data['user_a'])
+
+        response = api_client.get('/api/recommendations/')
+
+        assert response.data['total_recommendations'] == 3
+        names = {r['recipeName'] for r in response.data['recommendations']}
+        assert 'Hành phi' not in names
+
+    def test_query_count_does_not_grow_with_recipes(self, api_client, setup_data, django_assert_max_num_queries):
+        """Số query không phụ thuộc vào số lượng công thức."""
+        carrot = Product.objects.get(productName='Cà rốt')
+        for i in range(20):
+            recipe = Recipe.objects.create(recipeName=f'Món {i}', description='x', instruction='x')
+            Ingredient.objects.create(recipe=recipe, product=carrot)
+            Ingredient.objects.create(recipe=recipe, product=setup_data['p_onion'])
+        api_client.force_authenticate(user=setup_data['user_a'])
+
+        with django_assert_max_num_queries(10):
+            response = api_client.get('/api/recommendations/')
+
+        assert response.data['total_recommendations'] == 23
+        assert len(response.data['recommendations']) == 4
+
+    def test_invalid_mode_returns_400(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['user_a'])
+        response = api_client.get('/api/recommendations/?mode=unknown')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_expiry_mode_returns_scores(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['user_a'])
+        response = api_client.get('/api/recommendations/?mode=expiry')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['mode'] == 'expiry'
+        scores = [r['score'] for r in response.data['recommendations']]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_next_pages_are_served_from_cache(self, api_client, setup_data, django_assert_num_queries):
+        """Trang 2..N chỉ cần lấy group, tủ lạnh và các công thức của trang."""
+        api_client.force_authenticate(user=setup_data['user_a'])
+        api_client.get('/api/recommendations/?page=1&page_size=1')
+
+        with django_assert_num_queries(4):
+            response = api_client.get('/api/recommendations/?page=2&page_size=1')
+        assert response.data['recommendations'][0]['recipeName'] == 'Bò hầm'
+
+    def test_fridge_write_invalidates_cache(self, api_client, setup_data):
+        api_client.force_authenticate(user=setup_data['user_a'])
+        response = api_client.get('/api/recommendations/')
+        assert response.data['recommendations'][1]['match_percentage'] == 66.67
+
+        fridge = Fridge.objects.get(group=setup_data['group_a'])
+        AddToFridge.objects.create(fridge=fridge, product=setup_data['p_onion'], quantity=1, expiredDate=date.today())
+
+        response = api_client.get('/api/recommendations/')
+        names = [r['recipeName'] for r in response.data['recommendations'][:2]]
+        assert names == ['Bò hầm', 'Salad đơn giản']
+
+    def test_recipe_change_from_another_process_invalidates_cache(self, api_client, setup_data):
+        """Process khác ghi công thức: index trong process này không nhận signal, chỉ thấy version mới"""
+        api_client.force_authenticate(user=setup_data['user_a'])
+        response = api_client.get('/api/recommendations/')
+        assert response.data['recommendations'][0]['recipeName'] == 'Salad đơn giản'
+
+        salad = Recipe.objects.get(recipeName='Salad đơn giản')
+        Ingredient.objects.bulk_create([Ingredient(recipe=salad, product=setup_data['p_onion'])])
+        bump_version('recipes', 'all')
+
+        response = api_client.get('/api/recommendations/')
+        salad_result = next(r for r in response.data['recommendations'] if r['recipeName'] == 'Salad đơn giản')
+        assert salad_result['match_percentage'] == 50
+
+    def test_use_soon_mode_prioritizes_expiring_items(self, api_client, setup_data):
+        """Thịt bò và cà rốt hết hạn hôm nay -> Bò hầm dùng được nhiều nhất."""
+        api_client.force_authenticate(user=setup_data['user_a'])
+        response = api_client.get('/api/recommendations/?mode=use_soon')
+
+        assert response.status_code == status.HTTP_200_OK
+        recommendations = response.data['recommendations']
+        assert [r['recipeName'] for r in recommendations] == ['Bò hầm', 'Salad đơn giản', 'Canh gà']
+        expiring = {item['product_name']: item['days_remaining'] for item in recommendations[0]['expiring_ingredients']}
+        assert expiring == {'Thịt bò': 0, 'Cà rốt': 0}
@@ -13,6 +13,23 @@ from api.models.add_to_list import AddToList
 from api.models import ProductCatalog, Categories
 from api.models import Group
 from datetime import date
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from api.models.fridge import Fridge
+from api.models.add_to_fridge import AddToFridge
+from api.models.fridge_stats import FridgeStats
+from api.models.in_model import In
+from api.models.meal_plan import MealPlan
+from api.models.have import Have
+from api.models.recipe import Recipe
+from api.models.ingredient import Ingredient
+from api.models.purchase_rollup import PurchaseRollup
+from api.utils.shopping_list_generator import generate_shopping_list
+from django.core.management import call_command
+from django.utils import timezone
+from io import StringIO
+from decimal import Decimal
 
 User = get_user_model()
 
@@ -55,6 +72,50 @@ class ShoppingListTests(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data), 2)  # Có 2 list: List B từ setUp và List A
 
+    def test_list_summary_in_one_query(self):
+        product = ProductCatalog.objects.create(productName='Milk', original_price=10, price=10, unit='l', shelfLife=7)
+        other = ProductCatalog.objects.create(productName='Egg', original_price=3, price=3, unit='pcs', shelfLife=14)
+        AddToList.objects.create(list=self.shopping_list, product=product, quantity=2, status='purchased')
+        AddToList.objects.create(list=self.shopping_list, product=other, quantity=4, status='pending')
+        # Giá thay đổi sau khi mua: item đã mua vẫn tính theo giá lúc mua
+        product.original_price = 20
+        product.save()
+
+        url = reverse('shopping-list')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'group_id': self.group.groupID})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response.data[0]['stats'], {
+            'total_items': 2, 'purchased_items': 1, 'pending_items': 1, 'progress': 50.0
+        })
+        self.assertEqual(response.data[0]['estimated_cost'], 32)
+
+    def test_cursor_pagination(self):
+        for i in range(4):
+            ShoppingList.objects.create(user=self.user, group=self.group, listName=f'List {i}', date=date.today(), type='day')
+        url = reverse('shopping-list')
+        expected = [item['listID'] for item in self.client.get(url, {'group_id': self.group.groupID}).data]
+
+        seen, cursor = [], None
+        while True:
+            params = {'group_id': self.group.groupID, 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, params)
+            self.assertEqual(len(ctx.captured_queries), 1)
+            seen += [item['listID'] for item in response.data['results']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 5)
+
+        response = self.client.get(url, {'group_id': self.group.groupID, 'cursor': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'group_id': self.group.groupID, 'cursor': '99999999999999999999_1'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 class ShoppingListDetailTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='user2', email='user2@test.com', password='pass')
@@ -74,12 +135,52 @@ class ShoppingListDetailTests(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['list']['listName'], 'List B')
 
+    def test_list_detail_query_count_is_constant(self):
+        """Chi tiết danh sách: 1 truy vấn list + 1 truy vấn items, bất kể số item"""
+        url = reverse('shopping-list-detail', args=[self.shopping_list.listID])
+        category = Categories.objects.create(categoryName='Rau')
+
+        def add_items(count):
+            for _ in range(count):
+                product = ProductCatalog.objects.create(productName='SP', original_price=1, unit='kg', shelfLife=3, category=category)
+                AddToList.objects.create(
+                    list=self.shopping_list, product=product, quantity=1,
+                    status='purchased' if AddToList.objects.count() % 2 else 'pending'
+                )
+
+        add_items(2)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['stats']['total_items'], 2)
+
+        add_items(18)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['stats'], {
+            'total_items': 20, 'purchased_items': 10, 'pending_items': 10, 'progress': 50.0
+        })
+        self.assertEqual(response.data['items'][0]['product_details']['category_name'], 'Rau')
+
     def test_update_shopping_list(self):
         url = reverse('shopping-list-detail', args=[self.shopping_list.listID])
         response = self.client.put(url, {'listName': 'Updated Title'})
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['data']['listName'], 'Updated Title')
 
+    def test_update_keeps_concurrent_total_spent(self):
+        shopping_list = ShoppingList.objects.get(listID=self.shopping_list.listID)
+        # Item được mua (cộng bằng F()) sau khi danh sách đã được nạp để đổi tên
+        ShoppingList.objects.filter(listID=shopping_list.listID).update(total_spent=F('total_spent') + 25)
+        shopping_list.listName = 'Đổi tên'
+        shopping_list.save()
+        shopping_list.refresh_from_db()
+        self.assertEqual((shopping_list.listName, shopping_list.total_spent), ('Đổi tên', 25))
+
+        ShoppingList.objects.filter(listID=shopping_list.listID).update(total_spent=F('total_spent') + 5)
+        url = reverse('shopping-list-detail', args=[self.shopping_list.listID])
+        response = self.client.put(url, {'listName': 'Lần 2'})
+        self.assertEqual(response.data['data']['total_spent'], '30.00')
+
     def test_delete_shopping_list(self):
         url = reverse('shopping-list-detail', args=[self.shopping_list.listID])
         response = self.client.delete(url)
@@ -215,6 +316,9 @@ class StatsTests(APITestCase):
             shelfLife=30,
             category=self.category
         )
+        self.other = ProductCatalog.objects.create(
+            productName='Salt', original_price=1, price=1, unit='kg', shelfLife=365
+        )
         self.list = ShoppingList.objects.create(
             user=self.user, 
             group=self.group, 
@@ -241,6 +345,134 @@ class StatsTests(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data[0]['name'], 'Dairy')
 
+    def rollup(self):
+        return list(PurchaseRollup.objects.filter(group=self.group).values_list('category_id', 'item_count', 'total_quantity'))
+
+    def test_toggle_updates_rollup(self):
+        item = AddToList.objects.create(list=self.list, product=self.other, quantity=2, status='pending')
+        self.assertEqual(sorted(self.rollup()), [(self.category.categoryID, 1, 3)])
+
+        url = reverse('toggle-item-status', args=[self.list.listID, item.id])
+        self.client.patch(url)
+        item.refresh_from_db()
+        self.assertIsNotNone(item.purchased_at)
+        self.assertEqual(sorted(self.rollup(), key=str), sorted([(self.category.categoryID, 1, 3), (None, 1, 2)], key=str))
+
+        self.client.patch(url)
+        item.refresh_from_db()
+        self.assertIsNone(item.purchased_at)
+        self.assertEqual(self.rollup(), [(self.category.categoryID, 1, 3)])
+
+    def test_update_and_delete_adjust_rollup(self):
+        item = AddToList.objects.get(list=self.list, product=self.product)
+        url = reverse('add-to-list-detail', args=[self.list.listID, item.id])
+        self.client.put(url, {'quantity': 5}, format='json')
+        self.assertEqual(self.rollup(), [(self.category.categoryID, 1, 5)])
+        self.client.delete(url)
+        self.assertEqual(self.rollup(), [])
+
+    def test_unpurchase_after_category_change(self):
+        item = AddToList.objects.get(list=self.list, product=self.product)
+        self.assertEqual(item.purchased_category_id, self.category.categoryID)
+        self.product.category = Categories.objects.create(categoryName='Snack')
+        self.product.save()
+
+        # Trừ vào ô danh mục lúc mua, không để lại dòng âm ở danh mục mới
+        self.client.patch(reverse('toggle-item-status', args=[self.list.listID, item.id]))
+        self.assertEqual(self.rollup(), [])
+        item.refresh_from_db()
+        self.assertIsNone(item.purchased_category_id)
+
+    def test_batch_updates_rollup(self):
+        item = AddToList.objects.create(list=self.list, product=self.other, quantity=4, status='pending')
+        url = reverse('shopping-list-batch', args=[self.list.listID])
+        self.client.post(url, {'operations': [{'op': 'toggle', 'id': item.id}]}, format='json')
+        response = self.client.get(reverse('purchased-shopping-stats'), {'group_id': self.group.groupID})
+        self.assertEqual(response.data['total_items'], 2)
+        self.assertEqual(response.data['total_quantity'], 7)
+
+    def test_stats_date_range(self):
+        old = ShoppingList.objects.create(
+            user=self.user, group=self.group, listName='Old', date=date.today() - timedelta(days=10), type='day'
+        )
+        item = AddToList.objects.create(list=old, product=self.product, quantity=1, status='purchased')
+        AddToList.objects.filter(id=item.id).update(purchased_at=timezone.now() - timedelta(days=10))
+        call_command('backfill_purchase_rollup', stdout=StringIO())
+
+        url = reverse('purchased-shopping-stats')
+        response = self.client.get(url, {'group_id': self.group.groupID})
+        self.assertEqual(response.data['total_items'], 2)
+        self.assertEqual(response.data['total_price'], 60)
+
+        start = (date.today() - timedelta(days=1)).isoformat()
+        response = self.client.get(url, {'group_id': self.group.groupID, 'start_date': start})
+        self.assertEqual(response.data['total_items'], 1)
+        self.assertEqual(response.data['total_quantity'], 3)
+        self.assertEqual(response.data['total_price'], 45)
+
+        end = (date.today() - timedelta(days=5)).isoformat()
+        response = self.client.get(reverse('purchased-stats-by-category'), {'group_id': self.group.groupID, 'end_date': end})
+        self.assertEqual(response.data, [{'name': 'Dairy', 'value': 1}])
+
+        response = self.client.get(url, {'group_id': self.group.groupID, 'start_date': '2024-13-01'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_spend_uses_price_at_purchase(self):
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.total_spent, 45)
+        item = AddToList.objects.get(list=self.list, product=self.product)
+        self.assertEqual(item.unit_price, 15)
+
+        # Giảm giá sau khi mua không làm thay đổi số tiền đã chi
+        self.product.discount = 50
+        self.product.save()
+        url = reverse('purchased-shopping-stats')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'group_id': self.group.groupID})
+        self.assertEqual(response.data['total_price'], 45)
+        self.assertFalse(any('api_productcatalog' in query['sql'] for query in ctx.captured_queries))
+
+        # Mua lại sau khi bỏ đánh dấu thì lấy giá mới
+        toggle_url = reverse('toggle-item-status', args=[self.list.listID, item.id])
+        self.client.patch(toggle_url)
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.total_spent, 0)
+        response = self.client.patch(toggle_url)
+        self.assertEqual(response.data['data']['unit_price'], '7.50')
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.total_spent, Decimal('22.50'))
+        self.assertEqual(self.client.get(url, {'group_id': self.group.groupID}).data['total_price'], 22.5)
+
+    def test_backfill_rebuilds_rollup(self):
+        AddToList.objects.filter(list=self.list).update(purchased_at=None, unit_price=None)
+        ShoppingList.objects.filter(listID=self.list.listID).update(total_spent=0)
+        PurchaseRollup.objects.all().delete()
+        call_command('backfill_purchase_rollup', stdout=StringIO())
+        self.assertEqual(self.rollup(), [(self.category.categoryID, 1, 3)])
+        self.assertEqual(PurchaseRollup.objects.get(group=self.group).total_spent, 45)
+        self.list.refresh_from_db()
+        self.assertEqual(self.list.total_spent, 45)
+        self.assertFalse(AddToList.objects.filter(status='purchased', purchased_at__isnull=True).exists())
+
+    def test_backfill_invalidates_list_etag(self):
+        url = reverse('shopping-list-detail', args=[self.list.listID])
+        etag = self.client.get(url)['ETag']
+        call_command('backfill_purchase_rollup', stdout=StringIO())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_unpurchase_without_rollup_row_recomputes_cell(self):
+        other = ProductCatalog.objects.create(
+            productName='Milk', original_price=2, price=2, unit='l', shelfLife=7, category=self.category
+        )
+        AddToList.objects.create(list=self.list, product=other, quantity=4, status='purchased')
+        # Mua trước khi có rollup (chưa chạy backfill)
+        PurchaseRollup.objects.all().delete()
+
+        item = AddToList.objects.get(list=self.list, product=self.product)
+        self.client.patch(reverse('toggle-item-status', args=[self.list.listID, item.id]))
+        self.assertEqual(self.rollup(), [(self.category.categoryID, 1, 4)])
+        self.assertEqual(PurchaseRollup.objects.get(group=self.group).total_spent, 8)
+
 from rest_framework import serializers
 from ..models.add_to_list import AddToList
 from ..models.shopping_list import ShoppingList
@@ -265,4 +497,246 @@ class ShoppingListSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShoppingList
         fields = ['listID', 'createdAt', 'listName', 'date', 'group', 'user', 'type']
-        read_only_fields = ['listID', 'createdAt', 'user']
\ No newline at end of file
+        read_only_fields = ['listID', 'createdAt', 'user']
+
+
+class ShoppingListFromMealPlansTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='planner', email='planner@test.com', password='password')
+        self.client.force_authenticate(user=self.user)
+        self.group = Group.objects.create(groupName='Plan Group')
+        In.objects.create(user=self.user, group=self.group)
+        self.monday = date(2025, 6, 2)
+        self.url = reverse('shopping-list-from-meal-plans')
+
+        self.rice, self.egg, self.tomato, self.fish = [
+            ProductCatalog.objects.create(productName=name, original_price=1, unit='kg', shelfLife=7)
+            for name in ('Gạo', 'Trứng', 'Cà chua', 'Cá')
+        ]
+        fried_rice = Recipe.objects.create(recipeName='Cơm chiên', description='', instruction='')
+        omelette = Recipe.objects.create(recipeName='Trứng chiên', description='', instruction='')
+        fish_soup = Recipe.objects.create(recipeName='Canh cá', description='', instruction='')
+        for recipe, products in ((fried_rice, [self.rice, self.egg]), (omelette, [self.egg, self.tomato]), (fish_soup, [self.fish, self.tomato])):
+            for product in products:
+                Ingredient.objects.create(recipe=recipe, product=product)
+
+        for day, meal, recipe in ((0, 'lunch', fried_rice), (1, 'dinner', omelette), (2, 'lunch', omelette), (10, 'lunch', fish_soup)):
+            plan = MealPlan.objects.create(
+                plan_name='Tuần', start_date=self.monday + timedelta(days=day), mealType=meal,
+                day_of_week=day % 7, group=self.group, user=self.user
+            )
+            Have.objects.create(plan=plan, recipe=recipe)
+
+        # Tủ lạnh có 1 quả trứng, 5 kg gạo; cà chua đã hết hạn nên không tính
+        fridge = Fridge.objects.create(group=self.group)
+        AddToFridge.objects.create(fridge=fridge, product=self.egg, quantity=1, expiredDate=self.monday + timedelta(days=5))
+        AddToFridge.objects.create(fridge=fridge, product=self.rice, quantity=5, expiredDate=self.monday + timedelta(days=30))
+        AddToFridge.objects.create(fridge=fridge, product=self.tomato, quantity=3, expiredDate=self.monday - timedelta(days=1))
+
+        # Đang chờ mua 1 cà chua ở danh sách khác
+        other = ShoppingList.objects.create(user=self.user, group=self.group, listName='Cũ', date=self.monday, type='day')
+        AddToList.objects.create(list=other, product=self.tomato, quantity=1, status='pending')
+
+    def test_generates_missing_items(self):
+        response = self.client.post(self.url, {'group_id': self.group.groupID, 'start_date': '2025-06-02'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        shopping_list = ShoppingList.objects.get(listID=response.data['data']['list']['listID'])
+        self.assertEqual(shopping_list.type, 'week')
+        items = dict(AddToList.objects.filter(list=shopping_list).values_list('product_id', 'quantity'))
+        # Trứng: 3 bữa - 1 trong tủ; cà chua: 2 bữa - 1 đang chờ mua; gạo đủ; cá ngoài khoảng ngày
+        self.assertEqual(items, {self.egg.productID: 2, self.tomato.productID: 1})
+        self.assertEqual(len(response.data['data']['items']), 2)
+
+        # Chạy lại: các sản phẩm vừa thêm đang chờ mua nên không thiếu gì nữa
+        response = self.client.post(self.url, {'group_id': self.group.groupID, 'start_date': '2025-06-02'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['data'])
+
+    def test_query_count_is_bounded(self):
+        with CaptureQueriesContext(connection) as ctx:
+            generate_shopping_list(self.group.groupID, self.user, self.monday, self.monday + timedelta(days=30))
+        # nhu cầu, tủ lạnh, đang chờ mua, tạo list, bulk_create items (+ savepoint)
+        self.assertLessEqual(len([q for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]), 5)
+
+    def test_invalid_group(self):
+        response = self.client.post(self.url, {'group_id': 'abc', 'start_date': '2025-06-02'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Không phải thành viên: không được tạo danh sách cho group
+        outsider = User.objects.create_user(username='outsider', email='outsider@test.com', password='password')
+        self.client.force_authenticate(user=outsider)
+        response = self.client.post(self.url, {'group_id': self.group.groupID, 'start_date': '2025-06-02'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(ShoppingList.objects.filter(user=outsider).exists())
+
+    def test_invalid_dates(self):
+        response = self.client.post(self.url, {'group_id': self.group.groupID, 'start_date': '02/06/2025'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            self.url, {'group_id': self.group.groupID, 'start_date': '2025-06-08', 'end_date': '2025-06-01'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ShoppingListBatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='batch', email='batch@test.com', password='pass')
+        self.client.force_authenticate(self.user)
+        self.group = Group.objects.create(groupName='Batch Group')
+        self.list = ShoppingList.objects.create(user=self.user, group=self.group, listName='Siêu thị', date=date.today(), type='day')
+        self.products = [
+            ProductCatalog.objects.create(productName=f'SP {i}', original_price=10, unit='kg', shelfLife=7)
+            for i in range(6)
+        ]
+        self.items = [
+            AddToList.objects.create(list=self.list, product=product, quantity=1, status='pending')
+            for product in self.products[:4]
+        ]
+        self.url = reverse('shopping-list-batch', args=[self.list.listID])
+
+    def test_applies_all_operations(self):
+        detail_url = reverse('shopping-list-detail', args=[self.list.listID])
+        etag = self.client.get(detail_url)['ETag']
+
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'add', 'product': self.products[4].productID, 'quantity': 2},
+            {'op': 'update', 'id': self.items[0].id, 'quantity': 5},
+            {'op': 'toggle', 'id': self.items[1].id},
+            {'op': 'update', 'id': self.items[2].id, 'status': 'purchased'},
+            {'op': 'delete', 'id': self.items[3].id},
+            {'op': 'add', 'product': self.products[3].productID},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = {item.product_id: (item.quantity, item.status) for item in AddToList.objects.filter(list=self.list)}
+        self.assertEqual(rows, {
+            self.products[0].productID: (5, 'pending'),
+            self.products[1].productID: (1, 'purchased'),
+            self.products[2].productID: (1, 'purchased'),
+            self.products[3].productID: (1, 'pending'),
+            self.products[4].productID: (2, 'pending'),
+        })
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual(response.data['deleted'], [self.items[3].id])
+        self.assertEqual(response.data['stats'], {
+            'total_items': 5, 'purchased_items': 2, 'pending_items': 3, 'progress': 40.0
+        })
+        # Version mới: ETag cũ của trang chi tiết không còn dùng được
+        self.assertNotIn(response.data['version'], etag)
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_query_count_does_not_grow_with_operations(self):
+        def run(ids):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url, {'operations': [{'op': 'toggle', 'id': i} for i in ids]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        # Lần đầu có item được mua sẽ tạo dòng PurchaseRollup cho ngày hôm nay
+        run([item.id for item in self.items])
+        self.assertEqual(run([self.items[0].id]), run([item.id for item in self.items]))
+
+    def test_errors_reported_per_operation_and_nothing_applied(self):
+        other_list = ShoppingList.objects.create(user=self.user, group=self.group, listName='Khác', date=date.today(), type='day')
+        foreign = AddToList.objects.create(list=other_list, product=self.products[5], quantity=1, status='pending')
+
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'toggle', 'id': self.items[0].id},
+            {'op': 'add', 'product': self.products[0].productID},
+            {'op': 'delete', 'id': foreign.id},
+            {'op': 'update', 'id': self.items[1].id, 'quantity': -1},
+            {'op': 'rename'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sorted(response.data['errors']), [1, 2, 3, 4])
+        self.assertFalse(AddToList.objects.filter(list=self.list, status='purchased').exists())
+
+        response = self.client.post(self.url, {'operations': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ShoppingListApplyToFridgeTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='fridge_apply', email='fridge_apply@test.com', password='pass')
+        self.client.force_authenticate(self.user)
+        self.group = Group.objects.create(groupName='Apply Group')
+        self.fridge = Fridge.objects.create(group=self.group)
+        self.list = ShoppingList.objects.create(user=self.user, group=self.group, listName='Chợ', date=date.today(), type='day')
+        self.products = [
+            ProductCatalog.objects.create(productName=f'SP {i}', original_price=1, price=1, unit='kg', shelfLife=3 + i)
+            for i in range(60)
+        ]
+        self.url = reverse('shopping-list-apply-to-fridge', args=[self.list.listID])
+
+    def buy(self, products, quantity=2):
+        for product in products:
+            AddToList.objects.create(list=self.list, product=product, quantity=quantity, status='purchased')
+
+    def test_upserts_purchased_items(self):
+        today = date.today()
+        fresh, expired, new = self.products[:3]
+        AddToFridge.objects.create(fridge=self.fridge, product=fresh, quantity=1, expiredDate=today + timedelta(days=1), location='freeze')
+        AddToFridge.objects.create(fridge=self.fridge, product=expired, quantity=5, expiredDate=today - timedelta(days=1))
+        self.buy([fresh, expired, new], quantity=1.5)
+        AddToList.objects.create(list=self.list, product=self.products[3], quantity=1, status='pending')
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 2))
+
+        rows = {row.product_id: row for row in AddToFridge.objects.filter(fridge=self.fridge)}
+        self.assertEqual(len(rows), 3)
+        # Còn hạn: cộng số lượng, giữ hạn sớm hơn và vị trí cũ
+        self.assertEqual((rows[fresh.productID].quantity, rows[fresh.productID].expiredDate), (3, today + timedelta(days=1)))
+        self.assertEqual(rows[fresh.productID].location, 'freeze')
+        # Hết hạn: thay bằng hàng mới
+        self.assertEqual((rows[expired.productID].quantity, rows[expired.productID].expiredDate), (2, today + timedelta(days=4)))
+        self.assertEqual((rows[new.productID].quantity, rows[new.productID].expiredDate), (2, today + timedelta(days=5)))
+
+        # Gọi lại không cộng trùng
+        response = self.client.post(self.url)
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 0))
+        self.assertEqual(AddToFridge.objects.get(fridge=self.fridge, product=fresh).quantity, 3)
+
+    def test_repurchase_after_untoggle_is_applied_again(self):
+        product = self.products[0]
+        item = AddToList.objects.create(list=self.list, product=product, quantity=1, status='pending')
+        toggle_url = reverse('toggle-item-status', args=[self.list.listID, item.id])
+        self.client.patch(toggle_url)
+        self.assertEqual(self.client.post(self.url).data['created'], 1)
+
+        # Bỏ đánh dấu rồi mua lại: lần mua mới phải được đưa vào tủ lạnh
+        self.client.patch(toggle_url)
+        item.refresh_from_db()
+        self.assertFalse(item.in_fridge)
+        self.client.patch(toggle_url)
+        response = self.client.post(self.url)
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 1))
+        self.assertEqual(AddToFridge.objects.get(fridge=self.fridge, product=product).quantity, 2)
+
+    def test_refreshes_fridge_stats_and_version(self):
+        self.buy(self.products[:2])
+        fridge_url = reverse('fridge-list') + f'?group_id={self.group.groupID}'
+        In.objects.create(user=self.user, group=self.group)
+        etag = self.client.get(fridge_url)['ETag']
+        self.client.post(self.url)
+        response = self.client.get(fridge_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stats']['total_products'], 2)
+        self.assertEqual(FridgeStats.objects.get(fridge=self.fridge).total_products, 2)
+
+    def test_query_count_does_not_grow_with_items(self):
+        def run(products):
+            self.buy(products)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url)
+            self.assertEqual(response.data['created'], len(products))
+            return len(ctx.captured_queries)
+
+        # Lần đầu tạo dòng FridgeStats/bucket cho tủ lạnh
+        run(self.products[:1])
+        self.assertEqual(run(self.products[1:3]), run(self.products[3:]))
+
+    def test_invalid_location(self):
+        response = self.client.post(self.url, {'location': 'shelf'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,10 +1,12 @@
 from django.urls import path
-from ..views.fridge import FridgeDetailView, FridgeNotificationView
+from ..views.fridge import FridgeDetailView, FridgeImportView, FridgeNotificationView, FridgeStatsView
 from ..views.recommendation import RecipeRecommendationView
 
 urlpatterns = [
     path('', FridgeDetailView.as_view(), name='fridge-list'),
     path('notifications/', FridgeNotificationView.as_view(), name='fridge-notifications'),
+    path('stats/', FridgeStatsView.as_view(), name='fridge-stats'),
+    path('import/', FridgeImportView.as_view(), name='fridge-import'),
     path('<int:id>/', FridgeDetailView.as_view(), name='fridge-item'),
     path('recommendation/', RecipeRecommendationView.as_view(), name='recipe-recommendation'),
     #Test
@@ -2,11 +2,13 @@ from django.urls import path
 from ..views.meal_plan import (
     MealPlanListView,
     MealPlanDetailView,
-    MealPlanRecipeView
+    MealPlanRecipeView,
+    MealPlanWeeklyView
 )
 
 urlpatterns = [
     path('', MealPlanListView.as_view(), name='meal-plan-list'),
+    path('weekly/', MealPlanWeeklyView.as_view(), name='meal-plan-weekly'),
     path('<int:pk>/', MealPlanDetailView.as_view(), name='meal-plan-detail'),
     path('<int:pk>/recipes/', MealPlanRecipeView.as_view(), name='meal-plan-recipes'),
 ] 
\ No newline at end of file
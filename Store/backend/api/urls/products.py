@@ -1,9 +1,10 @@
 from django.urls import path
-from ..views.product_catalog_view import ProductCatalogView, ProductCatalogDetailView, ProductPriceView, ProductCatalogSearchView
+from ..views.product_catalog_view import ProductCatalogView, ProductCatalogDetailView, ProductPriceView, ProductCatalogSearchView, ProductAutocompleteView
 
 urlpatterns = [
     path('', ProductCatalogView.as_view(), name='product-catalog'),
     path('<int:pk>/', ProductCatalogDetailView.as_view(), name='product-detail'),
     path('<int:pk>/price/', ProductPriceView.as_view(), name='product-price'),
     path('search/', ProductCatalogSearchView.as_view(), name='product-search'),
+    path('autocomplete/', ProductAutocompleteView.as_view(), name='product-autocomplete'),
 ]
\ No newline at end of file
@@ -2,7 +2,10 @@ from django.urls import path
 from ..views.shopping_list_view import (
     ShoppingListView, 
     ShoppingListDetailView,
+    ShoppingListFromMealPlansView,
     AddToListView,
+    ShoppingListBatchView,
+    ShoppingListApplyToFridgeView,
     AddToListDetailView,
     ToggleItemStatusView,
     PurchasedShoppingStatsView,
@@ -12,10 +15,13 @@ from ..views.shopping_list_view import (
 urlpatterns = [
     # Shopping List endpoints
     path('', ShoppingListView.as_view(), name='shopping-list'),  # GET: danh sách, POST: tạo mới
+    path('from-meal-plans/', ShoppingListFromMealPlansView.as_view(), name='shopping-list-from-meal-plans'),  # POST: tạo từ kế hoạch bữa ăn
     path('<int:list_id>/', ShoppingListDetailView.as_view(), name='shopping-list-detail'),  # GET, PUT, DELETE
+    path('<int:list_id>/apply-to-fridge/', ShoppingListApplyToFridgeView.as_view(), name='shopping-list-apply-to-fridge'),  # POST: đưa item đã mua vào tủ lạnh
     
     # Shopping List Items endpoints
     path('<int:list_id>/items/', AddToListView.as_view(), name='add-to-list'),  # POST: thêm item
+    path('<int:list_id>/items/batch/', ShoppingListBatchView.as_view(), name='shopping-list-batch'),  # POST: nhiều thao tác 1 lần
     path('<int:list_id>/items/<int:item_id>/', AddToListDetailView.as_view(), name='add-to-list-detail'),  # PUT, DELETE
     path('<int:list_id>/items/<int:item_id>/toggle/', ToggleItemStatusView.as_view(), name='toggle-item-status'),  # PATCH: toggle status
 
@@ -0,0 +1,171 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+from django.db.models import Count
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.add_to_list import AddToList
+from ..models.product_catalog import ProductCatalog
+from .text_normalize import normalize
+from .versioning import get_version
+
+# Độ phổ biến (số lần xuất hiện trong tủ lạnh/danh sách mua sắm) được nạp lại sau khoảng này
+POPULARITY_TTL = 10 * 60
+# Số kết quả được nhớ lại giữa 2 lần nạp độ phổ biến
+MEMO_SIZE = 10_000
+
+
+class AutocompleteIndex:
+    """
+    - keys: list đã sắp xếp các "đuôi" tên sản phẩm đã bỏ dấu, bắt đầu tại mỗi từ
+      ("ca chua bi", "chua bi", "bi") nên gõ "chua" cũng ra "Cà chua bi"
+    - key_positions: vị trí sản phẩm (trong products) của từng key
+    - key_heads: key có phải là toàn bộ tên (tên bắt đầu bằng từ khóa) hay không
+    """
+
+    def __init__(self, rows=()):
+        entries = []
+        self.products = []
+        names = []
+        for row in rows:
+            name = normalize(row['productName'])
+            position = len(self.products)
+            self.products.append({
+                'productID': row['productID'],
+                'productName': row['productName'],
+                'unit': row['unit'],
+                'shelfLife': row['shelfLife'],
+                'isCustom': row['isCustom'],
+                'categoryName': row['category__categoryName'],
+                'categoryID': row['category_id'],
+                'image': row['image'],
+            })
+            names.append(name)
+            tokens = name.split()
+            for i in range(len(tokens)):
+                entries.append((' '.join(tokens[i:]), position, i == 0))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.key_positions = np.fromiter((position for _, position, _ in entries), dtype=np.int64, count=len(entries))
+        self.key_heads = np.fromiter((head for _, _, head in entries), dtype=bool, count=len(entries))
+        self.product_ids = np.array([product['productID'] for product in self.products], dtype=np.int64)
+        self.name_lengths = np.array([len(name) for name in names], dtype=np.int64)
+        self.key_scores = np.zeros(len(entries), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rank(self, popularity):
+        """
+        Gộp thứ tự (phổ biến hơn, tên bắt đầu bằng từ khóa, tên ngắn hơn, productID)
+        thành 1 số nguyên cho mỗi key: số càng nhỏ càng đứng trước.
+        """
+        n = len(self.products)
+        if n == 0:
+            return
+        counts = np.array([popularity.get(product_id, 0) for product_id in self.product_ids.tolist()], dtype=np.int64)
+        _, popularity_group = np.unique(-counts, return_inverse=True)
+        order = np.lexsort((self.product_ids, self.name_lengths))
+        tiebreak = np.empty(n, dtype=np.int64)
+        tiebreak[order] = np.arange(n)
+        positions = self.key_positions
+        self.key_scores = popularity_group[positions] * (2 * n) + (~self.key_heads) * n + tiebreak[positions]
+
+    def top(self, prefix, limit):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\uffff', lo)
+        scores = self.key_scores[lo:hi]
+        # Chỉ sắp xếp vài phần tử nhỏ nhất; 1 sản phẩm có thể khớp ở nhiều từ nên lấy dư
+        take = min(len(scores), limit * 4)
+        while True:
+            if take < len(scores):
+                candidates = np.argpartition(scores, take - 1)[:take]
+            else:
+                candidates = np.arange(len(scores))
+            candidates = candidates[np.argsort(scores[candidates], kind='stable')]
+            positions = list(dict.fromkeys(self.key_positions[lo + candidates].tolist()))
+            if len(positions) >= limit or take >= len(scores):
+                return [self.products[position] for position in positions[:limit]]
+            take = len(scores)
+
+
+class ProductAutocomplete:
+    """
+    Gợi ý sản phẩm theo tiền tố, giữ hoàn toàn trong bộ nhớ của mỗi worker.
+
+    Tiền tố được tìm bằng 2 lần bisect trên AutocompleteIndex, top-N lấy bằng
+    np.argpartition nên tiền tố ngắn ("c", "ca") khớp hàng chục nghìn key vẫn nhanh.
+    Dữ liệu được build lại khi phiên bản catalog thay đổi (signal của
+    ProductCatalog/Categories, xem api/signals.py) mà không cần truy vấn database
+    mỗi request. Version nằm trong cache nên các worker khác chỉ thấy thay đổi khi
+    cache dùng chung (REDIS_URL); với LocMemCache mặc định chỉ đúng khi chạy 1 process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._catalog_version = None
+        self._popularity_loaded_at = 0
+        self.index = AutocompleteIndex()
+        self._memo = {}
+
+    def ensure_fresh(self):
+        version = get_version('catalog', 'all')
+        if version != self._catalog_version:
+            with self._lock:
+                if version != self._catalog_version:
+                    self._build()
+                    self._catalog_version = version
+        elif time.monotonic() - self._popularity_loaded_at > POPULARITY_TTL:
+            with self._lock:
+                self._load_popularity(self.index)
+        return self
+
+    def _build(self):
+        rows = (
+            ProductCatalog.objects.filter(isCustom=False)
+            .values('productID', 'productName', 'unit', 'shelfLife', 'isCustom', 'image', 'category_id', 'category__categoryName')
+        )
+        self._load_popularity(AutocompleteIndex(rows))
+
+    def _load_popularity(self, index):
+        popularity = Counter()
+        for model in (AddToFridge, AddToList):
+            for product_id, count in model.objects.values_list('product_id').annotate(n=Count('product_id')).order_by():
+                popularity[product_id] += count
+        index.rank(popularity)
+        self.index = index
+        self._memo = {}
+        self._popularity_loaded_at = time.monotonic()
+
+    def reset(self):
+        """Bỏ toàn bộ dữ liệu, sẽ build lại ở lần dùng tiếp theo"""
+        with self._lock:
+            self._catalog_version = None
+            self._popularity_loaded_at = 0
+            self.index = AutocompleteIndex()
+            self._memo = {}
+
+    def suggest(self, query, limit=10):
+        """
+        Tối đa `limit` sản phẩm có 1 từ bắt đầu bằng `query` (không phân biệt dấu).
+        Xếp theo độ phổ biến, sau đó ưu tiên tên bắt đầu bằng từ khóa và tên ngắn hơn.
+        """
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        self.ensure_fresh()
+
+        memo = self._memo
+        result = memo.get((prefix, limit))
+        if result is None:
+            result = self.index.top(prefix, limit)
+            if len(memo) < MEMO_SIZE:
+                memo[(prefix, limit)] = result
+        return result
+
+
+# Instance dùng chung cho toàn bộ process
+product_autocomplete = ProductAutocomplete()
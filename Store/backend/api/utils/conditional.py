@@ -0,0 +1,74 @@
+import hashlib
+from datetime import date, datetime, time as dt_time
+
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .versioning import get_version_info
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """
+    Hỗ trợ If-None-Match cho GET của APIView.
+
+    View khai báo get_version_keys() trả về các (scope, key) mà response phụ
+    thuộc vào. ETag được tính từ token version trong cache (không đụng tới
+    database hay serializer), nếu client đã có bản mới nhất thì trả 304 ngay.
+    Last-Modified chỉ để tham khảo: nó làm tròn tới giây nên 1 thay đổi trong
+    cùng giây với response trước không làm nó tăng, vì vậy If-Modified-Since
+    không được dùng để trả 304.
+    Đặt conditional_daily = True nếu response còn phụ thuộc vào ngày hiện tại.
+    """
+    conditional_daily = False
+
+    def get_version_keys(self, request, *args, **kwargs):
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return
+        keys = self.get_version_keys(request, *args, **kwargs)
+        if keys is None:
+            return
+
+        tokens, timestamps = [], []
+        for scope, key in keys:
+            token, modified_at = get_version_info(scope, key)
+            tokens.append(token)
+            timestamps.append(modified_at)
+        if self.conditional_daily:
+            today = date.today()
+            tokens.append(today.isoformat())
+            timestamps.append(datetime.combine(today, dt_time.min).timestamp())
+
+        self.etag = quote_etag(hashlib.md5(':'.join(tokens).encode()).hexdigest())
+        self.last_modified = int(max(timestamps))
+        if self.is_not_modified(request):
+            raise NotModified()
+
+    def is_not_modified(self, request):
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        etags = parse_etags(if_none_match)
+        return '*' in etags or self.etag in etags or f'W/{self.etag}' in etags
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, 'etag', None)
+        if etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
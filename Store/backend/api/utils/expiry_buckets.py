@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, Value, When
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.fridge import Fridge
+from ..models.fridge_expiry_bucket import FridgeExpiryBucket
+
+Bucket = FridgeExpiryBucket.Bucket
+# Sản phẩm hết hạn trong vòng 3 ngày được coi là sắp hết hạn
+EXPIRING_WINDOW_DAYS = 3
+
+
+def _bucket_counts(queryset, today):
+    """1 query nhóm theo (fridge, bucket), trả về {fridge_id: {bucket: count}}"""
+    tomorrow = today + timedelta(days=1)
+    bucket = Case(
+        When(expiredDate__lt=today, then=Value(Bucket.EXPIRED)),
+        When(expiredDate=today, then=Value(Bucket.TODAY)),
+        When(expiredDate=tomorrow, then=Value(Bucket.TOMORROW)),
+        default=Value(Bucket.SOON),
+        output_field=CharField(),
+    )
+    rows = (
+        queryset.filter(expiredDate__lte=today + timedelta(days=EXPIRING_WINDOW_DAYS))
+        .annotate(bucket=bucket)
+        .values('fridge_id', 'bucket')
+        .annotate(item_count=Count('id'))
+        .order_by()
+    )
+    counts = {}
+    for row in rows:
+        counts.setdefault(row['fridge_id'], {})[row['bucket']] = row['item_count']
+    return counts
+
+
+def _bucket_rows(fridge_ids, counts, today):
+    # Lưu đủ 4 mốc (kể cả 0) để biết tủ lạnh đã được sweep trong ngày
+    return [
+        FridgeExpiryBucket(
+            fridge_id=fridge_id,
+            bucket=bucket,
+            item_count=counts.get(fridge_id, {}).get(bucket, 0),
+            as_of=today,
+        )
+        for fridge_id in fridge_ids
+        for bucket in Bucket.values
+    ]
+
+
+def sweep(today=None):
+    """Tính lại bảng bucket cho toàn bộ tủ lạnh, chạy mỗi ngày một lần"""
+    today = today or date.today()
+    counts = _bucket_counts(AddToFridge.objects.all(), today)
+    fridge_ids = list(Fridge.objects.values_list('fridgeID', flat=True))
+    rows = _bucket_rows(fridge_ids, counts, today)
+    with transaction.atomic():
+        FridgeExpiryBucket.objects.all().delete()
+        FridgeExpiryBucket.objects.bulk_create(rows, batch_size=1000)
+    return len(fridge_ids)
+
+
+def refresh_fridge(fridge_id, today=None):
+    """Tính lại bucket của 1 tủ lạnh sau khi sản phẩm thay đổi"""
+    today = today or date.today()
+    counts = _bucket_counts(AddToFridge.objects.filter(fridge_id=fridge_id), today)
+    # Upsert thay vì xóa rồi tạo lại: 2 request ghi cùng tủ lạnh không va chạm unique (fridge, bucket)
+    FridgeExpiryBucket.objects.bulk_create(
+        _bucket_rows([fridge_id], counts, today),
+        update_conflicts=True,
+        unique_fields=['fridge', 'bucket'],
+        update_fields=['item_count', 'as_of'],
+    )
+
+
+def mark_stale(fridge_id):
+    """Xóa bucket của tủ lạnh, get_counts sẽ tính lại cho tới khi refresh_fridge chạy"""
+    FridgeExpiryBucket.objects.filter(fridge_id=fridge_id).delete()
+
+
+def get_counts(fridge, today=None):
+    """Số sản phẩm theo từng mốc, đọc từ bảng bucket (chỉ tính lại nếu chưa sweep hôm nay)"""
+    today = today or date.today()
+    rows = list(FridgeExpiryBucket.objects.filter(fridge=fridge).values_list('bucket', 'item_count', 'as_of'))
+    if len(rows) != len(Bucket.values) or any(as_of != today for _, _, as_of in rows):
+        refresh_fridge(fridge.fridgeID, today)
+        rows = FridgeExpiryBucket.objects.filter(fridge=fridge).values_list('bucket', 'item_count', 'as_of')
+    return {bucket: item_count for bucket, item_count, _ in rows}
@@ -0,0 +1,205 @@
+import csv
+import io
+import unicodedata
+from datetime import date, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.categories import Categories
+from ..models.product_catalog import ProductCatalog
+from . import product_search
+from .fridge_restock import refresh_fridge, upsert_items
+from .versioning import bump_version
+
+# Số dòng tối đa mỗi lần nhập (tên sản phẩm được so khớp bằng 1 truy vấn MATCH trên index tìm kiếm)
+MAX_ROWS = 500
+CSV_FIELDS = ('product_id', 'productName', 'quantity', 'expiredDate', 'location', 'unit', 'category_id')
+
+
+def name_key(name):
+    """Khóa so khớp tên: không phân biệt hoa thường kể cả chữ có dấu ('Ớt' == 'ớt'), dựng sẵn dấu (NFC)"""
+    return unicodedata.normalize('NFC', name).casefold()
+
+
+class ImportRow:
+    """1 dòng nhập đã kiểm tra kiểu dữ liệu, chưa gắn với sản phẩm"""
+
+    def __init__(self, index, data, today):
+        self.index = index
+        self.product = None
+        self.product_created = False
+        self.status = None
+        self.error = None
+        if not isinstance(data, dict):
+            raise ValueError('Mỗi dòng phải là object')
+
+        self.product_id = self.parse_int(data.get('product_id'), 'product_id')
+        self.product_name = str(data.get('productName') or '').strip()
+        if self.product_id is None and not self.product_name:
+            raise ValueError('Thiếu productName hoặc product_id')
+
+        self.quantity = self.parse_int(data.get('quantity'), 'quantity')
+        if self.quantity is None or self.quantity <= 0:
+            raise ValueError('quantity phải là số nguyên lớn hơn 0')
+
+        self.expired_date = None
+        if data.get('expiredDate'):
+            try:
+                self.expired_date = date.fromisoformat(str(data['expiredDate']).strip())
+            except ValueError:
+                raise ValueError('Định dạng ngày hết hạn không hợp lệ. Sử dụng YYYY-MM-DD.')
+            if self.expired_date < today:
+                raise ValueError('Ngày hết hạn phải từ hôm nay trở đi')
+
+        self.location = data.get('location') or None
+        if self.location is not None and self.location not in AddToFridge.LocationType.values:
+            raise ValueError(f"location phải là một trong: {', '.join(AddToFridge.LocationType.values)}")
+        self.unit = str(data.get('unit') or '').strip()
+        self.category_id = self.parse_int(data.get('category_id'), 'category_id')
+
+    @staticmethod
+    def parse_int(value, name):
+        if value is None or value == '':
+            return None
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f'{name} phải là số nguyên')
+            return int(value)
+        try:
+            return int(str(value).strip())
+        except ValueError:
+            raise ValueError(f'{name} phải là số nguyên')
+
+    @property
+    def name_key(self):
+        return name_key(self.product_name)
+
+    def result(self):
+        if self.error:
+            return {'index': self.index, 'status': 'error', 'message': self.error}
+        return {
+            'index': self.index,
+            'status': self.status,
+            'product': self.product.productID,
+            'productName': self.product.productName,
+            'product_created': self.product_created,
+        }
+
+
+def read_csv(uploaded_file):
+    """Các dòng của file CSV có header (tên cột như CSV_FIELDS), chấp nhận UTF-8 có BOM"""
+    try:
+        text = uploaded_file.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValueError('File CSV phải được mã hóa UTF-8')
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not set(reader.fieldnames) & {'productName', 'product_id'}:
+        raise ValueError(f"Dòng đầu của file CSV phải là tên cột: {', '.join(CSV_FIELDS)}")
+    return list(reader)
+
+
+def resolve_products(rows):
+    """
+    Gắn sản phẩm cho các dòng hợp lệ: 1 truy vấn cho cả productID lẫn tên, 1 truy vấn
+    kiểm tra danh mục. Tên không phân biệt hoa thường: ứng viên lấy từ cột tên đã normalize
+    của index tìm kiếm (iexact của SQLite chỉ bỏ hoa thường cho chữ ASCII, 'Ớt' != 'ớt'),
+    rồi so khớp chính xác bằng name_key. Trả về các sản phẩm tự tạo cần thêm (chưa lưu), theo tên.
+    """
+    ids = {row.product_id for row in rows if row.product_id is not None}
+    names = {row.product_name for row in rows if row.product_id is None}
+    conditions = [Q(productID__in=ids)] if ids else []
+    if names and product_search.is_available():
+        conditions.append(Q(productID__in=product_search.ids_with_names(names)))
+    else:
+        conditions += [Q(productName__iexact=name) for name in names]
+    by_id, by_name = {}, {}
+    if conditions:
+        for product in ProductCatalog.objects.filter(reduce(or_, conditions)).order_by('productID'):
+            by_id[product.productID] = product
+            by_name.setdefault(name_key(product.productName), product)
+
+    missing = [row for row in rows if row.product_id is None and row.name_key not in by_name]
+    category_ids = {row.category_id for row in missing if row.category_id is not None}
+    categories = Categories.objects.in_bulk(category_ids) if category_ids else {}
+
+    today = date.today()
+    new_products = {}
+    for row in rows:
+        if row.product_id is not None:
+            row.product = by_id.get(row.product_id)
+            if row.product is None:
+                row.error = 'Sản phẩm được chọn từ catalog không tồn tại.'
+            continue
+        row.product = by_name.get(row.name_key)
+        if row.product is not None:
+            continue
+        # Cần tạo sản phẩm mới trong ProductCatalog
+        if not row.unit:
+            row.error = 'Đơn vị tính là bắt buộc khi tạo sản phẩm mới.'
+        elif row.expired_date is None:
+            row.error = 'Ngày hết hạn là bắt buộc khi tạo sản phẩm mới.'
+        elif row.category_id is not None and row.category_id not in categories:
+            row.error = 'Danh mục không tồn tại.'
+        else:
+            # Các dòng trùng tên dùng chung 1 sản phẩm mới; shelf life tính từ ngày hết hạn
+            row.product = new_products.setdefault(row.name_key, ProductCatalog(
+                productName=row.product_name,
+                original_price=0,
+                price=0,
+                discount=0,
+                unit=row.unit,
+                shelfLife=max((row.expired_date - today).days, 1),
+                isCustom=True,
+                category=categories.get(row.category_id),
+            ))
+            row.product_created = True
+    return list(new_products.values())
+
+
+def import_items(fridge, raw_rows, today=None):
+    """
+    Nhập nhiều sản phẩm vào tủ lạnh. Dòng lỗi được bỏ qua, các dòng còn lại được ghi
+    trong 1 transaction: bulk_create sản phẩm tự tạo, bulk upsert AddToFridge.
+    Nhiều dòng cùng 1 sản phẩm được cộng dồn. Hạn dùng bỏ trống = hôm nay + shelfLife.
+    Trả về kết quả theo từng dòng (cùng thứ tự với đầu vào).
+    """
+    today = today or date.today()
+    rows, results = [], []
+    for index, data in enumerate(raw_rows):
+        try:
+            rows.append(ImportRow(index, data, today))
+        except ValueError as e:
+            results.append({'index': index, 'status': 'error', 'message': str(e)})
+
+    new_products = resolve_products(rows)
+    valid = [row for row in rows if not row.error]
+    if valid:
+        with transaction.atomic():
+            if new_products:
+                ProductCatalog.objects.bulk_create(new_products)
+            entries = {}
+            for row in valid:
+                product = row.product
+                expired_date = row.expired_date or today + timedelta(days=product.shelfLife)
+                if product.productID in entries:
+                    quantity, earlier, location = entries[product.productID]
+                    entries[product.productID] = (quantity + row.quantity, min(earlier, expired_date), location or row.location)
+                else:
+                    entries[product.productID] = (row.quantity, expired_date, row.location)
+            updated = upsert_items(fridge, entries, today=today)
+        for row in valid:
+            row.status = 'updated' if row.product.productID in updated else 'created'
+
+        # bulk_create không gửi signal của ProductCatalog/AddToFridge
+        if new_products:
+            bump_version('catalog', 'all')
+            product_search.index_products(new_products)
+        refresh_fridge(fridge.fridgeID)
+
+    results += [row.result() for row in rows]
+    results.sort(key=lambda result: result['index'])
+    return results
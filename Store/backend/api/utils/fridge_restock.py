@@ -0,0 +1,86 @@
+import math
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.add_to_list import AddToList
+from ..models.fridge import Fridge
+from . import expiry_buckets, fridge_stats
+from .versioning import bump_version
+
+
+def upsert_items(fridge, entries, default_location=AddToFridge.LocationType.COOL, today=None):
+    """
+    Thêm/cộng dồn sản phẩm vào tủ lạnh bằng 1 lệnh bulk upsert trên (fridge, product).
+    entries: {product_id: (quantity, expired_date, location hoặc None)}, mỗi sản phẩm 1 lần.
+
+    - Sản phẩm chưa có trong tủ lạnh: thêm mới.
+    - Sản phẩm đã có và còn hạn: cộng thêm số lượng, giữ hạn dùng sớm hơn.
+    - Sản phẩm đã có nhưng hết hạn: thay bằng hàng mới.
+    Location không truyền thì giữ vị trí cũ (hoặc default_location với sản phẩm mới).
+
+    Gọi trong transaction; không gửi signal nên sau đó cần gọi refresh_fridge.
+    Trả về tập productID đã có sẵn trong tủ lạnh (được cập nhật).
+    """
+    today = today or date.today()
+    existing = {
+        row.product_id: row
+        for row in AddToFridge.objects.filter(fridge=fridge, product_id__in=list(entries))
+    }
+    rows = []
+    for product_id, (quantity, expired_date, location) in entries.items():
+        current = existing.get(product_id)
+        if current is not None and current.expiredDate >= today:
+            quantity += current.quantity
+            expired_date = min(expired_date, current.expiredDate)
+        rows.append(AddToFridge(
+            fridge=fridge, product_id=product_id, quantity=quantity, expiredDate=expired_date,
+            location=location or (current.location if current else default_location),
+        ))
+    AddToFridge.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['fridge', 'product'],
+        update_fields=['quantity', 'expiredDate', 'location'],
+    )
+    return set(existing)
+
+
+def refresh_fridge(fridge_id):
+    """Làm 1 lần những gì signal của AddToFridge làm cho mỗi dòng (bulk_create không gửi signal)"""
+    bump_version('fridge', fridge_id)
+    fridge_stats.refresh_stats(fridge_id)
+    expiry_buckets.refresh_fridge(fridge_id)
+
+
+def apply_purchases(shopping_list, location=AddToFridge.LocationType.COOL, today=None):
+    """
+    Đưa các item đã mua (chưa đưa vào tủ lạnh) của danh sách vào tủ lạnh của group,
+    hạn dùng = hôm nay + shelfLife, gộp với hàng đang có theo upsert_items.
+    Số truy vấn không phụ thuộc số item. Trả về (số sản phẩm thêm mới, số sản phẩm cập nhật).
+    """
+    today = today or date.today()
+    with transaction.atomic():
+        fridge, _ = Fridge.objects.get_or_create(group_id=shopping_list.group_id)
+        items = list(
+            AddToList.objects
+            .select_for_update(of=('self',))
+            .filter(list=shopping_list, status=AddToList.ListStatus.PURCHASED, in_fridge=False)
+            .values_list('id', 'product_id', 'quantity', 'product__shelfLife')
+        )
+        if not items:
+            return 0, 0
+
+        # Cùng 1 sản phẩm chỉ có 1 item trong danh sách (unique list, product).
+        # Tủ lạnh lưu số lượng nguyên, làm tròn lên phần lẻ vừa mua
+        entries = {
+            product_id: (math.ceil(quantity), today + timedelta(days=shelf_life), None)
+            for _, product_id, quantity, shelf_life in items
+        }
+        updated = upsert_items(fridge, entries, default_location=location, today=today)
+        AddToList.objects.filter(id__in=[item[0] for item in items]).update(in_fridge=True)
+
+    bump_version('shopping_list', shopping_list.listID)
+    refresh_fridge(fridge.fridgeID)
+    return len(entries) - len(updated), len(updated)
@@ -0,0 +1,166 @@
+import threading
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+
+from ..models.add_to_fridge import AddToFridge
+from .recipe_index import recipe_index
+from .versioning import get_version
+
+COVERAGE = 'coverage'
+QUANTITY = 'quantity'
+EXPIRY = 'expiry'
+# "Dùng trước khi hết hạn": ưu tiên công thức tiêu thụ nhiều sản phẩm sắp hết hạn
+USE_SOON = 'use_soon'
+SCORING_MODES = (COVERAGE, QUANTITY, EXPIRY, USE_SOON)
+
+# Số ngày coi là "sắp hết hạn" (giống FridgeNotificationView)
+EXPIRING_WINDOW_DAYS = 3
+# Mức trừ điểm tối đa khi công thức không dùng tới sản phẩm sắp hết hạn nào
+EXPIRY_PENALTY = 0.5
+
+
+class RecipeMatrix:
+    """
+    Ma trận thưa recipe x product ở dạng COO: mỗi nguyên liệu là 1 phần tử
+    (entry_rows[i], entry_products[i]). Nhân với vector tủ lạnh rồi
+    np.bincount theo hàng cho ra số nguyên liệu khớp của mọi công thức
+    trong 1 phép toán NumPy.
+    """
+
+    def __init__(self, recipe_products):
+        self.recipe_ids = np.fromiter(recipe_products.keys(), dtype=np.int64, count=len(recipe_products))
+        self.totals = np.fromiter(
+            (len(products) for products in recipe_products.values()), dtype=np.int64, count=len(recipe_products)
+        )
+        self.entry_rows = np.repeat(np.arange(len(self.recipe_ids)), self.totals)
+        self.entry_products = np.fromiter(
+            (pid for products in recipe_products.values() for pid in products),
+            dtype=np.int64, count=int(self.totals.sum())
+        )
+        self.n_products = int(self.entry_products.max()) + 1 if len(self.entry_products) else 0
+
+    def __len__(self):
+        return len(self.recipe_ids)
+
+    def _row_sums(self, vector):
+        return np.bincount(self.entry_rows, weights=vector[self.entry_products], minlength=len(self))
+
+    def score(self, fridge, mode=COVERAGE):
+        """Trả về (matched, scores) cho toàn bộ công thức"""
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Chế độ chấm điểm không hợp lệ: {mode}")
+
+        present = fridge.vector('present', self.n_products)
+        matched = self._row_sums(present).astype(np.int64)
+        totals = np.maximum(self.totals, 1)
+        coverage = matched / totals
+
+        if mode == COVERAGE:
+            return matched, coverage
+        if mode == QUANTITY:
+            weights = fridge.vector('quantity_weight', self.n_products)
+            return matched, self._row_sums(weights) / totals
+
+        if mode == USE_SOON:
+            urgency = fridge.vector('urgency', self.n_products)
+            return matched, self._row_sums(urgency)
+
+        expiring = fridge.vector('expiring', self.n_products)
+        n_expiring = int(expiring.sum())
+        if n_expiring == 0:
+            return matched, coverage
+        used_expiring = self._row_sums(expiring)
+        return matched, coverage - EXPIRY_PENALTY * (1 - used_expiring / n_expiring)
+
+
+class FridgeVector:
+    """
+    Nội dung tủ lạnh theo productID, kèm chỉ mục hạn sử dụng
+    (product_id -> số ngày còn lại) tính trong cùng 1 lượt duyệt.
+    """
+
+    def __init__(self, items, today=None):
+        # items: iterable (product_id, quantity, expiredDate)
+        today = today or date.today()
+        self.quantities = {}
+        self.days_remaining = {}
+        for product_id, quantity, expired_date in items:
+            self.quantities[product_id] = quantity or 0
+            self.days_remaining[product_id] = (expired_date - today).days
+        self.expiring = {
+            product_id: days for product_id, days in self.days_remaining.items()
+            if 0 <= days <= EXPIRING_WINDOW_DAYS
+        }
+
+    @property
+    def product_ids(self):
+        return self.quantities.keys()
+
+    def quantity_weight(self, product_id):
+        # Bão hòa về 1 khi số lượng lớn, tránh 1 sản phẩm lấn át cả công thức
+        quantity = self.quantities[product_id]
+        return quantity / (quantity + 1) if quantity > 0 else 0
+
+    def urgency(self, product_id):
+        """Hết hạn hôm nay = 1, càng còn nhiều ngày càng nhỏ, nhân với trọng số số lượng"""
+        days = self.expiring[product_id]
+        return (EXPIRING_WINDOW_DAYS + 1 - days) / (EXPIRING_WINDOW_DAYS + 1) * self.quantity_weight(product_id)
+
+    def vector(self, kind, size):
+        vector = np.zeros(size, dtype=np.float64)
+        if kind == 'present':
+            values = {pid: 1 for pid in self.quantities}
+        elif kind == 'quantity_weight':
+            values = {pid: self.quantity_weight(pid) for pid in self.quantities}
+        elif kind == 'expiring':
+            values = {pid: 1 for pid in self.expiring}
+        elif kind == 'urgency':
+            values = {pid: self.urgency(pid) for pid in self.expiring}
+        else:
+            raise ValueError(f"Loại vector không hợp lệ: {kind}")
+        for product_id, value in values.items():
+            if product_id < size:
+                vector[product_id] = value
+        return vector
+
+
+def get_fridge_vector(fridge):
+    """FridgeVector được tính 1 lần cho mỗi phiên bản tủ lạnh và mỗi ngày, dùng chung cho mọi chế độ"""
+    today = date.today()
+    key = 'fridge_vector:{}:{}:{}'.format(fridge.fridgeID, get_version('fridge', fridge.fridgeID), today.isoformat())
+    fridge_vector = cache.get(key)
+    if fridge_vector is None:
+        items = AddToFridge.objects.filter(fridge=fridge).values_list('product_id', 'quantity', 'expiredDate')
+        fridge_vector = FridgeVector(items, today=today)
+        cache.set(key, fridge_vector, 60 * 60 * 24)
+    return fridge_vector
+
+
+_matrix_lock = threading.Lock()
+_matrix_cache = {'generation': None, 'matrix': None}
+
+
+def get_recipe_matrix():
+    """Ma trận được build lại khi generation của recipe_index thay đổi"""
+    recipe_index.ensure_fresh()
+    with _matrix_lock:
+        if _matrix_cache['generation'] != recipe_index.generation:
+            generation, recipe_products = recipe_index.snapshot()
+            _matrix_cache['matrix'] = RecipeMatrix(recipe_products)
+            _matrix_cache['generation'] = generation
+        return _matrix_cache['matrix']
+
+
+def rank(matrix, fridge, mode=COVERAGE):
+    """
+    Xếp hạng các công thức có ít nhất 1 nguyên liệu trong tủ lạnh.
+    Trả về (recipe_ids, matched, totals, scores) đã sắp xếp giảm dần theo điểm.
+    """
+    matched, scores = matrix.score(fridge, mode)
+    rows = np.nonzero(matched > 0)[0]
+    # Cùng điểm thì ưu tiên công thức có tỉ lệ nguyên liệu sẵn có cao hơn, sau đó theo ID
+    coverage = matched[rows] / np.maximum(matrix.totals[rows], 1)
+    order = rows[np.lexsort((matrix.recipe_ids[rows], -coverage, -scores[rows]))]
+    return matrix.recipe_ids[order], matched[order], matrix.totals[order], scores[order]
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db.models import Count, Q, Sum
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.fridge_stats import FridgeStats
+
+UNCATEGORIZED = "Chưa phân loại"
+POPULAR_CATEGORY_LIMIT = 5
+
+
+def _expiry_bounds(today):
+    # Sắp hết hạn = hết hạn hôm nay hoặc ngày mai
+    return today, today + timedelta(days=1)
+
+
+def compute_stats(fridge, today=None):
+    """Tất cả bộ đếm trong 1 query conditional aggregation, cộng 1 query nhóm theo danh mục"""
+    today, tomorrow = _expiry_bounds(today or date.today())
+    items = AddToFridge.objects.filter(fridge=fridge)
+
+    counters = items.aggregate(
+        total_products=Count('id'),
+        expired_products=Count('id', filter=Q(expiredDate__lt=today)),
+        expiring_soon_products=Count('id', filter=Q(expiredDate__gte=today, expiredDate__lte=tomorrow)),
+    )
+
+    popular_categories_qs = (
+        items.values('product__category__categoryName')
+        .annotate(total_quantity=Sum('quantity'))
+        .order_by('-total_quantity')[:POPULAR_CATEGORY_LIMIT]
+    )
+    counters["popular_categories"] = [
+        {
+            "categoryName": c['product__category__categoryName'] or UNCATEGORIZED,
+            "totalQuantity": c['total_quantity']
+        }
+        for c in popular_categories_qs
+    ]
+    return counters
+
+
+def stats_from_items(items, today=None):
+    """Tính thống kê từ các AddToFridge đã lấy sẵn (select_related product__category), không tốn query"""
+    today, tomorrow = _expiry_bounds(today or date.today())
+    quantities = defaultdict(int)
+    expired_products = expiring_soon_products = 0
+    for item in items:
+        if item.expiredDate < today:
+            expired_products += 1
+        elif item.expiredDate <= tomorrow:
+            expiring_soon_products += 1
+        category = item.product.category
+        quantities[category.categoryName if category else None] += item.quantity
+
+    popular = sorted(quantities.items(), key=lambda c: c[1], reverse=True)[:POPULAR_CATEGORY_LIMIT]
+    return {
+        "total_products": len(items),
+        "expired_products": expired_products,
+        "expiring_soon_products": expiring_soon_products,
+        "popular_categories": [
+            {"categoryName": name or UNCATEGORIZED, "totalQuantity": quantity}
+            for name, quantity in popular
+        ],
+    }
+
+
+def refresh_stats(fridge_id, today=None):
+    """Tính lại và lưu dòng FridgeStats của 1 tủ lạnh"""
+    today = today or date.today()
+    counters = compute_stats(fridge_id, today)
+    stats, _ = FridgeStats.objects.update_or_create(fridge_id=fridge_id, defaults={**counters, 'as_of': today})
+    return stats
+
+
+def get_stats(fridge):
+    """Đọc thống kê đã tính sẵn (1 query), chỉ tính lại khi chưa có hoặc đã sang ngày mới"""
+    today = date.today()
+    stats = FridgeStats.objects.filter(fridge_id=fridge.fridgeID).first()
+    if stats is None or stats.as_of != today:
+        stats = refresh_stats(fridge.fridgeID, today)
+    return stats.as_dict()
+
+
+def mark_fridge_stale(fridge_id):
+    """Nội dung tủ lạnh thay đổi -> get_stats tính lại cho tới khi refresh_stats chạy"""
+    FridgeStats.objects.filter(fridge_id=fridge_id).update(as_of=None)
+
+
+def mark_stale(product):
+    """Danh mục của sản phẩm thay đổi -> thống kê của các tủ lạnh chứa nó cần tính lại"""
+    FridgeStats.objects.filter(fridge__addtofridge__product=product).update(as_of=None)
@@ -0,0 +1,137 @@
+from django.db import connection
+
+from ..models.product_catalog import ProductCatalog
+from .text_normalize import normalize, tokenize
+
+# Bảng FTS5 (rowid = productID), tạo trong migration 0023 khi dùng SQLite.
+# is_custom (UNINDEXED, 0/1) để lọc sản phẩm tự tạo ngay trong truy vấn MATCH (migration 0029)
+SEARCH_TABLE = 'api_product_search'
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(name, is_custom UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+INSERT_SQL = f'INSERT INTO {SEARCH_TABLE}(rowid, name, is_custom) VALUES (%s, %s, %s)'
+# Số ứng viên tốt nhất theo bm25 được xếp hạng lại ở bước sau
+CANDIDATE_LIMIT = 200
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def index_product(product_id, product_name, is_custom=False):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [product_id])
+        cursor.execute(INSERT_SQL, [product_id, normalize(product_name), int(is_custom)])
+
+
+def index_products(products):
+    """Index nhiều sản phẩm 1 lần (dùng sau bulk_create, vốn không gửi signal)"""
+    if not is_available():
+        return
+    rows = [(product.productID, normalize(product.productName), int(product.isCustom)) for product in products]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(INSERT_SQL, rows)
+
+
+def remove_product(product_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [product_id])
+
+
+def rebuild(batch_size=5000):
+    """Xây lại toàn bộ index từ ProductCatalog, trả về số sản phẩm đã index"""
+    if not is_available():
+        return 0
+    rows = (
+        ProductCatalog.objects.values_list('productID', 'productName', 'isCustom')
+        .order_by('productID').iterator(chunk_size=batch_size)
+    )
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        batch = []
+        for product_id, product_name, is_custom in rows:
+            batch.append((product_id, normalize(product_name), int(is_custom)))
+            if len(batch) >= batch_size:
+                cursor.executemany(INSERT_SQL, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(INSERT_SQL, batch)
+            count += len(batch)
+    return count
+
+
+def match_expression(query):
+    """'Cà ch' -> '"ca"* "ch"*': mọi token đều phải khớp, token cuối cho phép gõ dở (prefix)"""
+    return ' '.join(f'"{token}"*' for token in tokenize(query))
+
+
+def search_ids(query, limit=10, include_custom=False):
+    """
+    Trả về danh sách productID theo thứ tự độ khớp:
+    trùng khớp hoàn toàn > bắt đầu bằng từ khóa > điểm bm25 > tên ngắn hơn.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    normalized = normalize(query)
+    with connection.cursor() as cursor:
+        cursor.execute(search_sql(include_custom), [expression, normalized, normalized + '%', limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ids_with_names(names):
+    """
+    productID có tên đã normalize trùng hẳn với tên đã normalize của 1 trong `names`
+    (kể cả sản phẩm tự tạo). 1 truy vấn: MATCH các cụm từ trên index rồi so sánh cả cột.
+    Tên không có chữ/số nào bị bỏ qua.
+    """
+    keys = {normalize(name) for name in names}
+    phrases = [' '.join(tokenize(key)) for key in keys]
+    expression = ' OR '.join(f'"{phrase}"' for phrase in phrases if phrase)
+    if not expression:
+        return []
+    placeholders = ', '.join(['%s'] * len(keys))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND name IN ({placeholders})',
+            [expression, *keys],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_sql(include_custom=False):
+    # bm25 chọn trước CANDIDATE_LIMIT ứng viên (FTS5 tối ưu ORDER BY rank LIMIT),
+    # sau đó mới xếp lại theo trùng khớp hoàn toàn / tiền tố trên tập nhỏ này.
+    # Sản phẩm tự tạo bị loại trước khi LIMIT để chúng không chiếm hết chỗ ứng viên
+    return f'''
+        SELECT p.productID
+        FROM (
+            SELECT rowid, name, rank FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH %s {'' if include_custom else 'AND is_custom = 0'}
+            ORDER BY rank LIMIT {CANDIDATE_LIMIT}
+        ) s
+        JOIN api_productcatalog p ON p.productID = s.rowid
+        ORDER BY s.name = %s DESC, s.name LIKE %s DESC, s.rank, length(s.name), p.productID
+        LIMIT %s
+    '''
+
+
+def search(query, limit=10, include_custom=False):
+    """Tìm sản phẩm không phân biệt dấu, trả về list ProductCatalog (đã join category)"""
+    if not is_available():
+        products = ProductCatalog.objects.filter(productName__icontains=query)
+        if not include_custom:
+            products = products.filter(isCustom=False)
+        return list(products.select_related('category').order_by('productName')[:limit])
+
+    ids = search_ids(query, limit, include_custom)
+    products = ProductCatalog.objects.select_related('category').in_bulk(ids)
+    return [products[product_id] for product_id in ids if product_id in products]
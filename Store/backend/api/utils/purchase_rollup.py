@@ -0,0 +1,221 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from ..models.add_to_list import AddToList
+from ..models.purchase_rollup import PurchaseRollup
+from ..models.shopping_list import ShoppingList
+from .versioning import bump_version
+
+CENT = Decimal('0.01')
+
+
+def spend(quantity, unit_price):
+    """Số tiền của 1 item đã mua, làm tròn tới 0.01 để cộng/trừ dần luôn khớp với tính lại"""
+    if unit_price is None:
+        return Decimal(0)
+    return (Decimal(repr(quantity)) * unit_price).quantize(CENT)
+
+
+def record_changes(changes):
+    """
+    Cập nhật PurchaseRollup và ShoppingList.total_spent theo các thay đổi trạng thái mua.
+    changes: các cặp (trạng thái cũ, trạng thái mới) lấy từ AddToList.purchase_state().
+    Danh mục lấy từ trạng thái (danh mục lúc mua) để bỏ mua trừ đúng ô đã cộng.
+    1 truy vấn lấy group, sau đó 1-2 truy vấn cho mỗi ô (group, ngày, danh mục)
+    và 1 truy vấn cho mỗi danh sách bị ảnh hưởng.
+    """
+    changes = [(old, new) for old, new in changes if old != new]
+    if not changes:
+        return
+    states = [state for change in changes for state in change if state is not None]
+    groups = dict(
+        ShoppingList.objects.filter(listID__in={state[0] for state in states}).values_list('listID', 'group_id')
+    )
+
+    # (group, ngày, danh mục) -> [số item, tổng số lượng, tổng tiền]
+    deltas = defaultdict(lambda: [0, 0, Decimal(0)])
+    list_spent = defaultdict(Decimal)
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            list_id, _, purchased_at, quantity, unit_price, category_id = state
+            group_id = groups.get(list_id)
+            if group_id is None:
+                # Danh sách đã bị xóa cùng group, rollup của group cũng bị xóa theo
+                continue
+            amount = sign * spend(quantity, unit_price)
+            delta = deltas[(group_id, timezone.localdate(purchased_at), category_id)]
+            delta[0] += sign
+            delta[1] += sign * quantity
+            delta[2] += amount
+            list_spent[list_id] += amount
+
+    for (group_id, day, category_id), delta in deltas.items():
+        if any(delta):
+            _apply(group_id, day, category_id, *delta)
+    for list_id, amount in list_spent.items():
+        if amount:
+            ShoppingList.objects.filter(listID=list_id).update(total_spent=F('total_spent') + amount)
+
+
+def _apply(group_id, day, category_id, item_count, total_quantity, total_spent):
+    rows = PurchaseRollup.objects.filter(group_id=group_id, day=day, category_id=category_id)
+    increment = {
+        'item_count': F('item_count') + item_count,
+        'total_quantity': F('total_quantity') + total_quantity,
+        'total_spent': F('total_spent') + total_spent,
+    }
+    if rows.update(**increment):
+        if item_count < 0:
+            rows.filter(item_count__lte=0).delete()
+        return
+    if item_count <= 0:
+        # Không có dòng để trừ (item mua trước khi backfill): tính lại ô này từ AddToList
+        _recompute_cell(group_id, day, category_id)
+        return
+    try:
+        with transaction.atomic():
+            PurchaseRollup.objects.create(
+                group_id=group_id, day=day, category_id=category_id,
+                item_count=item_count, total_quantity=total_quantity, total_spent=total_spent,
+            )
+    except IntegrityError:
+        # Request khác vừa tạo dòng này
+        rows.update(**increment)
+
+
+def _recompute_cell(group_id, day, category_id):
+    """Tính 1 ô (group, ngày, danh mục) từ các item đã mua, giống cách rebuild cộng dồn"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    rows = list(AddToList.objects.filter(
+        status=AddToList.ListStatus.PURCHASED,
+        list__group_id=group_id,
+        purchased_category_id=category_id,
+        purchased_at__gte=start,
+        purchased_at__lt=end,
+    ).values_list('quantity', 'unit_price'))
+    cell = PurchaseRollup.objects.filter(group_id=group_id, day=day, category_id=category_id)
+    if not rows:
+        cell.delete()
+        return
+    PurchaseRollup.objects.update_or_create(
+        group_id=group_id, day=day, category_id=category_id,
+        defaults={
+            'item_count': len(rows),
+            'total_quantity': sum(quantity for quantity, _ in rows),
+            'total_spent': sum((spend(quantity, unit_price) for quantity, unit_price in rows), Decimal(0)),
+        },
+    )
+
+
+def day_range_filter(start=None, end=None, field='day'):
+    """Q lọc theo khoảng ngày [start, end], bỏ trống đầu nào thì không giới hạn đầu đó"""
+    condition = Q()
+    if start is not None:
+        condition &= Q(**{f'{field}__gte': start})
+    if end is not None:
+        condition &= Q(**{f'{field}__lte': end})
+    return condition
+
+
+def totals(group_id, start=None, end=None):
+    """Tổng số item, số lượng và tiền đã mua của group trong khoảng ngày, 1 truy vấn trên bảng rollup"""
+    result = PurchaseRollup.objects.filter(day_range_filter(start, end), group_id=group_id).aggregate(
+        total_items=Sum('item_count'),
+        total_quantity=Sum('total_quantity'),
+        total_spent=Sum('total_spent'),
+    )
+    return {
+        'total_items': result['total_items'] or 0,
+        'total_quantity': result['total_quantity'] or 0,
+        'total_spent': result['total_spent'] or Decimal(0),
+    }
+
+
+def by_category(group_id, start=None, end=None):
+    """[(tên danh mục hoặc None, tổng số lượng)] giảm dần theo số lượng"""
+    rows = (
+        PurchaseRollup.objects.filter(day_range_filter(start, end), group_id=group_id)
+        .values('category__categoryName')
+        .annotate(total=Sum('total_quantity'))
+        .order_by('-total')
+    )
+    return [(row['category__categoryName'], row['total']) for row in rows]
+
+
+def backfill_purchases(group_id=None, batch_size=1000):
+    """
+    Item đã mua trước khi có cột purchased_at/unit_price/purchased_category: lấy 0h ngày
+    của danh sách làm thời điểm mua, giá và danh mục hiện tại của sản phẩm làm giá và
+    danh mục lúc mua.
+    Trả về số item được cập nhật.
+    """
+    items = AddToList.objects.filter(
+        Q(purchased_at__isnull=True) | Q(unit_price__isnull=True)
+        | Q(purchased_category__isnull=True, product__category__isnull=False),
+        status=AddToList.ListStatus.PURCHASED,
+    )
+    if group_id is not None:
+        items = items.filter(list__group_id=group_id)
+    items = list(items.select_related('list', 'product'))
+    for item in items:
+        if item.purchased_at is None:
+            item.purchased_at = timezone.make_aware(datetime.combine(item.list.date, time.min))
+        if item.unit_price is None:
+            item.unit_price = item.product.price
+        if item.purchased_category_id is None:
+            item.purchased_category_id = item.product.category_id
+    AddToList.objects.bulk_update(items, ['purchased_at', 'unit_price', 'purchased_category'], batch_size=batch_size)
+    return len(items)
+
+
+def rebuild(group_id=None, batch_size=1000):
+    """
+    Tính lại toàn bộ rollup và ShoppingList.total_spent từ AddToList (1 lượt đọc,
+    cộng dồn giống hệt cách cập nhật dần), rồi đổi version các danh sách để ETag cũ
+    (total_spent trước khi tính lại) không còn được dùng. Trả về số dòng rollup được tạo.
+    """
+    purchased = AddToList.objects.filter(status=AddToList.ListStatus.PURCHASED, purchased_at__isnull=False)
+    existing = PurchaseRollup.objects.all()
+    lists = ShoppingList.objects.all()
+    if group_id is not None:
+        purchased = purchased.filter(list__group_id=group_id)
+        existing = existing.filter(group_id=group_id)
+        lists = lists.filter(group_id=group_id)
+
+    cells = defaultdict(lambda: [0, 0, Decimal(0)])
+    list_spent = defaultdict(Decimal)
+    rows = purchased.values_list(
+        'list_id', 'list__group_id', 'purchased_category_id', 'purchased_at', 'quantity', 'unit_price'
+    ).iterator(chunk_size=batch_size)
+    for list_id, row_group_id, category_id, purchased_at, quantity, unit_price in rows:
+        amount = spend(quantity, unit_price)
+        cell = cells[(row_group_id, timezone.localdate(purchased_at), category_id)]
+        cell[0] += 1
+        cell[1] += quantity
+        cell[2] += amount
+        list_spent[list_id] += amount
+
+    rollups = [
+        PurchaseRollup(
+            group_id=cell_group_id, day=day, category_id=category_id,
+            item_count=item_count, total_quantity=total_quantity, total_spent=total_spent,
+        )
+        for (cell_group_id, day, category_id), (item_count, total_quantity, total_spent) in cells.items()
+    ]
+    spent_lists = [ShoppingList(listID=list_id, total_spent=amount) for list_id, amount in list_spent.items()]
+    with transaction.atomic():
+        existing.delete()
+        PurchaseRollup.objects.bulk_create(rollups, batch_size=batch_size)
+        lists.update(total_spent=0)
+        ShoppingList.objects.bulk_update(spent_lists, ['total_spent'], batch_size=batch_size)
+    for list_id in lists.values_list('listID', flat=True).iterator(chunk_size=batch_size):
+        bump_version('shopping_list', list_id)
+    return len(rollups)
@@ -0,0 +1,33 @@
+import re
+
+from django.db import connection
+
+# "SCAN api_addtolist": quét cả bảng. "SCAN api_addtolist USING INDEX ..." là đi theo thứ tự
+# của index (ORDER BY ... LIMIT dừng sớm) nên không bị tính
+SCAN_PATTERN = re.compile(r'^SCAN (\w+)$')
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def explain(queryset):
+    """Các dòng detail của EXPLAIN QUERY PLAN (SQLite) cho truy vấn của queryset"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def scans(details, tables=None):
+    """
+    Các bước quét toàn bộ 1 bảng (không dùng index) trong plan. Bỏ qua bước quét subquery/CTE
+    ("SCAN (subquery-1)", "SCAN CONSTANT ROW") vì không phải bảng thật.
+    """
+    tables = set(tables if tables is not None else connection.introspection.table_names())
+    found = []
+    for detail in details:
+        match = SCAN_PATTERN.match(detail)
+        if match and match.group(1) in tables:
+            found.append(detail)
+    return found
@@ -0,0 +1,148 @@
+import threading
+from array import array
+from collections import defaultdict
+
+from django.db import transaction
+
+from ..models.ingredient import Ingredient
+from .versioning import bump_version, get_version
+
+
+class RecipeIngredientIndex:
+    """
+    Index recipe <-> product dùng chung cho cả process.
+
+    - recipe_products: recipe_id -> array('i') các productID của công thức
+    - product_recipes: product_id -> array('i') các recipeID dùng sản phẩm đó
+
+    Index được build 1 lần (lazy, ở lần dùng đầu tiên) rồi cập nhật dần qua
+    signal của Ingredient/Recipe (xem api/signals.py). Mỗi lần thay đổi,
+    `generation` tăng lên để các cache phụ thuộc biết dữ liệu đã cũ.
+    Signal chỉ chạy trong process ghi dữ liệu nên mọi lần đọc đi qua ensure_fresh():
+    build lại index khi version 'recipes' (dùng chung qua cache) khác với version
+    index đang giữ. Process ghi dữ liệu ghi nhận luôn version mới sau khi tự cập
+    nhật (apply) nên không phải build lại.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self.generation = 0
+        self._version = None
+        self.recipe_products = {}
+        self.product_recipes = defaultdict(lambda: array('i'))
+
+    def ensure_fresh(self):
+        """Build index nếu chưa build hoặc process khác đã thay đổi công thức"""
+        version = get_version('recipes', 'all')
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._build()
+                    self._version = version
+        return self
+
+    def _build(self):
+        recipe_products = defaultdict(lambda: array('i'))
+        product_recipes = defaultdict(lambda: array('i'))
+        rows = Ingredient.objects.filter(product__isnull=False).values_list('recipe_id', 'product_id').order_by('recipe_id')
+        for recipe_id, product_id in rows:
+            recipe_products[recipe_id].append(product_id)
+            product_recipes[product_id].append(recipe_id)
+        self.recipe_products = dict(recipe_products)
+        self.product_recipes = product_recipes
+        self.generation += 1
+        self._built = True
+
+    def reset(self):
+        """Bỏ toàn bộ dữ liệu, index sẽ được build lại ở lần dùng tiếp theo"""
+        with self._lock:
+            self._built = False
+            self._version = None
+            self.recipe_products = {}
+            self.product_recipes = defaultdict(lambda: array('i'))
+            self.generation += 1
+
+    # Đọc dữ liệu
+    def products_of(self, recipe_id):
+        return self.ensure_fresh().recipe_products.get(recipe_id, ())
+
+    def recipes_of(self, product_id):
+        return self.ensure_fresh().product_recipes.get(product_id, ())
+
+    def snapshot(self):
+        """Bản sao (generation, recipe_id -> tuple productID) để build cấu trúc dẫn xuất"""
+        self.ensure_fresh()
+        with self._lock:
+            return self.generation, {rid: tuple(pids) for rid, pids in self.recipe_products.items()}
+
+    # Cập nhật incremental
+    def apply(self, update=None):
+        """
+        Chạy update() (1 trong các hàm cập nhật bên dưới) rồi đổi version 'recipes'.
+        Nếu index đang khớp version trước đó thì sau update() nó vẫn khớp database,
+        nên ghi nhận version mới để ensure_fresh() không build lại trong process này.
+        """
+        with self._lock:
+            previous = get_version('recipes', 'all')
+            if update is not None:
+                update()
+            version = bump_version('recipes', 'all')
+            if self._built and self._version == previous:
+                self._version = version
+
+    def add_ingredient(self, recipe_id, product_id):
+        with self._lock:
+            if self._built:
+                products = self.recipe_products.setdefault(recipe_id, array('i'))
+                if product_id not in products:
+                    products.append(product_id)
+                    self.product_recipes[product_id].append(recipe_id)
+            self.generation += 1
+
+    def remove_ingredient(self, recipe_id, product_id):
+        with self._lock:
+            if self._built:
+                products = self.recipe_products.get(recipe_id)
+                if products is not None and product_id in products:
+                    products.remove(product_id)
+                recipes = self.product_recipes.get(product_id)
+                if recipes is not None and recipe_id in recipes:
+                    recipes.remove(recipe_id)
+            self.generation += 1
+
+    def set_recipe(self, recipe_id, product_ids):
+        """Thay toàn bộ nguyên liệu của 1 công thức trong 1 lần cập nhật"""
+        with self._lock:
+            if self._built:
+                self._drop_recipe(recipe_id)
+                products = array('i', dict.fromkeys(product_ids))
+                self.recipe_products[recipe_id] = products
+                for product_id in products:
+                    self.product_recipes[product_id].append(recipe_id)
+            self.generation += 1
+
+    def remove_recipe(self, recipe_id):
+        with self._lock:
+            if self._built:
+                self._drop_recipe(recipe_id)
+            self.generation += 1
+
+    def _drop_recipe(self, recipe_id):
+        for product_id in self.recipe_products.pop(recipe_id, ()):
+            recipes = self.product_recipes.get(product_id)
+            if recipes is not None and recipe_id in recipes:
+                recipes.remove(recipe_id)
+
+
+# Instance dùng chung cho toàn bộ process
+recipe_index = RecipeIngredientIndex()
+
+
+def update_on_commit(update=None):
+    """
+    recipe_index.apply(update) sau khi transaction hiện tại commit, bỏ qua nếu rollback
+    để index không lệch với database. Version chỉ đổi sau commit nên process khác
+    không build lại index từ dữ liệu chưa commit.
+    """
+    transaction.on_commit(lambda: recipe_index.apply(update))
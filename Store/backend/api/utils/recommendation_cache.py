@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.cache import cache
+
+from .versioning import get_version
+
+# Kết quả xếp hạng được giữ tối đa 1 giờ, version thay đổi thì key cũng đổi
+RANKING_TIMEOUT = 60 * 60
+
+
+def ranking_key(fridge, mode):
+    # Ngày hiện tại nằm trong key vì trạng thái "sắp hết hạn" thay đổi theo ngày.
+    # Dùng version token của công thức (dùng chung qua cache) thay vì generation của
+    # recipe_index, vốn là bộ đếm riêng của từng process
+    return 'recommendation:{}:{}:{}:{}:{}'.format(
+        fridge.group_id,
+        get_version('fridge', fridge.fridgeID),
+        get_version('recipes', 'all'),
+        mode,
+        date.today().isoformat(),
+    )
+
+
+def get_or_compute(fridge, mode, compute):
+    """
+    Trả về (ranking, fridge_product_ids) từ cache, hoặc gọi compute() để tính
+    rồi lưu lại. Key được lấy trước khi tính nên nếu tủ lạnh thay đổi trong lúc
+    tính, kết quả cũ sẽ không bao giờ được đọc lại.
+    """
+    key = ranking_key(fridge, mode)
+    cached = cache.get(key)
+    if cached is None:
+        cached = compute()
+        cache.set(key, cached, RANKING_TIMEOUT)
+    return cached
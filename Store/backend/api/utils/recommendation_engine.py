@@ -0,0 +1,40 @@
+from collections import namedtuple
+
+from .fridge_scoring import COVERAGE, get_recipe_matrix, rank
+
+# Kết quả chấm điểm cho 1 công thức
+ScoredRecipe = namedtuple('ScoredRecipe', ['recipe_id', 'matched', 'total', 'score'])
+
+
+class Ranking:
+    """Danh sách công thức đã xếp hạng, chỉ tạo ScoredRecipe cho trang được yêu cầu"""
+
+    def __init__(self, recipe_ids, matched, totals, scores):
+        self.recipe_ids = recipe_ids
+        self.matched = matched
+        self.totals = totals
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.recipe_ids)
+
+    def page(self, offset, limit):
+        end = offset + limit
+        return [
+            ScoredRecipe(int(recipe_id), int(matched), int(total), float(score))
+            for recipe_id, matched, total, score in zip(
+                self.recipe_ids[offset:end], self.matched[offset:end],
+                self.totals[offset:end], self.scores[offset:end]
+            )
+        ]
+
+
+def recommend(fridge, mode=COVERAGE):
+    """fridge: FridgeVector của tủ lạnh cần gợi ý"""
+    return Ranking(*rank(get_recipe_matrix(), fridge, mode))
+
+
+def match_percentage(scored):
+    if scored.total == 0:
+        return 0
+    return scored.matched / scored.total * 100
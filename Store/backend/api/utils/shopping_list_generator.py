@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.add_to_list import AddToList
+from ..models.ingredient import Ingredient
+from ..models.shopping_list import ShoppingList
+from .versioning import bump_version
+
+
+def needed_products(group_id, start, end):
+    """
+    productID -> số bữa trong khoảng [start, end] dùng sản phẩm đó
+    (mỗi món trong 1 kế hoạch tính là 1 lần dùng), 1 truy vấn GROUP BY.
+    """
+    rows = (
+        Ingredient.objects
+        .filter(
+            product__isnull=False,
+            recipe__have__plan__group_id=group_id,
+            recipe__have__plan__start_date__range=(start, end),
+        )
+        .values('product_id')
+        .annotate(uses=Count('recipe__have'))
+        .order_by()
+    )
+    return {row['product_id']: row['uses'] for row in rows}
+
+
+def missing_products(group_id, start, end):
+    """
+    Số lượng còn thiếu của từng sản phẩm: nhu cầu của kế hoạch trừ đi phần có
+    trong tủ lạnh (còn hạn tới ngày start) và phần đang chờ mua trong các danh sách
+    của group. 3 truy vấn bất kể số kế hoạch.
+    """
+    needed = needed_products(group_id, start, end)
+    if not needed:
+        return {}
+
+    in_fridge = dict(
+        AddToFridge.objects
+        .filter(fridge__group_id=group_id, product_id__in=needed, expiredDate__gte=start)
+        .values_list('product_id', 'quantity')
+    )
+    pending = dict(
+        AddToList.objects
+        .filter(list__group_id=group_id, status=AddToList.ListStatus.PENDING, product_id__in=needed)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .order_by()
+        .values_list('product_id', 'total')
+    )
+
+    missing = {}
+    for product_id, uses in needed.items():
+        quantity = uses - (in_fridge.get(product_id) or 0) - (pending.get(product_id) or 0)
+        if quantity > 0:
+            missing[product_id] = quantity
+    return missing
+
+
+def generate_shopping_list(group_id, user, start, end, list_name=None):
+    """
+    Tạo ShoppingList mới từ kế hoạch bữa ăn của group trong [start, end].
+    Trả về (shopping_list, số sản phẩm), shopping_list là None nếu không thiếu gì.
+    """
+    missing = missing_products(group_id, start, end)
+    if not missing:
+        return None, 0
+
+    with transaction.atomic():
+        shopping_list = ShoppingList.objects.create(
+            listName=list_name or f'Đi chợ {start.strftime("%d/%m")} - {end.strftime("%d/%m")}',
+            date=start,
+            group_id=group_id,
+            user=user,
+            type=ShoppingList.ListType.DAY if start == end else ShoppingList.ListType.WEEK,
+        )
+        AddToList.objects.bulk_create([
+            AddToList(list=shopping_list, product_id=product_id, quantity=quantity, status=AddToList.ListStatus.PENDING)
+            for product_id, quantity in sorted(missing.items())
+        ])
+    # bulk_create không gửi post_save
+    bump_version('shopping_list', shopping_list.listID)
+    return shopping_list, len(missing)
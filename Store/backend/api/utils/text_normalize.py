@@ -0,0 +1,16 @@
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Bỏ dấu tiếng Việt, chữ thường, gộp khoảng trắng: 'Cà  Chua' -> 'ca chua'"""
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+    return ' '.join(text.lower().split())
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
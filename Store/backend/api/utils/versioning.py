@@ -0,0 +1,34 @@
+import time
+import uuid
+
+from django.core.cache import cache
+
+
+def _version_key(scope, key):
+    return f'version:{scope}:{key}'
+
+
+def get_version_info(scope, key):
+    """
+    (token, modified_at) của 1 tài nguyên (vd: ('fridge', fridge_id)).
+    Dùng token ngẫu nhiên thay vì bộ đếm để khi cache bị xóa, token mới
+    không bao giờ trùng với token cũ đang nằm trong các key cache khác.
+    Version chỉ đúng giữa các worker khi cache dùng chung (REDIS_URL, xem CACHES trong settings).
+    """
+    cache_key = _version_key(scope, key)
+    info = cache.get(cache_key)
+    if info is None:
+        cache.add(cache_key, (uuid.uuid4().hex, time.time()), None)
+        info = cache.get(cache_key)
+    return info
+
+
+def get_version(scope, key):
+    return get_version_info(scope, key)[0]
+
+
+def bump_version(scope, key):
+    """Đánh dấu tài nguyên đã thay đổi, mọi cache dựa trên version cũ sẽ không còn được dùng. Trả về token mới"""
+    token = uuid.uuid4().hex
+    cache.set(_version_key(scope, key), (token, time.time()), None)
+    return token
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+
+from ..models.add_to_fridge import AddToFridge
+from ..models.fridge import Fridge
+from ..models.meal_plan import MealPlan
+from ..serializers.mealplan_serializers import MealPlanWeeklySerializer, with_recipes
+from ..serializers.recipe_serializers import RecipeSerializer
+from .versioning import get_version
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+# Lịch tuần được giữ tối đa 1 ngày, version thay đổi thì key cũng đổi
+WEEK_TIMEOUT = 60 * 60 * 24
+
+
+def week_start(day):
+    """Thứ 2 của tuần chứa `day`"""
+    return day - timedelta(days=day.weekday())
+
+
+def build_week(group_id, start):
+    """
+    Lưới 7 ngày x 3 bữa (day_0 = thứ 2) và tổng hợp nguyên liệu của cả tuần.
+    4 truy vấn: plans, recipes, ingredients (kèm product, category), tủ lạnh.
+    """
+    end = start + timedelta(days=6)
+    plans = with_recipes(
+        MealPlan.objects.filter(group_id=group_id, start_date__range=(start, end)).order_by('created_at', 'planID')
+    )
+
+    meals_by_day = {f'day_{day}': {meal_type: None for meal_type in MEAL_TYPES} for day in range(7)}
+    # productID -> thông tin sản phẩm + các công thức dùng nó
+    products = {}
+    serialized_recipes = {}
+    for plan in plans:
+        recipes = list(plan.recipes.all())
+        for recipe in recipes:
+            if recipe.recipeID not in serialized_recipes:
+                serialized_recipes[recipe.recipeID] = RecipeSerializer(recipe).data
+            for ingredient in recipe.ingredients.all():
+                product = ingredient.product
+                if product is None:
+                    continue
+                entry = products.setdefault(product.productID, {
+                    'productID': product.productID,
+                    'productName': product.productName,
+                    'unit': product.unit,
+                    'categoryName': product.category.categoryName if product.category else None,
+                    'recipes': set(),
+                })
+                entry['recipes'].add(recipe.recipeID)
+
+        # Nhiều kế hoạch cùng 1 bữa: kế hoạch tạo sau thay thế kế hoạch trước
+        meals_by_day[f'day_{(plan.start_date - start).days}'][plan.mealType] = {
+            'planID': plan.planID,
+            'plan_name': plan.plan_name,
+            'description': plan.description,
+            'recipes': [serialized_recipes[recipe.recipeID] for recipe in recipes],
+            'recipe_name': recipes[0].recipeName if recipes else '',
+        }
+
+    in_fridge = set(
+        AddToFridge.objects.filter(fridge__group_id=group_id, product_id__in=products).values_list('product_id', flat=True)
+    ) if products else set()
+
+    items = []
+    for product_id, entry in products.items():
+        recipe_ids = entry.pop('recipes')
+        entry['recipe_count'] = len(recipe_ids)
+        entry['in_fridge'] = product_id in in_fridge
+        items.append(entry)
+    # Nguyên liệu dùng cho nhiều món nhất lên đầu
+    items.sort(key=lambda item: (-item['recipe_count'], item['productName'], item['productID']))
+
+    return dict(MealPlanWeeklySerializer({
+        'start_date': start,
+        'end_date': end,
+        'meals_by_day': meals_by_day,
+        'ingredients_summary': {
+            'total_products': len(items),
+            'in_fridge': sum(1 for item in items if item['in_fridge']),
+            'missing': sum(1 for item in items if not item['in_fridge']),
+            'items': items,
+        },
+    }).data)
+
+
+def week_key(group_id, start):
+    fridge_id = Fridge.objects.filter(group_id=group_id).values_list('fridgeID', flat=True).first()
+    return 'meal_plan_week:{}:{}:{}:{}:{}:{}'.format(
+        group_id,
+        start.isoformat(),
+        get_version('meal_plan', group_id),
+        get_version('fridge', fridge_id),
+        get_version('recipes', 'all'),
+        get_version('catalog', 'all'),
+    )
+
+
+def get_week(group_id, day):
+    """
+    Lịch tuần chứa `day` của group, cache theo (group, tuần). Key gồm version của
+    kế hoạch (signal MealPlan/Have), tủ lạnh, công thức và catalog nên mọi thay
+    đổi liên quan đều làm key cũ không còn được dùng.
+    """
+    start = week_start(day)
+    key = week_key(group_id, start)
+    data = cache.get(key)
+    if data is None:
+        data = build_week(group_id, start)
+        cache.set(key, data, WEEK_TIMEOUT)
+    return data
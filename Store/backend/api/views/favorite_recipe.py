@@ -31,6 +31,5 @@ class FavoriteRecipeView(APIView):
 
     def get(self, request):
         # Lấy danh sách recipeID user đã yêu thích
-        favs = FavoriteRecipe.objects.filter(user=request.user)
-        recipe_ids = [f.recipe.recipeID for f in favs]
+        recipe_ids = list(FavoriteRecipe.objects.filter(user=request.user).values_list('recipe_id', flat=True))
         return Response({'success': True, 'favorite_recipes': recipe_ids}) 
\ No newline at end of file
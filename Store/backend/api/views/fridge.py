@@ -8,12 +8,16 @@ from ..models.fridge import Fridge
 from ..models.add_to_fridge import AddToFridge
 from ..models.group import Group
 from ..serializers.fridge import AddToFridgeSerializer
-from django.db.models import Sum
 from ..models.product_catalog import ProductCatalog
 from ..models.categories import Categories
+from ..utils import expiry_buckets, fridge_import, fridge_stats
+from ..utils.conditional import ConditionalGetMixin
 
-class FridgeNotificationView(APIView):
-    permission_classes = [IsAuthenticated]
+class GroupFridgeMixin:
+    """
+    Nhóm (theo group_id, mặc định nhóm đầu tiên user tham gia) và tủ lạnh của nhóm,
+    dùng chung cho các view tủ lạnh. ETag phụ thuộc version của tủ lạnh và catalog.
+    """
 
     def get_group(self, request):
         group_id = request.query_params.get('group_id')
@@ -27,116 +31,90 @@ class FridgeNotificationView(APIView):
                 return None
         return group
 
+    def get_fridge(self, request):
+        """Tủ lạnh của nhóm (None nếu user không thuộc nhóm nào), chỉ query 1 lần mỗi request"""
+        if not hasattr(self, '_fridge'):
+            group = self.get_group(request)
+            self._fridge = Fridge.objects.get_or_create(group=group)[0] if group else None
+        return self._fridge
+
+    def get_version_keys(self, request, *args, **kwargs):
+        fridge = self.get_fridge(request)
+        if not fridge:
+            return None
+        return [('fridge', fridge.fridgeID), ('catalog', 'all')]
+
+
+class FridgeNotificationView(GroupFridgeMixin, ConditionalGetMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    conditional_daily = True
+
     def get(self, request):
         """Lấy thông báo thực phẩm sắp hết hạn trong vòng 3 ngày và đã hết hạn"""
-        group = self.get_group(request)
-        if not group:
+        fridge = self.get_fridge(request)
+        if not fridge:
             return Response("User không thuộc nhóm nào", status=status.HTTP_400_BAD_REQUEST)
 
-        fridge, _ = Fridge.objects.get_or_create(group=group)
+        # Chỉ lấy số lượng theo từng mốc (hiển thị trên header), không đọc bảng sản phẩm
+        if request.query_params.get('summary'):
+            counts = expiry_buckets.get_counts(fridge)
+            return Response({
+                'total_expiring': sum(counts.values()),
+                'buckets': counts
+            })
+
         today = date.today()
         three_days_later = today + timedelta(days=3)
-        
-        # Sản phẩm đã hết hạn
-        expired_items = AddToFridge.objects.filter(
-            fridge=fridge,
-            expiredDate__lt=today
-        ).select_related('product', 'product__category').order_by('expiredDate')
 
-        # Sản phẩm sắp hết hạn
-        expiring_items = AddToFridge.objects.filter(
+        # Sản phẩm đã hết hạn và sắp hết hạn: 1 query dùng index (fridge, expiredDate)
+        items = AddToFridge.objects.filter(
             fridge=fridge,
-            expiredDate__gte=today,
             expiredDate__lte=three_days_later
         ).select_related('product', 'product__category').order_by('expiredDate')
 
         # Serialize
-        expired_serializer = AddToFridgeSerializer(expired_items, many=True)
-        expired_data = expired_serializer.data
-        for item in expired_data:
-            item['days_remaining'] = (date.fromisoformat(item['expiredDate']) - today).days
-            item['urgency'] = 'expired'
-            item['urgency_text'] = 'Đã hết hạn'
-
-        expiring_serializer = AddToFridgeSerializer(expiring_items, many=True)
-        expiring_data = expiring_serializer.data
-        for item in expiring_data:
-            expired_date = date.fromisoformat(item['expiredDate'])
-            days_remaining = (expired_date - today).days
+        all_items = AddToFridgeSerializer(items, many=True).data
+        for item in all_items:
+            days_remaining = (date.fromisoformat(item['expiredDate']) - today).days
             item['days_remaining'] = days_remaining
-            if days_remaining == 0:
+            if days_remaining < 0:
+                item['urgency'] = 'expired'
+                item['urgency_text'] = 'Đã hết hạn'
+            elif days_remaining == 0:
                 item['urgency'] = 'critical'
                 item['urgency_text'] = 'Hết hạn hôm nay'
             elif days_remaining == 1:
                 item['urgency'] = 'high'
                 item['urgency_text'] = 'Hết hạn ngày mai'
-            elif days_remaining <= 3:
+            else:
                 item['urgency'] = 'medium'
                 item['urgency_text'] = f'Hết hạn trong {days_remaining} ngày'
 
-        all_items = list(expired_data) + list(expiring_data)
-
         return Response({
             'total_expiring': len(all_items),
             'items': all_items
         })
 
-class FridgeDetailView(APIView):
+class FridgeStatsView(GroupFridgeMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
+    conditional_daily = True
 
-    # Lấy ra nhóm ứng với tủ lạnh
-    def get_group(self, request):
-        group_id = request.query_params.get('group_id')
-        user = request.user
-        if group_id:
-            group = get_object_or_404(Group, pk=group_id, members=user)
-        else:
-            # Lấy nhóm đầu tiên user tham gia nếu không truyền group_id
-            group = user.joined_groups.first()
-            if not group:
-                return None
-        return group
-    
-    # Tính toán thống kê
-    def get_stats(self, fridge):
-        today = date.today()
-        tomorrow = today + timedelta(days=1)
-
-        items = AddToFridge.objects.filter(fridge=fridge)
-
-        total_products = items.count()
-        expired_products = items.filter(expiredDate__lt=today).count()
-        expiring_soon_products =items.filter(
-        expiredDate__gte=today, expiredDate__lte=tomorrow).count()
-
-        popular_categories_qs = (
-            items.values('product__category__categoryName')
-            .annotate(total_quantity=Sum('quantity'))
-            .order_by('-total_quantity')[:5]
-        )
-
-        popular_categories = [
-            {
-                "categoryName": c['product__category__categoryName'] or "Chưa phân loại",
-                "totalQuantity": c['total_quantity']
-            }
-            for c in popular_categories_qs
-        ]
-
-        return {
-            "total_products": total_products,
-            "expired_products": expired_products,
-            "expiring_soon_products": expiring_soon_products,
-            "popular_categories": popular_categories,
-        }
+    def get(self, request):
+        """Thống kê tủ lạnh đã tính sẵn, dành cho dashboard"""
+        fridge = self.get_fridge(request)
+        if not fridge:
+            return Response("User không thuộc nhóm nào", status=status.HTTP_400_BAD_REQUEST)
+        return Response(fridge_stats.get_stats(fridge))
+
+class FridgeDetailView(GroupFridgeMixin, ConditionalGetMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    conditional_daily = True
 
     # GET: Lấy danh sách (nếu không có id) hoặc chi tiết một mục (nếu có id)
     def get(self, request, id=None):
-        group = self.get_group(request)
-        if not group:
+        fridge = self.get_fridge(request)
+        if not fridge:
             return Response("User không thuộc nhóm nào", status=status.HTTP_400_BAD_REQUEST)
-
-        fridge, _ = Fridge.objects.get_or_create(group=group)
         
         if id:
             # Lấy chi tiết một mục
@@ -151,7 +129,7 @@ class FridgeDetailView(APIView):
             return Response(data)
         else:
             # Lấy danh sách tất cả sản phẩm
-            items = AddToFridge.objects.filter(fridge=fridge).select_related('product', 'product__category')
+            items = list(AddToFridge.objects.filter(fridge=fridge).select_related('product', 'product__category'))
             serializer = AddToFridgeSerializer(items, many=True)
             today = date.today()
             soon = today + timedelta(days=1)
@@ -159,7 +137,8 @@ class FridgeDetailView(APIView):
             for item in data:
                 expired_date = item.get('expiredDate')
                 item['isExpiringSoon'] = expired_date and date.fromisoformat(expired_date) <= soon
-            stats = self.get_stats(fridge)
+            # Thống kê tính luôn từ các dòng vừa lấy, không cần query thêm
+            stats = fridge_stats.stats_from_items(items, today)
             return Response({"items": data, "stats": stats})
 
     # POST: Thêm sản phẩm (chỉ trên /fridge/)
@@ -306,4 +285,40 @@ class FridgeDetailView(APIView):
         fridge, _ = Fridge.objects.get_or_create(group=group)
         item = get_object_or_404(AddToFridge, id=id, fridge=fridge)
         item.delete()
-        return Response("Sản phẩm đã được xóa khỏi tủ lạnh", status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response("Sản phẩm đã được xóa khỏi tủ lạnh", status=status.HTTP_204_NO_CONTENT)
+
+class FridgeImportView(GroupFridgeMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    # POST: Nhập nhiều sản phẩm 1 lần
+    def post(self, request):
+        """
+        Body JSON: danh sách dòng (hoặc {"items": [...]}), hoặc upload file CSV ở field "file".
+        Mỗi dòng: product_id hoặc productName, quantity, expiredDate (bỏ trống = hôm nay + shelfLife),
+        location, unit và category_id (khi cần tạo sản phẩm mới).
+        """
+        group = self.get_group(request)
+        if not group:
+            return Response("User không thuộc nhóm nào", status=status.HTTP_400_BAD_REQUEST)
+
+        if 'file' in request.FILES:
+            try:
+                rows = fridge_import.read_csv(request.FILES['file'])
+            except ValueError as e:
+                return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data.get('items') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({'message': 'Cần danh sách sản phẩm (JSON) hoặc file CSV'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > fridge_import.MAX_ROWS:
+            return Response({'message': f'Tối đa {fridge_import.MAX_ROWS} dòng mỗi lần'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fridge, _ = Fridge.objects.get_or_create(group=group)
+        results = fridge_import.import_items(fridge, rows)
+        imported = sum(1 for result in results if result['status'] != 'error')
+        return Response({
+            'message': f'Đã nhập {imported}/{len(results)} dòng',
+            'imported': imported,
+            'failed': len(results) - imported,
+            'results': results
+        }, status=status.HTTP_200_OK if imported else status.HTTP_400_BAD_REQUEST)
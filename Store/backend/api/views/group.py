@@ -12,7 +12,7 @@ class GroupListView(APIView):
 
     def get(self, request):
         # Lấy danh sách nhóm mà user là thành viên
-        user_groups = Group.objects.filter(members=request.user)
+        user_groups = Group.objects.filter(members=request.user).select_related('createdBy')
         serializer = GroupSerializer(user_groups, many=True)
         return Response(serializer.data)
 
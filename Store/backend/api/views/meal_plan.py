@@ -2,6 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
+from django.db import transaction
 from django.db.models import Q
 from datetime import datetime, timedelta
 from collections import defaultdict
@@ -15,8 +16,11 @@ from ..serializers.mealplan_serializers import (
     MealPlanSerializer, 
     MealPlanDetailSerializer, 
     MealPlanCreateSerializer,
-    MealPlanWeeklySerializer
+    MealPlanWeeklySerializer,
+    with_recipes,
+    set_plan_recipes,
 )
+from ..utils import weekly_meal_plan
 
 class MealPlanListView(APIView):
     """API để lấy danh sách và tạo kế hoạch bữa ăn"""
@@ -34,7 +38,7 @@ class MealPlanListView(APIView):
         if user_id:
             queryset = queryset.filter(user_id=user_id)
             
-        queryset = queryset.order_by('-created_at')
+        queryset = with_recipes(queryset.order_by('-created_at'))
         serializer = MealPlanSerializer(queryset, many=True)
         
         return Response({
@@ -52,29 +56,13 @@ class MealPlanListView(APIView):
         
         if serializer.is_valid():
             meal_plans = serializer.save()
-            # Lưu các recipe từ plannedMeals vào bảng Have
-            planned_meals = request.data.get('planned_meals', [])
-            print(f"planned_meals: {planned_meals}")
-            
-            for meal_plan in meal_plans:
-                for meal in planned_meals:
-                    recipe_id = meal.get('recipe_id')
-                    print(f"Processing recipe_id: {recipe_id}")
-                    if recipe_id:
-                        try:
-                            recipe = Recipe.objects.get(recipeID=recipe_id)
-                            have_relation, created = Have.objects.get_or_create(
-                                plan=meal_plan,
-                                recipe=recipe
-                            )
-                            print(f"Created Have relation: {created}")
-                        except Recipe.DoesNotExist:
-                            print(f"Recipe not found with ID: {recipe_id}")
-                            pass
             return Response({
                 'success': True,
                 'message': 'Tạo kế hoạch bữa ăn thành công',
-                'data': [MealPlanSerializer(plan).data for plan in meal_plans]
+                'data': MealPlanSerializer(
+                    with_recipes(MealPlan.objects.filter(planID__in=[plan.planID for plan in meal_plans]).order_by('planID')),
+                    many=True
+                ).data
             }, status=status.HTTP_201_CREATED)
         
         print(f"Validation errors: {serializer.errors}")
@@ -95,7 +83,7 @@ class MealPlanDetailView(APIView):
     
     def get(self, request, pk):
         """Lấy chi tiết kế hoạch bữa ăn"""
-        meal_plan = self.get_object(pk)
+        meal_plan = with_recipes(MealPlan.objects.filter(planID=pk)).first()
         if not meal_plan:
             return Response({
                 'success': False,
@@ -119,20 +107,24 @@ class MealPlanDetailView(APIView):
 
         serializer = MealPlanSerializer(meal_plan, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            # Xử lý cập nhật danh sách món ăn
-            planned_meals = request.data.get('planned_meals', [])
-            # Xóa hết các món cũ
-            Have.objects.filter(plan=meal_plan).delete()
-            # Thêm lại các món mới
-            for meal in planned_meals:
-                recipe_id = meal.get('recipe_id')
-                if recipe_id:
-                    try:
-                        recipe = Recipe.objects.get(recipeID=recipe_id)
-                        Have.objects.create(plan=meal_plan, recipe=recipe)
-                    except Recipe.DoesNotExist:
-                        pass
+            # Chỉ đồng bộ danh sách món khi client gửi planned_meals (sửa mô tả không đụng tới món ăn)
+            recipe_ids = None
+            if 'planned_meals' in request.data:
+                try:
+                    recipe_ids = [
+                        int(meal['recipe_id']) for meal in request.data.get('planned_meals') or []
+                        if meal.get('recipe_id')
+                    ]
+                except (TypeError, ValueError, AttributeError):
+                    return Response({
+                        'success': False,
+                        'message': 'recipe_id phải là số'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+            with transaction.atomic():
+                serializer.save()
+                if recipe_ids is not None:
+                    set_plan_recipes(meal_plan, recipe_ids)
             return Response({
                 'success': True,
                 'message': 'Cập nhật kế hoạch thành công',
@@ -161,6 +153,34 @@ class MealPlanDetailView(APIView):
 
 
 
+class MealPlanWeeklyView(APIView):
+    """API lịch bữa ăn theo tuần: lưới 7 ngày x 3 bữa và tổng hợp nguyên liệu"""
+    permission_classes = [AllowAny]  # Cho phép anonymous access
+
+    def get(self, request):
+        """GET /meal-plans/weekly/?group_id=&date=YYYY-MM-DD (ngày bất kỳ trong tuần, mặc định hôm nay)"""
+        group_id = request.query_params.get('group_id')
+        if not group_id:
+            return Response({
+                'success': False,
+                'message': 'Thiếu group_id'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            group_id = int(group_id)
+            day = datetime.strptime(request.query_params['date'], '%Y-%m-%d').date() if request.query_params.get('date') else datetime.now().date()
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'group_id phải là số và date có dạng YYYY-MM-DD'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'data': weekly_meal_plan.get_week(group_id, day)
+        })
+
+
 class MealPlanRecipeView(APIView):
     """API để quản lý món ăn trong kế hoạch"""
     permission_classes = [AllowAny]  # Cho phép anonymous access
@@ -7,13 +7,24 @@ from ..models.product_catalog import ProductCatalog
 from ..serializers.product_catalog_serializer import ProductCatalogSerializer
 import cloudinary.uploader
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from ..utils import product_search
+from ..utils.autocomplete import product_autocomplete
+from ..utils.conditional import ConditionalGetMixin
 
 
-class ProductCatalogView(APIView):
+class ProductCatalogView(ConditionalGetMixin, APIView):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [AllowAny]
 
+    def get_version_keys(self, request):
+        return [('catalog', 'all')]
+
+    # Phân trang keyset theo productID
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+    # Các trường cần join bảng Categories
+    CATEGORY_FIELDS = {'categoryID', 'category_name'}
+
     def get(self, request):
         category_id = request.query_params.get('category', None)
         products = ProductCatalog.objects.all()
@@ -23,8 +34,41 @@ class ProductCatalogView(APIView):
                 products = products.filter(category_id=int(category_id))
             except ValueError:
                 pass  # Nếu category_id không phải số, bỏ qua filter
-        serializer = ProductCatalogSerializer(products, many=True)
-        return Response(serializer.data)
+
+        # Projection: ?fields=productID,productName
+        fields = None
+        if request.query_params.get('fields'):
+            fields = [f.strip() for f in request.query_params['fields'].split(',') if f.strip()]
+            unknown = set(fields) - set(ProductCatalogSerializer.Meta.fields)
+            if unknown:
+                return Response({
+                    'message': f"Trường không hợp lệ: {', '.join(sorted(unknown))}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+        if fields is None or self.CATEGORY_FIELDS & set(fields):
+            products = products.select_related('category')
+
+        # Không truyền cursor/limit: trả về toàn bộ danh sách như trước
+        if 'cursor' not in request.query_params and 'limit' not in request.query_params:
+            serializer = ProductCatalogSerializer(products, many=True, fields=fields)
+            return Response(serializer.data)
+
+        try:
+            limit = int(request.query_params.get('limit', self.DEFAULT_PAGE_SIZE))
+            cursor = int(request.query_params.get('cursor') or 0)
+        except ValueError:
+            return Response({
+                'message': 'cursor và limit phải là số nguyên'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), self.MAX_PAGE_SIZE)
+
+        # Lấy dư 1 dòng để biết còn trang sau hay không
+        page = list(products.filter(productID__gt=cursor).order_by('productID')[:limit + 1])
+        has_next = len(page) > limit
+        page = page[:limit]
+        return Response({
+            'results': ProductCatalogSerializer(page, many=True, fields=fields).data,
+            'next_cursor': page[-1].productID if has_next else None,
+        })
 
     def post(self, request):
         # Xử lý upload ảnh
@@ -134,7 +178,8 @@ class ProductCatalogSearchView(APIView):
         if not query:
             return Response([])
 
-        products = ProductCatalog.objects.filter(Q(productName__icontains=query), isCustom=False).select_related('category').order_by('productName')[:10]
+        # Không phân biệt dấu: "ca chua" tìm được "Cà chua", xếp theo độ khớp
+        products = product_search.search(query, limit=10)
         results = []
         for product in products:
             results.append({
@@ -144,9 +189,24 @@ class ProductCatalogSearchView(APIView):
                 'shelfLife': product.shelfLife,
                 'isCustom': product.isCustom,
                 'categoryName': product.category.categoryName if product.category else None,
-                'categoryID': product.category.categoryID,
+                'categoryID': product.category.categoryID if product.category else None,
                 'image': product.image,
             })
 
         return Response(results)
-    
\ No newline at end of file
+
+
+class ProductAutocompleteView(APIView):
+    """Gợi ý sản phẩm khi gõ (mỗi phím 1 request), đọc từ bộ nhớ của worker, không truy vấn database"""
+    permission_classes = [IsAuthenticated]
+    MAX_LIMIT = 20
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), self.MAX_LIMIT)
+        except ValueError:
+            return Response({
+                'message': 'limit phải là số nguyên'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response(product_autocomplete.suggest(query, limit=limit))
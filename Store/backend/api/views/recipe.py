@@ -1,10 +1,14 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets
 from ..models.recipe import Recipe
 from ..serializers.recipe_serializers import RecipeSerializer, IngredientSerializer
 from ..models.ingredient import Ingredient
 
 class RecipeView(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all().prefetch_related('ingredients__product')
+    # product kèm category (ProductCatalogSerializer đọc category): 2 truy vấn bất kể số công thức
+    queryset = Recipe.objects.all().prefetch_related(
+        Prefetch('ingredients', queryset=Ingredient.objects.select_related('product__category'))
+    )
     serializer_class = RecipeSerializer
     
 class IngredientView(viewsets.ModelViewSet):
@@ -4,13 +4,15 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Prefetch
 from ..models.fridge import Fridge
-from ..models.add_to_fridge import AddToFridge
 from ..models.group import Group
 from ..models.recipe import Recipe
 from ..models.ingredient import Ingredient
 from ..serializers.recipe_serializers import RecipeSerializer
-from django.db.models import Count
+from ..utils.recommendation_engine import recommend, match_percentage
+from ..utils.fridge_scoring import COVERAGE, SCORING_MODES, get_fridge_vector
+from ..utils import recommendation_cache
 
 class RecipeRecommendationView(APIView):
     permission_classes = [IsAuthenticated]
@@ -34,68 +36,25 @@ class RecipeRecommendationView(APIView):
 
         fridge, _ = Fridge.objects.get_or_create(group=group)
 
-        # Lấy tất cả products trong tủ lạnh
-        fridge_items = AddToFridge.objects.filter(fridge=fridge).select_related('product')
-        fridge_product_ids = set(item.product.productID for item in fridge_items)
-
-        # Lấy tất cả thực đơn với lại ingredients của nó
-        recipes = Recipe.objects.prefetch_related('ingredients__product').annotate(
-            ingredient_count=Count('ingredients')
-        )
-
-        recommendations = []
-        
-        for recipe in recipes:
-            # Lấy ingredients' ID cho recipe
-            recipe_ingredient_ids = set(
-                ingredient.product.productID 
-                for ingredient in recipe.ingredients.all() 
-                if ingredient.product
-            )
-            
-            # Tính số lượng match 
-            matching_ingredients = recipe_ingredient_ids.intersection(fridge_product_ids)
-            total_ingredients = len(recipe_ingredient_ids)
-            
-            # Tính % match 
-            match_percentage = (
-                (len(matching_ingredients) / total_ingredients * 100) 
-                if total_ingredients > 0 else 0
+        mode = request.query_params.get('mode', COVERAGE)
+        if mode not in SCORING_MODES:
+            return Response(
+                f"Chế độ gợi ý không hợp lệ. Chọn một trong: {', '.join(SCORING_MODES)}",
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            # Lấy các nguyên liệu còn thiếu
-            missing_ingredients = recipe_ingredient_ids - fridge_product_ids
-            missing_ingredient_details = [
-                {
-                    'product_id': pid,
-                    'product_name': Ingredient.objects.get(
-                        recipe=recipe, 
-                        product__productID=pid
-                    ).product.productName
-                }
-                for pid in missing_ingredients
-            ]
-
-            serializer = RecipeSerializer(recipe)
-            recipe_data = serializer.data
-            
-            # Recommendation details
-            recipe_data.update({
-                'match_percentage': round(match_percentage, 2),
-                'matching_ingredients_count': len(matching_ingredients),
-                'total_ingredients': total_ingredients,
-                'missing_ingredients': missing_ingredient_details
-            })
-            
-            recommendations.append(recipe_data)
-
-        # Sắp xếp theo thứ tự giảm dần
-        recommendations.sort(key=lambda x: x['match_percentage'], reverse=True)
 
+        # Xếp hạng 1 lần cho mỗi phiên bản tủ lạnh, các trang sau chỉ cắt từ cache
+        ranking, fridge_vector = recommendation_cache.get_or_compute(
+            fridge, mode, lambda: self.compute_ranking(fridge, mode)
+        )
 
         page = request.query_params.get('page', 1)
-        page_size = int(request.query_params.get('page_size', 4))  # 4 cái recommend cho 1 trang
-        paginator = Paginator(recommendations, page_size)
+        try:
+            page_size = int(request.query_params.get('page_size', 4))  # 4 cái recommend cho 1 trang
+        except ValueError:
+            page_size = 4
+        page_size = max(page_size, 1)
+        paginator = Paginator(range(len(ranking)), page_size)
 
         try:
             paginated_recommendations = paginator.page(page)
@@ -104,10 +63,67 @@ class RecipeRecommendationView(APIView):
         except EmptyPage:
             paginated_recommendations = paginator.page(paginator.num_pages)
 
+        offset = max(paginated_recommendations.start_index() - 1, 0)
+        ranked = ranking.page(offset, page_size)
+
         return Response({
-            'total_recommendations': len(recommendations),
-            'page': int(page),
+            'total_recommendations': len(ranking),
+            'mode': mode,
+            'page': paginated_recommendations.number,
             'page_size': page_size,
             'total_pages': paginator.num_pages,
-            'recommendations': paginated_recommendations.object_list
-        })
\ No newline at end of file
+            'recommendations': self.serialize_page(ranked, fridge_vector)
+        })
+
+    def compute_ranking(self, fridge, mode):
+        # Nội dung tủ lạnh + chỉ mục hạn sử dụng, dùng chung cho mọi chế độ
+        fridge_vector = get_fridge_vector(fridge)
+
+        # Chỉ xếp hạng các thực đơn có ít nhất 1 nguyên liệu trong tủ lạnh
+        return recommend(fridge_vector, mode), fridge_vector
+
+    def serialize_page(self, ranked, fridge_vector):
+        """Serialize các công thức của trang hiện tại với dữ liệu đã prefetch"""
+        recipes = Recipe.objects.filter(pk__in=[s.recipe_id for s in ranked]).prefetch_related(
+            Prefetch('ingredients', queryset=Ingredient.objects.select_related('product__category'))
+        ).in_bulk()
+
+        recommendations = []
+        for scored in ranked:
+            recipe = recipes.get(scored.recipe_id)
+            if recipe is None:
+                continue
+
+            # Lấy các nguyên liệu còn thiếu từ dữ liệu đã prefetch
+            missing_ingredient_details = [
+                {
+                    'product_id': ingredient.product.productID,
+                    'product_name': ingredient.product.productName
+                }
+                for ingredient in recipe.ingredients.all()
+                if ingredient.product and ingredient.product.productID not in fridge_vector.quantities
+            ]
+
+            # Các nguyên liệu sắp hết hạn mà công thức sẽ dùng tới
+            expiring_ingredient_details = [
+                {
+                    'product_id': ingredient.product.productID,
+                    'product_name': ingredient.product.productName,
+                    'days_remaining': fridge_vector.expiring[ingredient.product.productID]
+                }
+                for ingredient in recipe.ingredients.all()
+                if ingredient.product and ingredient.product.productID in fridge_vector.expiring
+            ]
+
+            recipe_data = RecipeSerializer(recipe).data
+            # Recommendation details
+            recipe_data.update({
+                'match_percentage': round(match_percentage(scored), 2),
+                'score': round(scored.score, 4),
+                'matching_ingredients_count': scored.matched,
+                'total_ingredients': scored.total,
+                'missing_ingredients': missing_ingredient_details,
+                'expiring_ingredients': expiring_ingredient_details
+            })
+            recommendations.append(recipe_data)
+        return recommendations
@@ -5,14 +5,84 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from ..models.shopping_list import ShoppingList
 from ..models.add_to_list import AddToList
+from ..models.group import Group
 from ..serializers.shopping_serializers import ShoppingListSerializer, AddToListSerializer
-from django.db.models import Sum, Count
+from django.db import transaction
+from django.db.models import Sum, Count, Q, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from ..utils.conditional import ConditionalGetMixin
+from ..utils import purchase_rollup
+from ..utils.fridge_restock import apply_purchases
+from ..utils.shopping_list_generator import generate_shopping_list
+from ..utils.versioning import bump_version, get_version
+from ..models.product_catalog import ProductCatalog
+from ..models.add_to_fridge import AddToFridge
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+def list_stats(statuses):
+    """Thống kê tiến độ của 1 danh sách từ trạng thái các item"""
+    total_items = 0
+    purchased_items = 0
+    for item_status in statuses:
+        total_items += 1
+        if item_status == AddToList.ListStatus.PURCHASED:
+            purchased_items += 1
+    return progress_stats(total_items, purchased_items)
+
+
+def progress_stats(total_items, purchased_items):
+    progress = (purchased_items / total_items * 100) if total_items > 0 else 0
+    return {
+        'total_items': total_items,
+        'purchased_items': purchased_items,
+        'pending_items': total_items - purchased_items,
+        'progress': round(progress, 2)
+    }
+
+
+def with_summary(queryset):
+    """
+    Thêm số item, số item đã mua và chi phí ước tính cho mỗi danh sách bằng subquery
+    trong cùng truy vấn. Subquery chỉ chạy cho các dòng được trả về (sau LIMIT).
+    Chi phí: item đã mua tính theo giá lúc mua, item chưa mua theo giá hiện tại.
+    """
+    items = AddToList.objects.filter(list=OuterRef('pk')).order_by().values('list')
+
+    def aggregate(expression, output_field):
+        return Coalesce(
+            Subquery(items.annotate(value=expression).values('value'), output_field=output_field),
+            Value(0), output_field=output_field
+        )
+
+    return queryset.annotate(
+        total_items=aggregate(Count('id'), output_field=IntegerField()),
+        purchased_items=aggregate(Count('id', filter=Q(status=AddToList.ListStatus.PURCHASED)), output_field=IntegerField()),
+        estimated_cost=aggregate(
+            Sum(F('quantity') * Coalesce('unit_price', 'product__price'), output_field=FloatField()),
+            output_field=FloatField()
+        ),
+    )
+
+
+def list_summary(shopping_list):
+    """ShoppingListSerializer + stats như trang chi tiết, từ các giá trị with_summary đã tính"""
+    data = ShoppingListSerializer(shopping_list).data
+    data['stats'] = progress_stats(shopping_list.total_items, shopping_list.purchased_items)
+    data['estimated_cost'] = round(shopping_list.estimated_cost, 2)
+    return data
+
 
 class ShoppingListView(APIView):
     permission_classes = [IsAuthenticated]
-    
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
     def get(self, request):
-        """Lấy danh sách shopping lists của group mà user đang tham gia"""
+        """
+        Lấy danh sách shopping lists của group mà user đang tham gia, mới nhất trước,
+        kèm thống kê tiến độ và chi phí ước tính của từng danh sách.
+        Truyền limit (và cursor = next_cursor của trang trước) để phân trang.
+        """
         user = request.user
         group_id = request.query_params.get('group_id')
         if not group_id:
@@ -21,9 +91,49 @@ class ShoppingListView(APIView):
         # from ..models.in_model import In
         # if not In.objects.filter(user=user, group_id=group_id).exists():
         #     return Response({'message': 'Bạn không thuộc group này'}, status=403)
-        shopping_lists = ShoppingList.objects.filter(group=group_id).order_by('-createdAt')
-        serializer = ShoppingListSerializer(shopping_lists, many=True)
-        return Response(serializer.data)
+        shopping_lists = with_summary(ShoppingList.objects.filter(group=group_id)).order_by('-createdAt', '-listID')
+
+        # Không truyền cursor/limit: trả về toàn bộ danh sách như trước
+        if 'cursor' not in request.query_params and 'limit' not in request.query_params:
+            return Response([list_summary(shopping_list) for shopping_list in shopping_lists])
+
+        try:
+            limit = int(request.query_params.get('limit', self.DEFAULT_PAGE_SIZE))
+            position = self.parse_cursor(request.query_params.get('cursor'))
+        except (ValueError, OverflowError):
+            return Response({
+                'message': 'cursor hoặc limit không hợp lệ'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), self.MAX_PAGE_SIZE)
+
+        if position is not None:
+            created_at, list_id = position
+            shopping_lists = shopping_lists.filter(
+                Q(createdAt__lt=created_at) | Q(createdAt=created_at, listID__lt=list_id)
+            )
+        # Lấy dư 1 dòng để biết còn trang sau hay không
+        page = list(shopping_lists[:limit + 1])
+        has_next = len(page) > limit
+        page = page[:limit]
+        return Response({
+            'results': [list_summary(shopping_list) for shopping_list in page],
+            'next_cursor': self.make_cursor(page[-1]) if has_next else None,
+        })
+
+    @staticmethod
+    def make_cursor(shopping_list):
+        """Vị trí (createdAt, listID) của dòng cuối trang: '<microsecond epoch>_<listID>'"""
+        created_at = shopping_list.createdAt
+        micros = (created_at - datetime(1970, 1, 1, tzinfo=dt_timezone.utc)) // timedelta(microseconds=1)
+        return f'{micros}_{shopping_list.listID}'
+
+    @staticmethod
+    def parse_cursor(cursor):
+        if not cursor:
+            return None
+        micros, list_id = cursor.split('_')
+        created_at = datetime(1970, 1, 1, tzinfo=dt_timezone.utc) + timedelta(microseconds=int(micros))
+        return created_at, int(list_id)
     
     def post(self, request):
         """Tạo shopping list mới"""
@@ -43,8 +153,12 @@ class ShoppingListView(APIView):
             'errors': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
-class ShoppingListDetailView(APIView):
+class ShoppingListDetailView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
+
+    def get_version_keys(self, request, list_id):
+        # Chi tiết danh sách gồm cả thông tin sản phẩm nên phụ thuộc cả catalog
+        return [('shopping_list', list_id), ('catalog', 'all')]
     
     def get(self, request, list_id):
         """Xem chi tiết shopping list và items"""
@@ -53,20 +167,12 @@ class ShoppingListDetailView(APIView):
         # from ..models.in_model import In
         # if not In.objects.filter(user=request.user, group=shopping_list.group).exists():
         #     return Response({'message': 'Bạn không thuộc group này'}, status=403)
-        items = AddToList.objects.filter(list=shopping_list)
-        # Tính toán thống kê
-        total_items = items.count()
-        purchased_items = items.filter(status='purchased').count()
-        progress = (purchased_items / total_items * 100) if total_items > 0 else 0
+        # 1 truy vấn cho items (kèm product, category); thống kê tính luôn trên các dòng này
+        items = list(AddToList.objects.filter(list=shopping_list).select_related('product__category').order_by('id'))
         return Response({
             'list': ShoppingListSerializer(shopping_list).data,
             'items': AddToListSerializer(items, many=True).data,
-            'stats': {
-                'total_items': total_items,
-                'purchased_items': purchased_items,
-                'pending_items': total_items - purchased_items,
-                'progress': round(progress, 2)
-            }
+            'stats': list_stats(item.status for item in items)
         })
     
     def put(self, request, list_id):
@@ -76,6 +182,7 @@ class ShoppingListDetailView(APIView):
         
         if serializer.is_valid():
             serializer.save()
+            shopping_list.refresh_from_db(fields=['total_spent'])
             return Response({
                 'message': 'Cập nhật danh sách thành công',
                 'data': serializer.data
@@ -94,6 +201,55 @@ class ShoppingListDetailView(APIView):
             'message': 'Xóa danh sách thành công'
         }, status=status.HTTP_204_NO_CONTENT)
 
+class ShoppingListFromMealPlansView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Tạo shopping list từ kế hoạch bữa ăn của group trong khoảng ngày:
+        nguyên liệu của các món đã lên kế hoạch, trừ phần có trong tủ lạnh
+        và phần đang chờ mua ở các danh sách khác.
+        Body: group_id, start_date, end_date (mặc định start_date + 6), listName (tùy chọn)
+        """
+        group_id = request.data.get('group_id')
+        if not group_id:
+            return Response({'message': 'Thiếu group_id'}, status=400)
+        try:
+            group_id = int(group_id)
+        except (TypeError, ValueError):
+            return Response({'message': 'group_id phải là số'}, status=400)
+        # Chỉ thành viên của group mới được tạo danh sách cho group đó
+        group = get_object_or_404(Group, pk=group_id, members=request.user)
+        try:
+            start = datetime.strptime(str(request.data.get('start_date')), '%Y-%m-%d').date()
+            end = (
+                datetime.strptime(str(request.data['end_date']), '%Y-%m-%d').date()
+                if request.data.get('end_date') else start + timedelta(days=6)
+            )
+        except ValueError:
+            return Response({'message': 'start_date/end_date phải có dạng YYYY-MM-DD'}, status=400)
+        if end < start:
+            return Response({'message': 'end_date phải sau start_date'}, status=400)
+
+        shopping_list, item_count = generate_shopping_list(
+            group.groupID, request.user, start, end, list_name=request.data.get('listName')
+        )
+        if shopping_list is None:
+            return Response({
+                'message': 'Tủ lạnh và các danh sách hiện có đã đủ nguyên liệu cho kế hoạch',
+                'data': None
+            })
+
+        items = AddToList.objects.filter(list=shopping_list).select_related('product__category').order_by('id')
+        return Response({
+            'message': f'Đã tạo danh sách mua sắm với {item_count} sản phẩm',
+            'data': {
+                'list': ShoppingListSerializer(shopping_list).data,
+                'items': AddToListSerializer(items, many=True).data,
+            }
+        }, status=status.HTTP_201_CREATED)
+
+
 class AddToListView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -115,6 +271,179 @@ class AddToListView(APIView):
             'errors': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
+class ShoppingListBatchView(APIView):
+    """
+    Nhiều thao tác trên item của 1 danh sách trong 1 request, chạy trong 1 transaction:
+        {"operations": [
+            {"op": "add", "product": 12, "quantity": 2},
+            {"op": "update", "id": 5, "quantity": 3, "status": "purchased"},
+            {"op": "toggle", "id": 6},
+            {"op": "delete", "id": 7}
+        ]}
+    Có thao tác lỗi thì không thao tác nào được áp dụng, lỗi trả về theo vị trí.
+    """
+    permission_classes = [IsAuthenticated]
+    OPERATIONS = ('add', 'update', 'toggle', 'delete')
+    MAX_OPERATIONS = 500
+
+    def post(self, request, list_id):
+        shopping_list = get_object_or_404(ShoppingList, listID=list_id)
+        operations = request.data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return Response({'message': 'operations phải là danh sách thao tác'}, status=400)
+        if len(operations) > self.MAX_OPERATIONS:
+            return Response({'message': f'Tối đa {self.MAX_OPERATIONS} thao tác mỗi lần'}, status=400)
+
+        # Nạp trước toàn bộ item và sản phẩm được nhắc tới: 2 truy vấn
+        item_ids, product_ids = set(), set()
+        for operation in operations:
+            if not isinstance(operation, dict):
+                continue
+            try:
+                if operation.get('op') == 'add':
+                    product_ids.add(int(operation.get('product')))
+                elif operation.get('id') is not None:
+                    item_ids.add(int(operation['id']))
+            except (TypeError, ValueError):
+                pass
+        items = AddToList.objects.filter(list=shopping_list).filter(
+            Q(id__in=item_ids) | Q(product_id__in=product_ids)
+        ).select_related('product').in_bulk()
+        products_in_list = {item.product_id: item.id for item in items.values()}
+        valid_products = set(ProductCatalog.objects.filter(productID__in=product_ids).values_list('productID', flat=True))
+
+        errors = {}
+        to_create, updated, deleted = {}, {}, {}
+        for index, operation in enumerate(operations):
+            try:
+                self.apply(operation, items, products_in_list, valid_products, to_create, updated, deleted, shopping_list)
+            except ValueError as e:
+                errors[index] = str(e)
+        if errors:
+            return Response({
+                'message': 'Có lỗi xảy ra, không thao tác nào được áp dụng',
+                'errors': errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if deleted:
+                AddToList.objects.filter(id__in=deleted).delete()
+            if updated:
+                purchase_changes = []
+                for item in updated.values():
+                    item.sync_purchase()
+                    purchase_changes.append((item._loaded_purchase, item.purchase_state()))
+                AddToList.objects.bulk_update(updated.values(), ['quantity', 'status', 'purchased_at', 'unit_price', 'purchased_category', 'in_fridge'])
+                # bulk_update không gửi signal nên tự cập nhật thống kê đã mua
+                purchase_rollup.record_changes(purchase_changes)
+            if to_create:
+                AddToList.objects.bulk_create(to_create.values())
+            stats = AddToList.objects.filter(list=shopping_list).aggregate(
+                total=Count('id'),
+                purchased=Count('id', filter=Q(status=AddToList.ListStatus.PURCHASED))
+            )
+        # bulk_create/bulk_update không gửi signal
+        bump_version('shopping_list', shopping_list.listID)
+
+        return Response({
+            'message': f'Đã áp dụng {len(operations)} thao tác',
+            'version': get_version('shopping_list', shopping_list.listID),
+            'created': [item.id for item in to_create.values()],
+            'updated': sorted(updated),
+            'deleted': sorted(deleted),
+            'stats': progress_stats(stats['total'], stats['purchased'])
+        })
+
+    def apply(self, operation, items, products_in_list, valid_products, to_create, updated, deleted, shopping_list):
+        """Áp dụng 1 thao tác lên bản sao trong bộ nhớ, lỗi thì raise ValueError"""
+        if not isinstance(operation, dict) or operation.get('op') not in self.OPERATIONS:
+            raise ValueError(f"op phải là một trong: {', '.join(self.OPERATIONS)}")
+        op = operation['op']
+
+        if op == 'add':
+            try:
+                product_id = int(operation.get('product'))
+            except (TypeError, ValueError):
+                raise ValueError('product phải là số')
+            if product_id not in valid_products:
+                raise ValueError(f'Sản phẩm {product_id} không tồn tại')
+            # Cho phép thêm lại sản phẩm vừa bị xóa ở thao tác trước trong cùng batch
+            existing_id = products_in_list.get(product_id)
+            if (existing_id is not None and existing_id not in deleted) or product_id in to_create:
+                raise ValueError('Sản phẩm đã có trong danh sách')
+            to_create[product_id] = AddToList(
+                list=shopping_list, product_id=product_id,
+                quantity=self.parse_quantity(operation.get('quantity', 1)),
+                status=AddToList.ListStatus.PENDING
+            )
+            return
+
+        try:
+            item_id = int(operation.get('id'))
+        except (TypeError, ValueError):
+            raise ValueError('id phải là số')
+        item = items.get(item_id)
+        if item is None or item_id in deleted:
+            raise ValueError(f'Item {item_id} không có trong danh sách')
+
+        if op == 'delete':
+            deleted[item_id] = item
+            updated.pop(item_id, None)
+            return
+        if op == 'toggle':
+            item.status = (
+                AddToList.ListStatus.PURCHASED if item.status == AddToList.ListStatus.PENDING
+                else AddToList.ListStatus.PENDING
+            )
+        else:
+            if 'quantity' in operation:
+                item.quantity = self.parse_quantity(operation['quantity'])
+            if 'status' in operation:
+                if operation['status'] not in AddToList.ListStatus.values:
+                    raise ValueError(f"status phải là một trong: {', '.join(AddToList.ListStatus.values)}")
+                item.status = operation['status']
+        updated[item_id] = item
+
+    @staticmethod
+    def parse_quantity(value):
+        try:
+            quantity = float(value)
+        except (TypeError, ValueError):
+            raise ValueError('quantity phải là số')
+        if quantity <= 0:
+            raise ValueError('quantity phải lớn hơn 0')
+        return quantity
+
+
+class ShoppingListApplyToFridgeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, list_id):
+        """
+        Đưa toàn bộ item đã mua của danh sách vào tủ lạnh của group.
+        Body (không bắt buộc): {"location": "cool" | "freeze"} cho sản phẩm mới thêm.
+        Item đã đưa vào tủ lạnh được đánh dấu in_fridge nên gọi lại không bị cộng trùng.
+        """
+        shopping_list = get_object_or_404(ShoppingList, listID=list_id)
+        location = request.data.get('location') or AddToFridge.LocationType.COOL
+        if location not in AddToFridge.LocationType.values:
+            return Response({
+                'message': f"location phải là một trong: {', '.join(AddToFridge.LocationType.values)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        created, updated = apply_purchases(shopping_list, location=location)
+        if not created and not updated:
+            return Response({
+                'message': 'Không có sản phẩm đã mua nào cần đưa vào tủ lạnh',
+                'created': 0,
+                'updated': 0
+            })
+        return Response({
+            'message': f'Đã đưa {created + updated} sản phẩm vào tủ lạnh',
+            'created': created,
+            'updated': updated
+        })
+
+
 class AddToListDetailView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -162,62 +491,63 @@ class ToggleItemStatusView(APIView):
             'data': AddToListSerializer(item).data
         })
 
-from django.db.models import Sum, F, FloatField, ExpressionWrapper
+
+def parse_date_range(params):
+    """(start_date, end_date) dạng YYYY-MM-DD từ query params, có thể bỏ trống; sai định dạng thì raise ValueError"""
+    bounds = []
+    for name in ('start_date', 'end_date'):
+        value = params.get(name)
+        try:
+            bounds.append(datetime.strptime(value, '%Y-%m-%d').date() if value else None)
+        except ValueError:
+            raise ValueError(f'{name} không hợp lệ, định dạng YYYY-MM-DD')
+    start, end = bounds
+    if start and end and start > end:
+        raise ValueError('start_date phải trước hoặc bằng end_date')
+    return start, end
+
 
 class PurchasedShoppingStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """
+        Tổng số item, số lượng và giá tiền đã mua của group.
+        Lọc theo ngày mua với start_date, end_date (YYYY-MM-DD, không bắt buộc).
+        """
         group_id = request.query_params.get('group_id')
         if not group_id:
             return Response({'message': 'Thiếu group_id'}, status=400)
-        purchased_items = AddToList.objects.filter(
-            status='purchased',
-            list__group_id=group_id
-        )
-        total_items = purchased_items.count()
-        total_quantity = purchased_items.aggregate(total=Sum('quantity'))['total'] or 0
-        # Tính tổng giá tiền: quantity * product.price
-        total_price = purchased_items.aggregate(
-            total=Sum(
-                ExpressionWrapper(
-                    F('quantity') * F('product__price'),
-                    output_field=FloatField()
-                )
-            )
-        )['total'] or 0 
-
+        try:
+            start, end = parse_date_range(request.query_params)
+        except ValueError as e:
+            return Response({'message': str(e)}, status=400)
+        # Tổng trên bảng rollup thay vì quét toàn bộ lịch sử AddToList; tiền tính theo giá lúc mua
+        stats = purchase_rollup.totals(group_id, start, end)
         return Response({
-            'total_items': total_items,
-            'total_quantity': total_quantity,
-            'total_price': total_price
+            'total_items': stats['total_items'],
+            'total_quantity': stats['total_quantity'],
+            'total_price': float(stats['total_spent'])
         })
 
 class PurchasedStatsByCategoryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """Tổng số lượng đã mua theo danh mục, lọc ngày như PurchasedShoppingStatsView"""
         group_id = request.query_params.get('group_id')
         if not group_id:
             return Response({'message': 'Thiếu group_id'}, status=400)
-        # Lọc các sản phẩm đã mua của group hiện tại
-        purchased_items = AddToList.objects.filter(
-            status='purchased',
-            list__group_id=group_id
-        )
-        # Thống kê tổng số lượng theo từng danh mục
-        stats = (
-            purchased_items
-            .values('product__category__categoryName')
-            .annotate(total_quantity=Sum('quantity'))
-            .order_by('-total_quantity')
-        )
+        try:
+            start, end = parse_date_range(request.query_params)
+        except ValueError as e:
+            return Response({'message': str(e)}, status=400)
         # Định dạng dữ liệu trả về cho frontend
         data = [
             {
-                'name': s['product__category__categoryName'] or 'Khác',
-                'value': s['total_quantity'] or 0
+                'name': category_name or 'Khác',
+                'value': total_quantity or 0
             }
-            for s in stats
+            for category_name, total_quantity in purchase_rollup.by_category(group_id, start, end)
         ]
-        return Response(data)
\ No newline at end of file
+        return Response(data)
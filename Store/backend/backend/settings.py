@@ -115,6 +115,29 @@ DATABASES = {
 }
 
 
+# Cache
+# Version token (ETag/304), cache gợi ý công thức, lịch tuần và độ mới của autocomplete đều
+# dựa vào cache này nên mọi worker phải dùng chung 1 cache: đặt REDIS_URL khi chạy nhiều
+# process (gunicorn/uwsgi). Không đặt thì dùng LocMemCache, chỉ đúng khi chạy 1 process
+# (runserver, test); `manage.py check --deploy` sẽ cảnh báo trường hợp này.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 